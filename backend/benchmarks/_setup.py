@@ -0,0 +1,76 @@
+"""
+Shared bootstrap for the scripts in this directory.
+
+Benchmarks run against a throw-away in-memory SQLite database unless
+DATABASE_URL is already set, so they can be run from a clean checkout:
+
+    cd backend
+    python benchmarks/order_list.py --orders 20000
+"""
+import os
+import random
+import sys
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLAVOURS = [
+    'Vanilla Tub', 'Chocolate Cone', 'Mango Kulfi', 'Butterscotch Cup',
+    'Strawberry Bar', 'Kesar Pista', 'Black Currant', 'Cassata Slice',
+]
+
+
+def bootstrap(migrate=True):
+    """
+    Configures Django for a standalone script and (optionally) migrates and
+    creates the database cache table.
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'icecream_project.settings')
+    os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+
+    import django
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+        call_command('createcachetable', verbosity=0)
+
+
+def seed_orders(n_orders, n_businesses=50, max_items=6, seed=1):
+    """Bulk-inserts n_orders orders with 1..max_items items each. Returns the business list."""
+    from icecream_api.models import Business, Order, OrderItem
+
+    rng        = random.Random(seed)
+    businesses = Business.objects.bulk_create(
+        Business(name=f'Parlour {i:04d}', contact_person=f'Owner {i}', phone='9800000000')
+        for i in range(n_businesses)
+    )
+
+    orders = Order.objects.bulk_create(
+        Order(
+            business     = rng.choice(businesses),
+            status       = rng.choice(Order.Status.values),
+            payment_done = rng.random() < 0.5,
+        )
+        for _ in range(n_orders)
+    )
+
+    items = []
+    for order in orders:
+        total = Decimal('0.00')
+        for _ in range(rng.randint(1, max_items)):
+            item = OrderItem(
+                order     = order,
+                item_name = rng.choice(FLAVOURS),
+                quantity  = rng.randint(1, 40),
+                price     = Decimal(rng.randint(50, 400)),
+            )
+            total += item.subtotal
+            items.append(item)
+        order.total_amount = total
+    OrderItem.objects.bulk_create(items, batch_size=2000)
+    Order.objects.bulk_update(orders, ['total_amount'], batch_size=2000)
+    return businesses
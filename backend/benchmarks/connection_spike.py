@@ -0,0 +1,120 @@
+"""
+Server-side connection count under a concurrency spike, with and without
+the psycopg connection pool (DB_POOL).
+
+Fires --threads concurrent clients at the order list endpoint inside one
+process (the shape of one gthread worker) while a monitor samples
+pg_stat_activity. Needs PostgreSQL; point it at a scratch database, it
+migrates and writes to it:
+
+    DATABASE_URL=postgres://localhost/icecream_bench python benchmarks/connection_spike.py --threads 64
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _setup import BACKEND_DIR, bootstrap, seed_orders
+
+
+def _count_backends(wrapper, stop, samples):
+    conn = wrapper.Database.connect(**wrapper.get_connection_params())
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            while not stop.is_set():
+                cursor.execute(
+                    'SELECT count(*) FROM pg_stat_activity '
+                    'WHERE datname = current_database() AND pid <> pg_backend_pid()'
+                )
+                samples.append(cursor.fetchone()[0])
+                time.sleep(0.05)
+    finally:
+        conn.close()
+
+
+def child(threads, requests):
+    bootstrap()
+
+    from django.contrib.auth.hashers     import make_password
+    from django.db                       import connections
+    from django.test                     import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+    from icecream_api.models             import Order, User
+
+    if not Order.objects.exists():
+        seed_orders(500)
+    admin, _ = User.objects.get_or_create(
+        username='bench-admin',
+        defaults={'password_hash': make_password('x'), 'role': User.Role.ADMIN},
+    )
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+    connections.close_all()
+
+    latencies, errors = [], []
+
+    def hit(_):
+        start    = time.perf_counter()
+        response = Client().get('/api/orders/', **headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+    stop, samples = threading.Event(), []
+    monitor = threading.Thread(target=_count_backends, args=(connections['default'], stop, samples))
+    monitor.start()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(hit, range(requests)))
+    finally:
+        stop.set()
+        monitor.join()
+
+    latencies.sort()
+    print(json.dumps({
+        'peak_backends': max(samples, default=0),
+        'p50_ms':        statistics.median(latencies) * 1000,
+        'p95_ms':        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors':        len(errors),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads',  type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--pool-max', type=int, default=10)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.threads, args.requests)
+        return
+
+    if not os.environ.get('DATABASE_URL', '').startswith('postgres'):
+        sys.exit('connection_spike.py needs DATABASE_URL pointing at a PostgreSQL scratch database')
+
+    print(f'{args.requests} requests from {args.threads} threads in one process')
+    print(f'  {"mode":28} {"peak conns":>10} {"p50":>9} {"p95":>9} {"errors":>7}')
+    for label, env in (
+        ('persistent (CONN_MAX_AGE)',   {'DB_POOL': '0'}),
+        (f'pool (max {args.pool_max})', {'DB_POOL': '1', 'DB_POOL_MAX_SIZE': str(args.pool_max)}),
+    ):
+        out = subprocess.run(
+            [sys.executable, __file__, '--child', '--threads', str(args.threads), '--requests', str(args.requests)],
+            cwd=BACKEND_DIR, env={**os.environ, **env}, check=True, capture_output=True, text=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f'  {label:28} {r["peak_backends"]:10d} {r["p50_ms"]:7.1f}ms '
+            f'{r["p95_ms"]:7.1f}ms {r["errors"]:7d}'
+        )
+
+
+if __name__ == '__main__':
+    main()
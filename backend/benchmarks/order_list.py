@@ -0,0 +1,67 @@
+"""
+Encode time and bytes on the wire for the order list endpoints.
+
+Compares DRF's stock JSONRenderer with FastJSONRenderer, and the raw body
+with the gzip / brotli bodies CompressionMiddleware would send:
+
+    python benchmarks/order_list.py --orders 20000 --repeat 5
+"""
+import argparse
+import gzip
+import time
+
+from _setup import bootstrap, seed_orders
+
+
+def _best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best  = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bootstrap()
+
+    from rest_framework.renderers import JSONRenderer
+    from icecream_api.renderers   import FastJSONRenderer
+    from icecream_api.views       import _order_list_qs, _serialize_order_list
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    seed_orders(args.orders)
+    data = _serialize_order_list(_order_list_qs())
+
+    stock, fast = JSONRenderer(), FastJSONRenderer()
+    body        = stock.render(data)
+    assert fast.render(data) == body, 'FastJSONRenderer output differs from JSONRenderer'
+
+    print(f'{args.orders} orders, best of {args.repeat}')
+    print(f'  encode  JSONRenderer      {_best_of(args.repeat, lambda: stock.render(data)) * 1000:9.1f} ms')
+    print(f'  encode  FastJSONRenderer  {_best_of(args.repeat, lambda: fast.render(data)) * 1000:9.1f} ms')
+    print(f'  bytes   identity          {len(body):12,d}')
+
+    gz = gzip.compress(body, compresslevel=6, mtime=0)
+    gz_time = _best_of(args.repeat, lambda: gzip.compress(body, compresslevel=6, mtime=0))
+    print(f'  bytes   gzip (6)          {len(gz):12,d}  ({gz_time * 1000:.1f} ms)')
+
+    if brotli is not None:
+        br = brotli.compress(body, quality=4)
+        br_time = _best_of(args.repeat, lambda: brotli.compress(body, quality=4))
+        print(f'  bytes   brotli (4)        {len(br):12,d}  ({br_time * 1000:.1f} ms)')
+    else:
+        print('  bytes   brotli            (brotli not installed)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Throughput of reconcile_order_totals: seeds orders, corrupts a fraction of
+their totals, then times a dry run and a fixing run.
+
+    python benchmarks/reconcile_totals.py --orders 200000
+"""
+import argparse
+import io
+import time
+
+from _setup import bootstrap, seed_orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--corrupt', type=float, default=0.01, help='fraction of orders to corrupt')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    bootstrap()
+
+    from django.core.management import call_command
+    from django.db.models       import F
+    from icecream_api.models    import Order
+
+    seed_orders(args.orders)
+    step = max(1, int(1 / args.corrupt)) if args.corrupt else args.orders + 1
+    Order.objects.annotate(mod=F('id') % step).filter(mod=0).update(total_amount=F('total_amount') + 1)
+
+    for label, extra in (('dry run', {'dry_run': True}), ('fix', {}), ('re-check', {'dry_run': True})):
+        out   = io.StringIO()
+        start = time.perf_counter()
+        call_command('reconcile_order_totals', batch_size=args.batch_size, verbosity=0, stdout=out, **extra)
+        elapsed = time.perf_counter() - start
+        print(f'  {label:9} {elapsed:7.2f}s  {args.orders / elapsed:12,.0f} orders/s  {out.getvalue().strip()}')
+
+
+if __name__ == '__main__':
+    main()
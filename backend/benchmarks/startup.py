@@ -0,0 +1,94 @@
+"""
+Cold-start cost of a worker: time to import Django and the app
+(django.setup()), and latency of the first and second API request.
+
+Each profile runs in a fresh interpreter so nothing is shared between runs:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --profiles icecream_project.settings_api --warmup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from _setup import BACKEND_DIR
+
+_CHILD = r'''
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+
+from django.core.management import call_command
+call_command('migrate', verbosity=0)
+
+from django.contrib.auth.hashers import make_password
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from icecream_api.models import User
+
+admin   = User.objects.create(username='bench', password_hash=make_password('x'), role=User.Role.ADMIN)
+headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+
+warmup = 0.0
+if os.environ.get('BENCH_WARMUP'):
+    from icecream_project.warmup import warm_up
+    w0 = time.perf_counter(); warm_up(); warmup = time.perf_counter() - w0
+
+client = Client()
+t2 = time.perf_counter(); first  = client.get('/api/orders/', **headers); t3 = time.perf_counter()
+second = client.get('/api/orders/', **headers);                         t4 = time.perf_counter()
+assert first.status_code == second.status_code == 200, (first.status_code, second.status_code)
+
+print(json.dumps({
+    'setup':   t1 - t0,
+    'warmup':  warmup,
+    'first':   t3 - t2,
+    'second':  t4 - t3,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def _run(profile, warmup):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': profile,
+        'DATABASE_URL':           os.environ.get('DATABASE_URL', 'sqlite://:memory:'),
+    }
+    if warmup:
+        env['BENCH_WARMUP'] = '1'
+    out = subprocess.run(
+        [sys.executable, '-c', _CHILD],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--warmup', action='store_true', help='call warm_up() before the first request')
+    parser.add_argument('--profiles', nargs='+', default=[
+        'icecream_project.settings',
+        'icecream_project.settings_api',
+    ])
+    args = parser.parse_args()
+
+    print(f'median of {args.runs} fresh interpreters' + (', warmed up' if args.warmup else ''))
+    print(f'  {"profile":34} {"setup":>9} {"warmup":>9} {"1st req":>9} {"2nd req":>9} {"modules":>8}')
+    for profile in args.profiles:
+        runs = [_run(profile, args.warmup) for _ in range(args.runs)]
+        med  = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+        print(
+            f'  {profile:34} {med["setup"] * 1000:7.1f}ms {med["warmup"] * 1000:7.1f}ms '
+            f'{med["first"] * 1000:7.1f}ms {med["second"] * 1000:7.1f}ms {int(med["modules"]):8d}'
+        )
+
+
+if __name__ == '__main__':
+    main()
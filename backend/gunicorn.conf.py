@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration. Picked up automatically when gunicorn runs from
+backend/:
+
+    gunicorn                                   # WSGI, gthread workers
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn
+                                               # ASGI, needed for /api/orders/events/
+
+Every value can be overridden with the usual GUNICORN_CMD_ARGS / CLI flags.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'icecream_project.settings')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+wsgi_app     = (
+    'icecream_project.asgi:application' if 'uvicorn' in worker_class
+    else 'icecream_project.wsgi:application'
+)
+
+# Threads overlap DB / network waits inside one process; a few processes per
+# core keep the GIL from becoming the ceiling.
+workers = int(os.getenv('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count())))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+# with DB_POOL=1 keep DB_POOL_MAX_SIZE >= threads, or threads queue for a connection
+
+# Import Django and the whole app once in the master; workers fork with it
+# already loaded (copy-on-write) instead of each paying the import cost.
+# The master must not open database connections, or workers would share its sockets.
+preload_app = True
+
+# Recycle workers periodically to bound slow memory growth; jitter keeps them
+# from all restarting at once.
+max_requests        = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = 200
+
+timeout          = 30
+graceful_timeout = 30
+keepalive        = 5
+
+accesslog = '-'
+errorlog  = '-'
+
+
+def post_fork(server, worker):
+    # runs in each new worker before it accepts requests
+    from icecream_project.warmup import warm_up
+    timings = warm_up()
+    server.log.info('Worker %s warmed up: %s', worker.pid, timings)
+
+
+def worker_exit(server, worker):
+    # hand pooled connections back to the server instead of letting them time out
+    from django.db import connections
+    for conn in connections.all(initialized_only=True):
+        if getattr(conn, 'pool', None) is not None:
+            conn.close_pool()
@@ -1,12 +1,42 @@
-from django.contrib import admin
-from .models import Business, User, Order, OrderItem, AdminLog
+from django.contrib          import admin
+from django.core.paginator   import Paginator
+from django.db               import connections
+from django.utils.functional import cached_property
+
+from .models import (
+    Business, User, Order, OrderItem, ArchivedOrder, StandingOrder, ProductStock, EmailJob,
+    WebhookEndpoint, WebhookDelivery, ProfileArtifact, AdminLog, AdminLogSummary,
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for big append-only tables: the unfiltered change list takes
+    Postgres's row estimate instead of running COUNT(*) over the whole table.
+    """
+
+    @cached_property
+    def count(self):
+        queryset   = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:   # -1 / 0 until the table is first analyzed
+                return row[0]
+        return super().count
 
 
 @admin.register(Business)
 class BusinessAdmin(admin.ModelAdmin):
-    list_display  = ('id', 'name', 'email', 'phone', 'created_at')
+    list_display  = ('id', 'name', 'email', 'phone', 'order_count', 'lifetime_value', 'last_order_at', 'created_at')
     search_fields = ('name', 'email')
     ordering      = ('name',)
+    readonly_fields = Business.COUNTER_FIELDS   # maintained from orders
 
 
 @admin.register(User)
@@ -31,9 +61,90 @@ class OrderItemAdmin(admin.ModelAdmin):
     ordering     = ('order',)
 
 
+@admin.register(StandingOrder)
+class StandingOrderAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'business', 'weekdays', 'interval_days', 'start_date', 'end_date', 'active', 'last_generated_on')
+    list_filter   = ('active',)
+    search_fields = ('business__name',)
+    ordering      = ('business__name', 'id')
+    readonly_fields = ('last_generated_on',)
+
+
+@admin.register(ProductStock)
+class ProductStockAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'item_name', 'day', 'available', 'reserved')
+    list_filter   = ('day',)
+    search_fields = ('item_name',)
+    ordering      = ('-day', 'item_name')
+    readonly_fields = ('reserved',)   # maintained by order placement and cancellation
+
+    def save_model(self, request, obj, form, change):
+        # orders move `reserved` concurrently; write back only what the form edits
+        if change:
+            obj.save(update_fields=form.changed_data)
+        else:
+            obj.save()
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'business', 'status', 'total_amount', 'order_date', 'archived_at')
+    list_filter   = ('status',)
+    search_fields = ('business__name',)
+    ordering      = ('-order_date',)
+    readonly_fields = [f.name for f in ArchivedOrder._meta.fields]   # archive is read-only
+
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'order', 'kind', 'to_email', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter   = ('status', 'kind')
+    search_fields = ('to_email',)
+    ordering      = ('-created_at',)
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'name', 'url', 'event_types', 'active', 'created_at')
+    list_filter   = ('active',)
+    search_fields = ('name', 'url')
+    ordering      = ('name',)
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'endpoint', 'event_type', 'order_id', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter   = ('status', 'event_type', 'endpoint')
+    ordering      = ('-created_at',)
+    readonly_fields = ('event_id', 'payload')
+
+
+@admin.register(ProfileArtifact)
+class ProfileArtifactAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'trigger', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'created_at')
+    list_filter   = ('trigger',)
+    search_fields = ('path',)
+    ordering      = ('-created_at',)
+    exclude       = ('profile',)
+    readonly_fields = [f.name for f in ProfileArtifact._meta.fields if f.name != 'profile']
+
+
 @admin.register(AdminLog)
 class AdminLogAdmin(admin.ModelAdmin):
     list_display  = ('id', 'admin_user', 'action', 'action_time')
+    list_select_related = ('admin_user',)
     search_fields = ('action', 'admin_user__username')
-    ordering      = ('-action_time',)
-    readonly_fields = ('admin_user', 'action', 'action_time')   # logs are immutable
\ No newline at end of file
+    ordering      = ('-action_time', '-id')   # admin_logs_time_idx
+    readonly_fields = ('admin_user', 'action', 'action_time')   # logs are immutable
+    paginator     = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(AdminLogSummary)
+class AdminLogSummaryAdmin(admin.ModelAdmin):
+    list_display  = ('month', 'admin_user', 'action_type', 'count', 'first_at', 'last_at')
+    list_select_related = ('admin_user',)
+    list_filter   = ('action_type',)
+    search_fields = ('admin_user__username',)
+    ordering      = ('-month', 'admin_user', 'action_type')
+    readonly_fields = ('month', 'admin_user', 'action_type', 'count', 'first_at', 'last_at')
@@ -0,0 +1,103 @@
+"""
+Retention for the admin activity log.
+
+AdminLog rows older than ADMIN_LOG_RETENTION_DAYS are deleted by
+`python manage.py purge_admin_logs`. Before a row goes, it is counted into
+the AdminLogSummary row for its month, admin and action type, so "how many
+orders did each admin confirm in March" stays answerable. Each batch is
+compacted and deleted in its own short transaction. A batch's rows are
+locked with SKIP LOCKED, so two purges running at once never count a row
+twice, and no lock is held for longer than one batch.
+"""
+import re
+from collections import defaultdict
+from datetime    import timedelta
+
+from django.conf                import settings
+from django.db                  import transaction
+from django.db.models           import F, Value
+from django.db.models.functions import Greatest, Least
+from django.utils               import timezone
+
+from .models import AdminLog, AdminLogSummary
+
+
+# first match wins; the texts are the ones views.py and standing.py log
+ACTION_TYPES = (
+    ('order_placed',           re.compile(r'^Placed order #')),
+    ('order_status_changed',   re.compile(r'^Changed order #\d+ status ')),
+    ('order_cancelled',        re.compile(r'^Admin cancelled order #')),
+    ('standing_order_created', re.compile(r'^Created standing order #')),
+    ('standing_order_updated', re.compile(r'^Updated standing order #')),
+    ('standing_order_deleted', re.compile(r'^Deleted standing order #')),
+    ('businesses_onboarded',   re.compile(r'^Onboarded \d+ businesses')),
+)
+OTHER = 'other'
+
+
+def action_type(action):
+    for name, pattern in ACTION_TYPES:
+        if pattern.match(action):
+            return name
+    return OTHER
+
+
+def cutoff(now=None):
+    """Rows logged before this are past retention, or None when retention is off."""
+    days = settings.ADMIN_LOG_RETENTION_DAYS
+    if days <= 0:
+        return None
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def _month(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def _compact(rows):
+    """Adds (admin_user_id, action, action_time) rows to their monthly summaries."""
+    groups = defaultdict(list)
+    for admin_user_id, action, action_time in rows:
+        groups[(_month(action_time), admin_user_id, action_type(action))].append(action_time)
+
+    for (month, admin_user_id, kind), times in groups.items():
+        first, last = min(times), max(times)
+        summary, created = AdminLogSummary.objects.get_or_create(
+            month         = month,
+            admin_user_id = admin_user_id,
+            action_type   = kind,
+            defaults      = {'count': len(times), 'first_at': first, 'last_at': last},
+        )
+        if not created:
+            AdminLogSummary.objects.filter(pk=summary.pk).update(
+                count    = F('count') + len(times),
+                first_at = Least('first_at', Value(first)),
+                last_at  = Greatest('last_at', Value(last)),
+            )
+    return len(groups)
+
+
+def purge(batch_size=1000, before=None):
+    """
+    Compacts and deletes log rows older than `before` (default: the
+    retention cutoff), oldest first, batch_size rows per transaction.
+    Returns the number of rows deleted.
+    """
+    before = before or cutoff()
+    if before is None:
+        return 0
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                AdminLog.objects
+                .filter(action_time__lt=before)
+                .order_by('action_time', 'id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', 'admin_user_id', 'action', 'action_time')[:batch_size]
+            )
+            if not rows:
+                return deleted
+            _compact(row[1:] for row in rows)
+            deleted += AdminLog.objects.filter(id__in=[row[0] for row in rows]).delete()[0]
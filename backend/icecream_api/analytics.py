@@ -0,0 +1,205 @@
+"""
+Order aggregations.
+
+item_demand()   item-level demand for production planning: a single grouped
+                query over order_items joined to orders, filtered through the
+                (status, order_date) index on orders; one per shard, merged,
+                when orders are sharded.
+order_summary() one business's lifetime totals for the customer dashboard,
+                over live and archived orders alike.
+"""
+from collections import OrderedDict
+from datetime    import datetime, time, timedelta
+from decimal     import Decimal
+
+from django.db.models           import Count, DecimalField, F, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils               import timezone
+
+from . import sharding
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+GROUP_BY_CHOICES = ('business', 'day')
+
+DEFAULT_STATUSES = (Order.Status.PENDING, Order.Status.CONFIRMED)
+
+
+def _day_bounds(start, end):
+    """[start 00:00, end+1 00:00) in the current timezone, so the order_date index is usable."""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def item_demand(start, end, statuses=DEFAULT_STATUSES, group_by=None):
+    """
+    Quantity and revenue per item_name for orders placed between start and
+    end (inclusive dates), optionally broken down per business or per day.
+    """
+    group_fields = ['item_name']
+    if group_by == 'business':
+        group_fields += ['order__business_id', 'order__business__name']
+    elif group_by == 'day':
+        group_fields += ['day']
+
+    lower, upper = _day_bounds(start, end)
+    if sharding.enabled():
+        rows = _merge_rows(sharding.fan_out(lambda alias: _demand_rows(lower, upper, statuses, group_fields)), group_fields)
+    else:
+        rows = _demand_rows(lower, upper, statuses, group_fields)
+
+    items = OrderedDict()
+    for row in rows:
+        item = items.setdefault(row['item_name'], {
+            'item_name':      row['item_name'],
+            'total_quantity': 0,
+            'total_revenue':  Decimal('0'),
+        })
+        item['total_quantity'] += row['units']
+        item['total_revenue']  += row['revenue'] or 0
+
+        if group_by == 'business':
+            item.setdefault('breakdown', []).append({
+                'business_id':   row['order__business_id'],
+                'business_name': row['order__business__name'],
+                'quantity':      row['units'],
+                'revenue':       float(row['revenue'] or 0),
+            })
+        elif group_by == 'day':
+            item.setdefault('breakdown', []).append({
+                'day':      row['day'].isoformat(),
+                'quantity': row['units'],
+                'revenue':  float(row['revenue'] or 0),
+            })
+
+    for item in items.values():
+        item['total_revenue'] = float(item['total_revenue'])
+    return sorted(items.values(), key=lambda i: (-i['total_quantity'], i['item_name']))
+
+
+def _demand_rows(lower, upper, statuses, group_fields):
+    rows = (
+        OrderItem.objects
+        .filter(
+            order__status__in=statuses,
+            order__order_date__gte=lower,
+            order__order_date__lt=upper,
+        )
+    )
+    if 'day' in group_fields:
+        rows = rows.annotate(day=TruncDate('order__order_date'))
+
+    return list(
+        rows
+        .values(*group_fields)
+        .annotate(
+            units=Sum('quantity'),
+            revenue=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        )
+        .order_by(*group_fields)
+    )
+
+
+def _merge_rows(per_shard, group_fields):
+    """One shard's _demand_rows() each, summed per group and back in group order."""
+    merged = {}
+    for rows in per_shard:
+        for row in rows:
+            key = tuple(row[field] for field in group_fields)
+            if key in merged:
+                merged[key]['units']   += row['units']
+                merged[key]['revenue']  = (merged[key]['revenue'] or 0) + (row['revenue'] or 0)
+            else:
+                merged[key] = dict(row)
+    return [merged[key] for key in sorted(merged)]
+
+
+# ------------------------------------------------------------------
+# Customer dashboard summary
+# ------------------------------------------------------------------
+
+SUMMARY_MONTHS    = 6
+SUMMARY_TOP_ITEMS = 6
+
+
+def _month_start(day, months_back=0):
+    month = day.year * 12 + day.month - 1 - months_back
+    return day.replace(year=month // 12, month=month % 12 + 1, day=1)
+
+
+def order_summary(business_id, today=None):
+    """
+    Lifetime counts per status, spend (cancelled orders excluded), monthly
+    spend for the last SUMMARY_MONTHS months and the most ordered items of
+    one business. Each aggregate is one grouped UNION ALL query over the
+    live and archived tables.
+    """
+    today  = today or timezone.localdate()
+    months = [_month_start(today, n) for n in reversed(range(SUMMARY_MONTHS))]
+
+    per_status = {status: {'count': 0, 'spend': Decimal('0')} for status in Order.Status.values}
+    first_at = last_at = None
+    by_status = [
+        model.objects
+        .filter(business_id=business_id)
+        .order_by()
+        .values('status')
+        .annotate(count=Count('id'), spend=Sum('total_amount'), first=Min('order_date'), last=Max('order_date'))
+        for model in (Order, ArchivedOrder)
+    ]
+    for row in by_status[0].union(by_status[1], all=True):
+        bucket = per_status.setdefault(row['status'], {'count': 0, 'spend': Decimal('0')})
+        bucket['count'] += row['count']
+        bucket['spend'] += row['spend'] or 0
+        first_at = min(filter(None, (first_at, row['first'])), default=None)
+        last_at  = max(filter(None, (last_at, row['last'])), default=None)
+
+    lower, _ = _day_bounds(months[0], today)
+    monthly  = dict.fromkeys(months, Decimal('0'))
+    by_month = [
+        model.objects
+        .filter(business_id=business_id, order_date__gte=lower)
+        .exclude(status=Order.Status.CANCELLED)
+        .order_by()
+        .annotate(month=TruncMonth('order_date'))
+        .values('month')
+        .annotate(spend=Sum('total_amount'))
+        for model in (Order, ArchivedOrder)
+    ]
+    for row in by_month[0].union(by_month[1], all=True):
+        month = row['month'].date() if hasattr(row['month'], 'date') else row['month']
+        if month in monthly:
+            monthly[month] += row['spend'] or 0
+
+    quantities = {}
+    by_item    = [
+        model.objects
+        .filter(order__business_id=business_id)
+        .order_by()
+        .values('item_name')
+        .annotate(units=Sum('quantity'))
+        for model in (OrderItem, ArchivedOrderItem)
+    ]
+    for row in by_item[0].union(by_item[1], all=True):
+        quantities[row['item_name']] = quantities.get(row['item_name'], 0) + row['units']
+    top_items = sorted(quantities.items(), key=lambda kv: (-kv[1], kv[0]))[:SUMMARY_TOP_ITEMS]
+
+    spend = sum(
+        bucket['spend'] for status, bucket in per_status.items()
+        if status != Order.Status.CANCELLED
+    )
+    return {
+        'total_orders':   sum(bucket['count'] for bucket in per_status.values()),
+        'status_counts':  {status: bucket['count'] for status, bucket in per_status.items()},
+        'lifetime_spend': float(spend),
+        'first_order_at': first_at,
+        'last_order_at':  last_at,
+        'monthly_spend':  [
+            {'month': month.strftime('%Y-%m'), 'total': float(total)}
+            for month, total in monthly.items()
+        ],
+        'top_items':      [{'item_name': name, 'quantity': units} for name, units in top_items],
+    }
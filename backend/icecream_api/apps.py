@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IcecreamApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'icecream_api'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects receivers)
@@ -0,0 +1,58 @@
+"""
+Cache keys and invalidation for derived, read-heavy responses.
+
+Cached entries embed a version number; writes bump the version instead of
+hunting down individual keys, so stale entries simply stop being read and
+expire on their own.
+
+Versions live in the shared cache (settings.CACHES) so a bump reaches every
+worker, and are bumped once the write's transaction commits: a bump before
+the commit would let a concurrent reader cache the old numbers under the new
+version.
+"""
+import time
+
+from django.core.cache import cache
+from django.db         import transaction
+
+
+ANALYTICS_VERSION_KEY = 'analytics:version'
+
+
+def analytics_version():
+    return cache.get_or_set(ANALYTICS_VERSION_KEY, time.time_ns, None)
+
+
+def bump_analytics_version(using=None):
+    """
+    Invalidates every cached analytics response once the current transaction
+    on `using` commits (right away outside one). Call after any order write.
+    """
+    transaction.on_commit(lambda: cache.set(ANALYTICS_VERSION_KEY, time.time_ns(), None), using=using)
+
+
+def analytics_key(name, *params):
+    return ':'.join(['analytics', name, str(analytics_version()), *map(str, params)])
+
+
+# ------------------------------------------------------------------
+# Per-business versions (customer dashboard summary)
+# ------------------------------------------------------------------
+
+def _business_version_key(business_id):
+    return f'business:{business_id}:version'
+
+
+def business_version(business_id):
+    return cache.get_or_set(_business_version_key(business_id), time.time_ns, None)
+
+
+def bump_business_versions(*business_ids, using=None):
+    """Invalidates the cached per-business responses of the given businesses, on commit."""
+    keys = [_business_version_key(b) for b in set(business_ids) if b is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None), using=using)
+
+
+def business_key(name, business_id, *params):
+    return ':'.join(['business', str(business_id), name, str(business_version(business_id)), *map(str, params)])
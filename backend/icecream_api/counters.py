@@ -0,0 +1,220 @@
+"""
+Denormalized per-business order counters:
+
+    Business.order_count       every order ever placed (archived ones included)
+    Business.open_order_count  Pending + Confirmed orders
+    Business.lifetime_value    sum of total_amount, cancelled orders excluded
+    Business.last_order_at     newest order_date
+
+Order saves apply the difference between the order's previous and current
+state as one F() UPDATE on its business (see the post_save receiver in
+signals.py), so concurrent writers never lose increments. Deletes and
+business moves recompute the affected businesses from scratch. Archiving
+moves orders without changing any counter. rebuild() recomputes everything
+from orders + orders_archive; rebuild_business_counters runs it.
+"""
+import contextvars
+from contextlib import contextmanager
+from decimal    import Decimal
+
+from django.db                  import transaction
+from django.db.models           import Count, DecimalField, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from . import sharding
+from .models import ArchivedOrder, Business, Order
+
+
+OPEN_STATUSES = (Order.Status.PENDING, Order.Status.CONFIRMED)
+
+COUNTER_FIELDS = Business.COUNTER_FIELDS
+
+_paused = contextvars.ContextVar('icecream_counters_paused', default=False)
+
+
+@contextmanager
+def paused():
+    """Order deletes inside the block leave the counters alone (used when archiving)."""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+def is_paused():
+    return _paused.get()
+
+
+# ------------------------------------------------------------------
+# Incremental updates
+# ------------------------------------------------------------------
+
+def contribution(status, total_amount):
+    """(orders, open orders, value) one order in this state adds to its business."""
+    return (
+        1,
+        1 if status in OPEN_STATUSES else 0,
+        Decimal('0') if status == Order.Status.CANCELLED else Decimal(total_amount or 0),
+    )
+
+
+def apply(business_id, orders=0, open_orders=0, value=Decimal('0'), order_date=None):
+    """Adds the given deltas to one business in a single UPDATE."""
+    changes = {}
+    if orders:
+        changes['order_count'] = F('order_count') + orders
+    if open_orders:
+        changes['open_order_count'] = F('open_order_count') + open_orders
+    if value:
+        changes['lifetime_value'] = F('lifetime_value') + value
+    if order_date is not None:
+        # GREATEST is NULL on SQLite when either side is NULL
+        changes['last_order_at'] = Coalesce(Greatest('last_order_at', Value(order_date)), Value(order_date))
+    if changes:
+        Business.objects.filter(pk=business_id).update(**changes)
+
+
+def order_saved(order, created):
+    """Brings the counters in line with an order that was just saved."""
+    before = None if created else order._counted
+    after  = order.counter_state()
+    order._counted = after
+
+    if after is None:
+        rebuild([order.business_id])
+        return
+    if before is not None and before[0] != after[0]:
+        rebuild([before[0], after[0]])   # moved to another business
+        return
+    if before is None and not created:
+        rebuild([after[0]])              # previous state unknown (deferred fields)
+        return
+
+    old = contribution(*before[1:]) if before else (0, 0, Decimal('0'))
+    new = contribution(*after[1:])
+    apply(
+        after[0],
+        orders      = new[0] - old[0],
+        open_orders = new[1] - old[1],
+        value       = new[2] - old[2],
+        order_date  = order.order_date if created else None,
+    )
+
+
+def orders_created(orders):
+    """Counts orders inserted with bulk_create (no post_save): one UPDATE per business."""
+    per_business = {}
+    for order in orders:
+        count, open_count, value = contribution(order.status, order.total_amount)
+        current = per_business.setdefault(order.business_id, [0, 0, Decimal('0'), None])
+        current[0] += count
+        current[1] += open_count
+        current[2] += value
+        if current[3] is None or order.order_date > current[3]:
+            current[3] = order.order_date
+    for business_id, (count, open_count, value, last) in per_business.items():
+        apply(business_id, orders=count, open_orders=open_count, value=value, order_date=last)
+    for order in orders:
+        order._counted = order.counter_state()
+
+
+def order_deleted(order):
+    if not is_paused():
+        rebuild([order.business_id])
+
+
+# ------------------------------------------------------------------
+# Full recomputation
+# ------------------------------------------------------------------
+
+def _aggregate(business_ids=None):
+    totals = {}
+    if business_ids is None:
+        for _ in sharding.each_shard():
+            _aggregate_into(totals)
+    else:
+        for _, ids in sharding.each_shard_of(business_ids):   # a business's orders are all on its shard
+            _aggregate_into(totals, ids)
+    return totals
+
+
+def _aggregate_into(totals, business_ids=None):
+    money = DecimalField(max_digits=12, decimal_places=2)
+    parts = []
+    for model in (Order, ArchivedOrder):
+        rows = model.objects.order_by()
+        if business_ids is not None:
+            rows = rows.filter(business_id__in=business_ids)
+        parts.append(
+            rows.values('business_id').annotate(
+                orders=Count('id'),
+                open_orders=Count('id', filter=Q(status__in=OPEN_STATUSES)),
+                value=Coalesce(Sum('total_amount', filter=~Q(status=Order.Status.CANCELLED)), Value(0), output_field=money),
+                last=Max('order_date'),
+            )
+        )
+
+    for row in parts[0].union(parts[1], all=True):
+        current = totals.setdefault(row['business_id'], [0, 0, Decimal('0'), None])
+        current[0] += row['orders']
+        current[1] += row['open_orders']
+        current[2] += row['value'] or 0
+        if row['last'] is not None and (current[3] is None or row['last'] > current[3]):
+            current[3] = row['last']
+
+
+def expected(business_ids=None):
+    """{business_id: (order_count, open_order_count, lifetime_value, last_order_at)} from the orders."""
+    return {
+        business_id: (orders, open_orders, Decimal(value).quantize(Decimal('0.01')), last)
+        for business_id, (orders, open_orders, value, last) in _aggregate(business_ids).items()
+    }
+
+
+def rebuild(business_ids=None, batch_size=500, dry_run=False):
+    """
+    Recomputes the counters of the given businesses (all when None), one
+    locked batch per transaction. Returns the ids whose stored counters
+    were wrong.
+
+    Locking the business rows first makes concurrent order saves wait, so
+    their F() deltas land on top of the recomputed values instead of being
+    overwritten by them.
+    """
+    ids = Business.objects.order_by('id').values_list('id', flat=True)
+    if business_ids is not None:
+        ids = ids.filter(id__in={b for b in business_ids if b is not None})
+
+    wrong   = []
+    last_id = 0
+    while True:
+        batch = list(ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return wrong
+        last_id = batch[-1]
+        wrong.extend(_rebuild_batch(batch, dry_run))
+
+
+@transaction.atomic
+def _rebuild_batch(business_ids, dry_run):
+    businesses = list(
+        Business.objects
+        .select_for_update()
+        .filter(id__in=business_ids)
+        .order_by('id')
+        .only('id', *COUNTER_FIELDS)
+    )
+    wanted = expected(business_ids)
+
+    wrong = []
+    for business in businesses:
+        values = wanted.get(business.id, (0, 0, Decimal('0.00'), None))
+        if tuple(getattr(business, f) for f in COUNTER_FIELDS) != values:
+            for field, value in zip(COUNTER_FIELDS, values):
+                setattr(business, field, value)
+            wrong.append(business)
+
+    if wrong and not dry_run:
+        Business.objects.bulk_update(wrong, COUNTER_FIELDS)
+    return [business.id for business in wrong]
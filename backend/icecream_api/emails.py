@@ -0,0 +1,100 @@
+"""
+Order emails. Views only enqueue EmailJob rows (same transaction as the
+order change); the send_order_emails worker delivers them.
+"""
+from django.conf                 import settings
+from django.core.mail            import EmailMessage, get_connection
+from django.db.models.functions  import Now
+
+from .models import EmailJob, Order
+
+
+def order_confirmation(order):
+    """Subject and body of the email sent when an order is confirmed."""
+    lines = [
+        f'Hello {order.business.contact_person or order.business.name},',
+        '',
+        f'Your order #{order.id} has been confirmed.',
+        '',
+    ]
+    for item in order.items.all():
+        lines.append(f'  {item.item_name:<30} x{item.quantity:<5} Rs. {item.subtotal}')
+    lines += [
+        '',
+        f'Total: Rs. {order.total_amount}',
+        '',
+        'Thank you for ordering with Sheetal Ice-Cream Udhyog.',
+    ]
+    return f'Order #{order.id} confirmed', '\n'.join(lines)
+
+
+def enqueue_order_confirmation(order):
+    """
+    Queues the confirmation email. Returns the job, or None if the business
+    has no email or the order already has one queued (or sent), e.g. when it
+    goes Confirmed -> Pending -> Confirmed. Callers hold the order row lock.
+    """
+    if not order.business.email:
+        return None
+    if EmailJob.objects.filter(order=order, kind=EmailJob.Kind.ORDER_CONFIRMED).exists():
+        return None
+    subject, body = order_confirmation(order)
+    return EmailJob.objects.create(
+        order    = order,
+        kind     = EmailJob.Kind.ORDER_CONFIRMED,
+        to_email = order.business.email,
+        subject  = subject,
+        body     = body,
+    )
+
+
+def _retry_later(job, exc):
+    job.retry_later(
+        exc,
+        max_attempts = settings.ORDER_EMAIL_MAX_ATTEMPTS,
+        base_delay   = settings.ORDER_EMAIL_RETRY_BASE_SECONDS,
+        max_delay    = settings.ORDER_EMAIL_RETRY_MAX_SECONDS,
+    )
+
+
+def deliver(jobs):
+    """
+    Sends claimed jobs over one SMTP connection. Successful confirmations set
+    Order.email_sent; failures are rescheduled with backoff, including the
+    whole batch when the mail server cannot be reached.
+    Returns (sent, failed) counts.
+    """
+    sent_order_ids = []
+    failed         = 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        for job in jobs:
+            _retry_later(job, exc)
+        return 0, len(jobs)
+
+    with connection:
+        for job in jobs:
+            message = EmailMessage(
+                subject    = job.subject,
+                body       = job.body,
+                from_email = settings.DEFAULT_FROM_EMAIL,
+                to         = [job.to_email],
+                connection = connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                failed += 1
+                _retry_later(job, exc)
+                continue
+
+            job.mark_sent()
+            if job.kind == EmailJob.Kind.ORDER_CONFIRMED:
+                sent_order_ids.append(job.order_id)
+
+    if sent_order_ids:
+        Order.objects.filter(id__in=sent_order_ids).update(email_sent=True, updated_at=Now())
+    return len(jobs) - failed, failed
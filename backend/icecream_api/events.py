@@ -0,0 +1,309 @@
+"""
+Order event stream (Server-Sent Events) for the admin panel and dashboards.
+
+Views call publish_order_event() after an order is created, changes status
+or is cancelled, and the standing order generator calls
+publish_order_events() once per chunk. The event reaches every subscribed
+stream once the surrounding transaction commits:
+
+- 'memory'   backend: delivered straight to this process's broker. Fine for a
+             single ASGI process (and for tests).
+- 'postgres' backend: sent with pg_notify(); a listener thread in every
+             process LISTENs and feeds its local broker, so events cross
+             workers and machines.
+
+Each broker keeps the last ORDER_EVENTS_HISTORY events so a reconnecting
+EventSource can resume from its Last-Event-ID.
+"""
+import asyncio
+import bisect
+import json
+import logging
+import select
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db   import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+ORDER_CREATED        = 'order.created'
+ORDER_STATUS_CHANGED = 'order.status_changed'
+ORDER_CANCELLED      = 'order.cancelled'
+
+NOTIFY_CHANNEL = 'icecream_order_events'
+
+# pg_notify payloads are capped at 8000 bytes; larger events drop the order body
+_MAX_NOTIFY_PAYLOAD = 7900
+
+
+class Event:
+    __slots__ = ('id', 'type', 'business_id', 'data')
+
+    def __init__(self, id, type, business_id, data):
+        self.id          = id
+        self.type        = type
+        self.business_id = business_id
+        self.data        = data
+
+    def to_json(self):
+        return json.dumps({
+            'id':          self.id,
+            'type':        self.type,
+            'business_id': self.business_id,
+            'data':        self.data,
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, raw):
+        payload = json.loads(raw)
+        return cls(payload['id'], payload['type'], payload['business_id'], payload['data'])
+
+    def to_sse(self):
+        return f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n'
+
+
+_id_lock = threading.Lock()
+_last_id = 0
+
+
+def _next_event_id():
+    """Microsecond timestamp, made strictly increasing within this process."""
+    global _last_id
+    with _id_lock:
+        _last_id = max(_last_id + 1, time.time_ns() // 1000)
+        return _last_id
+
+
+# ------------------------------------------------------------------
+# In-process broker
+# ------------------------------------------------------------------
+
+class _Subscriber:
+    __slots__ = ('loop', 'queue', 'business_id', 'overflowed')
+
+    def __init__(self, loop, business_id, max_queue):
+        self.loop        = loop
+        self.queue       = asyncio.Queue(maxsize=max_queue)
+        self.business_id = business_id
+        self.overflowed  = False
+
+    def wants(self, event):
+        return self.business_id is None or self.business_id == event.business_id
+
+    def deliver(self, event):
+        # runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a client this far behind reconnects and resumes from its Last-Event-ID
+            self.overflowed = True
+
+
+class EventBroker:
+    """
+    Fans events out to the asyncio queues of connected streams. publish() is
+    thread-safe and may be called from sync views or the listener thread.
+    """
+
+    def __init__(self, history_size=1000, max_queue=256):
+        self._lock        = threading.Lock()
+        self._history     = deque(maxlen=history_size)
+        self._history_ids = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._max_queue   = max_queue
+
+    def publish(self, event):
+        with self._lock:
+            if not self._history_ids or event.id > self._history_ids[-1]:
+                self._history.append(event)
+                self._history_ids.append(event.id)
+            else:
+                # events relayed from other processes can arrive slightly out of order
+                if len(self._history) == self._history.maxlen:
+                    self._history.popleft()
+                    self._history_ids.popleft()
+                index = bisect.bisect_right(self._history_ids, event.id)
+                self._history.insert(index, event)
+                self._history_ids.insert(index, event.id)
+            subscribers = [s for s in self._subscribers if s.wants(event)]
+
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                pass   # loop already closed, the stream is going away
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    async def stream(self, business_id=None, last_event_id=None, heartbeat=15.0):
+        """
+        Yields matching events as they are published, starting with the buffered
+        ones newer than last_event_id. Yields None every `heartbeat` seconds of
+        silence so the caller can send a keep-alive.
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop(), business_id, self._max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            backlog = [
+                e for e in self._history
+                if last_event_id is not None and e.id > last_event_id and subscriber.wants(e)
+            ]
+
+        sent_ids = {event.id for event in backlog}
+        try:
+            for event in backlog:
+                yield event
+
+            while not subscriber.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event.id not in sent_ids:   # may already have gone out with the backlog
+                    yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+broker = EventBroker(
+    history_size=getattr(settings, 'ORDER_EVENTS_HISTORY', 1000),
+)
+
+
+# ------------------------------------------------------------------
+# Postgres LISTEN / NOTIFY relay
+# ------------------------------------------------------------------
+
+class PostgresListener(threading.Thread):
+    """Background thread relaying NOTIFY payloads into the local broker."""
+
+    def __init__(self, alias='default'):
+        super().__init__(name='order-events-listener', daemon=True)
+        self.alias = alias
+
+    def run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('Order event listener lost its connection, reconnecting')
+                time.sleep(2)
+
+    def _listen(self):
+        # a dedicated connection, never one borrowed from the pool: it is held
+        # for the life of the process
+        wrapper = connections[self.alias]
+        conn    = wrapper.Database.connect(**wrapper.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+            if hasattr(conn, 'poll'):
+                self._relay_psycopg2(conn)
+            else:
+                self._relay_psycopg(conn)
+        finally:
+            conn.close()
+
+    def _relay_psycopg(self, conn):
+        while True:
+            # the timeout bounds how long a dead connection can go unnoticed
+            for notify in conn.notifies(timeout=30):
+                broker.publish(Event.from_json(notify.payload))
+            conn.execute('SELECT 1')
+
+    def _relay_psycopg2(self, conn):
+        while True:
+            if select.select([conn], [], [], 30) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                broker.publish(Event.from_json(notify.payload))
+
+
+_listener_lock = threading.Lock()
+_listener      = None
+
+
+def backend():
+    configured = getattr(settings, 'ORDER_EVENTS_BACKEND', 'auto')
+    if configured == 'auto':
+        return 'postgres' if connections['default'].vendor == 'postgresql' else 'memory'
+    return configured
+
+
+def ensure_listener():
+    """Starts this process's LISTEN thread the first time a stream opens."""
+    global _listener
+    if backend() != 'postgres':
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = PostgresListener()
+            _listener.start()
+
+
+# ------------------------------------------------------------------
+# Publishing
+# ------------------------------------------------------------------
+
+def _notify_payload(event):
+    payload = event.to_json()
+    if len(payload.encode()) > _MAX_NOTIFY_PAYLOAD:
+        event   = Event(event.id, event.type, event.business_id, {
+            k: v for k, v in event.data.items() if k != 'order'
+        })
+        payload = event.to_json()
+    return payload
+
+
+def _send(events):
+    if backend() != 'postgres':
+        for event in events:
+            broker.publish(event)
+        return
+
+    with connections['default'].cursor() as cursor:
+        for event in events:
+            cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, _notify_payload(event)])
+
+
+def publish_order_event(event_type, order, order_data=None, **extra):
+    """
+    Queues an order event for delivery once the current transaction commits.
+    Pass the already-serialized order as order_data to avoid serializing twice.
+    """
+    if order_data is None:
+        from .serializers import OrderSerializer
+        order_data = OrderSerializer(order).data
+    return publish_order_events(event_type, [(order, order_data)], **extra)[0]
+
+
+def publish_order_events(event_type, orders, **extra):
+    """
+    publish_order_event() for many (order, order_data) pairs, sent together
+    once the transaction commits. Returns the events.
+    """
+    events = [
+        Event(_next_event_id(), event_type, order.business_id, {
+            'order_id':    order.id,
+            'business_id': order.business_id,
+            'status':      order.status,
+            'order':       order_data,
+            **extra,
+        })
+        for order, order_data in orders
+    ]
+    # robust: the orders are committed by now, so a failed notify is logged,
+    # not turned into an error response for a write that succeeded
+    transaction.on_commit(lambda: _send(events), robust=True)
+    return events
@@ -0,0 +1,105 @@
+"""
+Idempotency-Key support for POST /api/orders/place.
+
+Usage inside a view (the whole block must run in one transaction so the key
+row, the order and the stored response commit or roll back together):
+
+    with transaction.atomic():
+        record, replay = idempotency.claim(user, key, fingerprint)
+        if replay is not None:
+            return replay
+        ...create the order...
+        idempotency.store(record, response)
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf  import settings
+from django.db    import IntegrityError, transaction
+from django.utils import timezone
+
+from rest_framework          import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+HEADER     = 'Idempotency-Key'
+MAX_LENGTH = 255
+
+
+def ttl():
+    return timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def fingerprint(payload, upload=None):
+    """sha256 of the canonical JSON payload, plus the uploaded file's bytes if any."""
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode())
+    if upload is not None:
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        upload.seek(0)
+    return digest.hexdigest()
+
+
+def claim(user, key, request_fingerprint):
+    """
+    Inserts the key row, or finds the one a previous attempt committed.
+
+    Returns (record, None) when this request owns the key and should proceed,
+    or (None, Response) when the caller must return that response as-is.
+    On Postgres a concurrent attempt with the same key blocks on the unique
+    index until the first one commits, then replays its response.
+    """
+    IdempotencyKey.objects.filter(
+        user=user, key=key, created_at__lt=timezone.now() - ttl(),
+    ).delete()
+
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                user=user, key=key, fingerprint=request_fingerprint,
+            )
+        return record, None
+    except IntegrityError:
+        existing = IdempotencyKey.objects.get(user=user, key=key)
+
+    if existing.fingerprint != request_fingerprint:
+        return None, Response(
+            {'error': f'{HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if existing.status_code is None:
+        return None, Response(
+            {'error': 'A request with this Idempotency-Key is still being processed.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    response = Response(existing.response_body, status=existing.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return None, response
+
+
+def store(record, response):
+    """Saves the response that replays of this key will return."""
+    record.status_code   = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=['status_code', 'response_body'])
+    return response
+
+
+def prune(batch_size=1000):
+    """Deletes expired keys in bounded batches. Returns the number deleted."""
+    expired = (
+        IdempotencyKey.objects
+        .filter(created_at__lt=timezone.now() - ttl())
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    deleted = 0
+    while True:
+        ids = list(expired[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,149 @@
+"""
+Invoice rendering, kept free of Django imports: invoices.py runs
+render_to_file() in spawned worker processes, which only import this module.
+
+The layout mirrors the receipt the order page prints in the browser.
+"""
+import os
+import tempfile
+from datetime import datetime
+from html     import escape
+
+try:
+    import weasyprint
+except ImportError:   # optional, only needed for PDF invoices
+    weasyprint = None
+
+
+# bump whenever the markup changes so cached invoices are rendered again
+TEMPLATE_VERSION = 1
+
+FORMATS = ('html', 'pdf')
+
+_STYLE = """
+  * { box-sizing: border-box; margin: 0; padding: 0; }
+  body { font-family: 'Segoe UI', Arial, sans-serif; background: #fff; color: #0d2333; padding: 40px; font-size: 13px; }
+  .invoice-wrap { max-width: 680px; margin: 0 auto; }
+  .header { display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 36px; }
+  .brand-text h1 { font-size: 22px; font-weight: 800; color: #2E7EAA; letter-spacing: -0.02em; }
+  .brand-text p { font-size: 11px; color: #8ba0b2; margin-top: 3px; }
+  .invoice-meta { text-align: right; }
+  .inv-label { font-size: 10px; text-transform: uppercase; letter-spacing: 0.1em; color: #8ba0b2; }
+  .inv-num { font-size: 18px; font-weight: 800; color: #0d2333; }
+  .inv-date { font-size: 11px; color: #4a6175; margin-top: 4px; }
+  .divider { border: none; border-top: 1.5px solid #daeaf6; margin: 0 0 24px; }
+  .bill-to h3 { font-size: 10px; text-transform: uppercase; letter-spacing: 0.1em; color: #8ba0b2; margin-bottom: 6px; }
+  .bill-to p { font-size: 13px; color: #0d2333; line-height: 1.6; }
+  table { width: 100%; border-collapse: collapse; margin: 24px 0; }
+  thead { background: #2E7EAA; }
+  thead th { color: white; text-align: left; padding: 10px 12px; font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.08em; }
+  tbody tr { border-bottom: 1px solid #daeaf6; }
+  tbody td { padding: 10px 12px; font-size: 13px; }
+  tfoot td { padding: 12px; font-weight: 700; }
+  .num { text-align: right; }
+  .total-row td { border-top: 2px solid #2E7EAA; font-size: 15px; font-weight: 800; color: #2E7EAA; }
+  .pay-status { display: inline-block; padding: 6px 14px; border-radius: 100px; font-size: 11px; font-weight: 700; margin: 0 0 20px; }
+  .paid { background: rgba(34,197,94,0.12); color: #15803d; border: 1px solid rgba(34,197,94,0.3); }
+  .unpaid { background: rgba(245,158,11,0.12); color: #b45309; border: 1px solid rgba(245,158,11,0.3); }
+  .footer { margin-top: 40px; text-align: center; font-size: 11px; color: #8ba0b2; }
+  .footer strong { color: #2E7EAA; }
+"""
+
+
+def _money(value):
+    return f'Rs. {float(value):.2f}'
+
+
+def render_html(invoice):
+    """
+    Renders one invoice. `invoice` is the plain dict built by
+    invoices.invoice_data(), so it can be pickled to a worker process.
+    """
+    ordered  = datetime.fromisoformat(invoice['order_date'])
+    business = invoice['business']
+    rows     = ''.join(
+        f'<tr><td>{escape(item["item_name"])}</td>'
+        f'<td class="num">{item["quantity"]}</td>'
+        f'<td class="num">{_money(item["price"])}</td>'
+        f'<td class="num">{_money(item["subtotal"])}</td></tr>'
+        for item in invoice['items']
+    )
+    bill_to  = ''.join(
+        f'<p>{escape(value)}</p>'
+        for value in (business['contact_person'], business['phone'], business['address'])
+        if value
+    )
+    payment  = (
+        '<div class="pay-status paid">Payment Confirmed by Customer</div>'
+        if invoice['payment_done'] else
+        '<div class="pay-status unpaid">Payment Pending</div>'
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8"/>
+<title>Invoice #{invoice['id']} - Sheetal Ice Cream</title>
+<style>{_STYLE}</style>
+</head>
+<body>
+<div class="invoice-wrap">
+  <div class="header">
+    <div class="brand-text">
+      <h1>Sheetal Ice Cream</h1>
+      <p>Thapathali, Kathmandu, Nepal</p>
+      <p>sheetal.icecream@gmail.com</p>
+    </div>
+    <div class="invoice-meta">
+      <div class="inv-label">Invoice</div>
+      <div class="inv-num">#{invoice['id']}</div>
+      <div class="inv-date">{ordered.day} {ordered:%B %Y}</div>
+      <div class="inv-date">{escape(invoice['status'])}</div>
+    </div>
+  </div>
+  <hr class="divider"/>
+  <div class="bill-to">
+    <h3>Bill To</h3>
+    <p><strong>{escape(business['name'])}</strong></p>
+    {bill_to}
+  </div>
+  <table>
+    <thead>
+      <tr><th>Item</th><th class="num">Qty</th><th class="num">Unit Price</th><th class="num">Subtotal</th></tr>
+    </thead>
+    <tbody>{rows}</tbody>
+    <tfoot>
+      <tr class="total-row"><td colspan="3">Total Amount</td><td class="num">{_money(invoice['total_amount'])}</td></tr>
+    </tfoot>
+  </table>
+  {payment}
+  <div class="footer">
+    <p>Thank you for your order! <strong>Sheetal Ice Cream</strong> loves serving you.</p>
+    <p style="margin-top:6px">This is a computer generated invoice.</p>
+  </div>
+</div>
+</body>
+</html>"""
+
+
+def render(invoice, fmt):
+    html = render_html(invoice)
+    if fmt == 'pdf':
+        if weasyprint is None:
+            raise RuntimeError('PDF invoices need the weasyprint package.')
+        return weasyprint.HTML(string=html).write_pdf()
+    return html.encode()
+
+
+def render_to_file(invoice, fmt, path):
+    """Renders into `path` atomically, so readers never see a partial file. Returns path."""
+    content   = render(invoice, fmt)
+    fd, tmp   = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
@@ -0,0 +1,265 @@
+"""
+Server-side invoices, one order at a time or whole batches at month end.
+
+Rendered invoices are cached on disk as INVOICE_CACHE_DIR/<order id>-<hash>.<format>,
+where the hash covers everything printed on the invoice (items, status,
+total, payment state, bill-to details). An unchanged order is never rendered
+twice; a changed one gets a new file and the stale one is removed.
+
+Batches render their cache misses in a process pool of INVOICE_RENDER_WORKERS
+spawned processes (fork is unsafe inside threaded gunicorn workers) and are
+returned as a ZIP archive built while it streams.
+"""
+import glob
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import zipfile
+from collections        import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+from . import invoice_render, sharding
+from .invoice_render import FORMATS
+from .models         import Order, OrderItem
+
+
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'pdf':  'application/pdf',
+}
+
+
+def pdf_available():
+    return invoice_render.weasyprint is not None
+
+
+# ------------------------------------------------------------------
+# Invoice data
+# ------------------------------------------------------------------
+
+def invoice_data(order_ids):
+    """Plain, picklable invoice dicts for the given orders, in id order. Two queries."""
+    order_ids = list(order_ids)
+    items     = defaultdict(list)
+    for order_id, name, quantity, price in (
+        OrderItem.objects
+        .filter(order_id__in=order_ids)
+        .order_by('id')
+        .values_list('order_id', 'item_name', 'quantity', 'price')
+    ):
+        items[order_id].append({
+            'item_name': name,
+            'quantity':  quantity,
+            'price':     str(price),
+            'subtotal':  str(price * quantity),
+        })
+
+    return [
+        {
+            'id':           row['id'],
+            'order_date':   row['order_date'].isoformat(),
+            'status':       row['status'],
+            'total_amount': str(row['total_amount']),
+            'payment_done': row['payment_done'],
+            'business':     {
+                'name':           row['business__name'],
+                'contact_person': row['business__contact_person'],
+                'phone':          row['business__phone'],
+                'address':        row['business__address'],
+            },
+            'items':        items[row['id']],
+        }
+        for row in (
+            Order.objects
+            .filter(id__in=order_ids)
+            .order_by('id')
+            .values(
+                'id', 'order_date', 'status', 'total_amount', 'payment_done',
+                'business__name', 'business__contact_person', 'business__phone', 'business__address',
+            )
+        )
+    ]
+
+
+def content_hash(invoice):
+    payload = json.dumps([invoice_render.TEMPLATE_VERSION, invoice], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def filename(invoice, fmt):
+    return f'invoice-{invoice["id"]}.{fmt}'
+
+
+# ------------------------------------------------------------------
+# Disk cache
+# ------------------------------------------------------------------
+
+def cache_dir():
+    path = settings.INVOICE_CACHE_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(invoice, fmt):
+    return os.path.join(cache_dir(), f'{invoice["id"]}-{content_hash(invoice)}.{fmt}')
+
+
+def _drop_stale(invoice, fmt, current):
+    for path in glob.glob(os.path.join(cache_dir(), f'{invoice["id"]}-*.{fmt}')):
+        if path != current:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass   # removed by a concurrent render
+
+
+# ------------------------------------------------------------------
+# Rendering
+# ------------------------------------------------------------------
+
+def _check_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown invoice format {fmt!r}.')
+    if fmt == 'pdf' and not pdf_available():
+        raise ValueError('PDF invoices need the weasyprint package.')
+
+
+def render_order(order_id, fmt='html'):
+    """Returns the path of the rendered invoice of one order, or None if it does not exist."""
+    _check_format(fmt)
+    invoices = invoice_data([order_id])
+    if not invoices:
+        return None
+    invoice = invoices[0]
+    path    = cache_path(invoice, fmt)
+    if not os.path.exists(path):
+        invoice_render.render_to_file(invoice, fmt, path)
+        _drop_stale(invoice, fmt, path)
+    return path
+
+
+def _pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def render_batch(order_ids, fmt='html', workers=None, chunk_size=500):
+    """
+    Yields (filename, path) for every order, in id order, rendering cache
+    misses in a process pool. Invoice data is loaded chunk_size orders at a
+    time, so memory stays flat for any batch size.
+    """
+    _check_format(fmt)
+    workers   = workers or settings.INVOICE_RENDER_WORKERS
+    threshold = settings.INVOICE_POOL_THRESHOLD
+    order_ids = sorted(order_ids)
+    pool      = None
+    try:
+        for start in range(0, len(order_ids), chunk_size):
+            invoices = invoice_data(order_ids[start:start + chunk_size])
+            paths    = [cache_path(invoice, fmt) for invoice in invoices]
+            misses   = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+
+            if len(misses) >= threshold and workers > 1:
+                if pool is None:
+                    pool = _pool(workers)
+                rendered = pool.map(
+                    invoice_render.render_to_file,
+                    [invoices[i] for i in misses],
+                    [fmt] * len(misses),
+                    [paths[i] for i in misses],
+                    chunksize=max(1, len(misses) // (workers * 4)),
+                )
+            else:
+                rendered = (invoice_render.render_to_file(invoices[i], fmt, paths[i]) for i in misses)
+
+            # map() hands results back in order, so earlier invoices stream out
+            # while later ones are still rendering
+            done    = iter(rendered)
+            missing = set(misses)
+            for i, (invoice, path) in enumerate(zip(invoices, paths)):
+                if i in missing:
+                    next(done)
+                    _drop_stale(invoice, fmt, path)
+                yield filename(invoice, fmt), path
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def batch_order_ids(business_id=None, start=None, end=None, statuses=(Order.Status.CONFIRMED,)):
+    """Ids of the orders a batch covers: dates are inclusive local dates."""
+    orders = Order.objects.filter(status__in=statuses)
+    if business_id is not None:
+        orders = orders.filter(business_id=business_id)
+    if start is not None:
+        orders = orders.filter(order_date__date__gte=start)
+    if end is not None:
+        orders = orders.filter(order_date__date__lte=end)
+    return list(orders.order_by('id').values_list('id', flat=True))
+
+
+def shard_batches(business_id=None, start=None, end=None, statuses=(Order.Status.CONFIRMED,)):
+    """
+    batch_order_ids() split by the shard the orders live on, as [(alias, ids)];
+    a single (None, ids) while sharding is off.
+    """
+    if not sharding.enabled():
+        return [(None, batch_order_ids(business_id, start, end, statuses))]
+    if business_id is None:
+        shards = sharding.each_shard()
+    else:
+        shards = (alias for alias, _ in sharding.each_shard_of([business_id]))
+    return [(alias, batch_order_ids(business_id, start, end, statuses)) for alias in shards]
+
+
+def render_batches(batches, fmt='html', workers=None):
+    """
+    render_batch() over shard_batches(), each batch read on its shard however
+    long after the call it is drained (e.g. by a streaming response).
+    """
+    return itertools.chain.from_iterable(
+        sharding.iterate_on(alias, render_batch(order_ids, fmt, workers))
+        for alias, order_ids in batches
+        if order_ids
+    )
+
+
+# ------------------------------------------------------------------
+# Streaming ZIP
+# ------------------------------------------------------------------
+
+class _ChunkBuffer:
+    """Write-only file object that zipfile writes into; drained after every member."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(members, fmt):
+    """
+    Yields a ZIP archive of (name, path) members chunk by chunk. PDFs are
+    already compressed and are stored as they are.
+    """
+    compression = zipfile.ZIP_STORED if fmt == 'pdf' else zipfile.ZIP_DEFLATED
+    buffer      = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=compression) as archive:
+        for name, path in members:
+            archive.write(path, arcname=name)
+            yield buffer.drain()
+    yield buffer.drain()
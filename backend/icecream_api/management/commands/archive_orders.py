@@ -0,0 +1,120 @@
+from datetime import datetime, time, timedelta
+
+from django.conf                 import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db                   import transaction
+from django.utils                import timezone
+
+from icecream_api import counters, sharding
+from icecream_api.models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves closed (Completed / Cancelled) orders older than a cutoff from '
+        '`orders` / `order_items` into `orders_archive` / `order_items_archive`, '
+        'one batch per transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Archive orders older than this many days '
+                 '(default: settings.ORDER_ARCHIVE_AFTER_DAYS).',
+        )
+        parser.add_argument(
+            '--before', default=None,
+            help='Archive orders placed before this date (YYYY-MM-DD). Overrides --days.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many orders would be archived.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff     = self._cutoff(options)
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        candidates = Order.objects.filter(
+            status__in=Order.CLOSED_STATUSES,
+            order_date__lt=cutoff,
+        )
+
+        if options['dry_run']:
+            count = sum(candidates.count() for _ in sharding.each_shard())
+            self.stdout.write(f'{count} orders placed before {cutoff:%Y-%m-%d} would be archived.')
+            return
+
+        moved = 0
+        for _ in sharding.each_shard():   # an order and its archive copy share a shard
+            while True:
+                count = self._archive_batch(candidates, batch_size)
+                if not count:
+                    break
+                moved += count
+                self.stdout.write(f'  archived {moved} orders...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} orders placed before {cutoff:%Y-%m-%d}.'
+        ))
+
+    def _cutoff(self, options):
+        if options['before']:
+            try:
+                day = datetime.strptime(options['before'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format.')
+            return timezone.make_aware(datetime.combine(day, time.min))
+
+        days = options['days']
+        if days is None:
+            days = settings.ORDER_ARCHIVE_AFTER_DAYS
+        return timezone.now() - timedelta(days=days)
+
+    def _archive_batch(self, candidates, batch_size):
+        with transaction.atomic(), sharding.atomic():
+            # skip rows another archiver (or a status update) currently holds
+            ids = list(
+                candidates
+                .select_for_update(skip_locked=True)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+
+            ArchivedOrder.objects.bulk_create(
+                ArchivedOrder(
+                    id                 = order.id,
+                    business_id        = order.business_id,
+                    order_date         = order.order_date,
+                    status             = order.status,
+                    total_amount       = order.total_amount,
+                    email_sent         = order.email_sent,
+                    payment_done       = order.payment_done,
+                    payment_screenshot = order.payment_screenshot.name or None,
+                )
+                for order in Order.objects.filter(id__in=ids)
+            )
+            ArchivedOrderItem.objects.bulk_create(
+                (
+                    ArchivedOrderItem(
+                        id        = item.id,
+                        order_id  = item.order_id,
+                        item_name = item.item_name,
+                        quantity  = item.quantity,
+                        price     = item.price,
+                    )
+                    for item in OrderItem.objects.filter(order_id__in=ids)
+                ),
+                batch_size=1000,
+            )
+
+            # cascades to items and search documents, and leaves tombstones for ?since= feeds;
+            # business counters include archived orders, so they stay as they are
+            with counters.paused():
+                Order.objects.filter(id__in=ids).delete()
+            return len(ids)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from icecream_api        import sharding, snapshots
+from icecream_api.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Builds the denormalized snapshot of orders that do not have one yet '
+        '(run once after migrating), or of every order with --all.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help='Rebuild existing snapshots too.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        orders = Order.objects.all()
+        if not options['all']:
+            orders = orders.filter(snapshot__isnull=True)
+        order_ids = orders.order_by('id').values_list('id', flat=True)
+
+        built = 0
+        for _ in sharding.each_shard():
+            last_id = 0
+            while True:
+                batch = list(order_ids.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                built  += snapshots.refresh_orders(batch, touch=False)   # same data, nothing for change feeds
+                last_id = batch[-1]
+                self.stdout.write(f'  built {built} snapshots...')
+
+        self.stdout.write(self.style.SUCCESS(f'Built {built} order snapshots.'))
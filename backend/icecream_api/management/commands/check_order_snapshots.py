@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from icecream_api        import sharding, snapshots
+from icecream_api.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares every order snapshot with the orders, businesses and '
+        'order_items tables and reports orders whose snapshot is missing or '
+        'stale. --fix rebuilds them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, default=None, help='Only orders of this business id.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--fix', action='store_true', help='Rebuild missing and stale snapshots.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        orders = Order.objects.all()
+        if options['business'] is not None:
+            orders = orders.filter(business_id=options['business'])
+        order_ids = orders.order_by('id').values_list('id', flat=True)
+
+        checked = 0
+        missing = 0
+        stale   = 0
+        for _ in sharding.each_shard():
+            last_id = 0
+            while True:
+                batch = list(order_ids.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                batch_missing, batch_stale = snapshots.check(batch)
+                if batch_stale and options['verbosity'] >= 2:
+                    self.stdout.write(f'  stale: {", ".join(map(str, batch_stale))}')
+                if options['fix']:
+                    snapshots.refresh_orders(batch_missing + batch_stale)
+                checked += len(batch)
+                missing += len(batch_missing)
+                stale   += len(batch_stale)
+                last_id  = batch[-1]
+
+        summary = f'Checked {checked} orders: {missing} without a snapshot, {stale} stale.'
+        if options['fix'] and missing + stale:
+            self.stdout.write(self.style.SUCCESS(f'{summary} Rebuilt {missing + stale}.'))
+        elif stale:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
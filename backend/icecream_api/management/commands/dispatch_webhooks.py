@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from icecream_api        import webhooks
+from icecream_api.models import WebhookDelivery
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker that delivers queued order events to the configured webhook '
+        'endpoints, several events per signed POST over kept-alive connections, '
+        'retrying failures with exponential backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Deliveries claimed per round.')
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Seconds a claimed batch stays locked before another worker may retry it.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Seconds to wait when the outbox is empty.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the outbox once and exit instead of polling forever.',
+        )
+
+    def handle(self, *args, **options):
+        pool = webhooks.ConnectionPool()
+        try:
+            while True:
+                deliveries = WebhookDelivery.claim_batch(options['batch_size'], options['lease'])
+                if not deliveries:
+                    if options['once']:
+                        return
+                    time.sleep(options['sleep'])
+                    continue
+
+                sent, failed = webhooks.deliver(deliveries, pool)
+                self.stdout.write(f'Delivered {sent} events, {failed} failed.')
+        finally:
+            pool.close()
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from icecream_api import standing
+from icecream_api.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Places the day's due standing orders as Pending orders, in chunked "
+        'bulk inserts. Safe to re-run: a standing order is placed at most once per day.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', default=None, help='Day to generate for, YYYY-MM-DD (default: today).')
+        parser.add_argument(
+            '--admin', default=None,
+            help='Username the admin log entries are recorded under (default: the first admin).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help='Standing orders per transaction.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many standing orders are due.',
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be a date in YYYY-MM-DD format.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        if options['dry_run']:
+            from django.utils import timezone
+            day = day or timezone.localdate()
+            self.stdout.write(f'{len(standing.due_ids(day))} standing orders are due on {day:%Y-%m-%d}.')
+            return
+
+        admins = User.objects.filter(role=User.Role.ADMIN).order_by('id')
+        if options['admin']:
+            admins = admins.filter(username=options['admin'])
+        admin = admins.first()
+        if options['admin'] and admin is None:
+            raise CommandError(f'No admin named {options["admin"]!r}.')
+
+        orders, shortages = standing.generate(day, admin_user=admin, chunk_size=options['chunk_size'])
+        for standing_id, shortage in sorted(shortages.items()):
+            self.stdout.write(self.style.WARNING(f'Skipped standing order #{standing_id}: {shortage}'))
+        self.stdout.write(self.style.SUCCESS(f'Placed {len(orders)} standing orders.'))
+        if shortages:
+            self.stdout.write(f'{len(shortages)} skipped for lack of stock; they stay due, so re-run after restocking.')
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from icecream_api import onboarding
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates businesses and their customer logins from a CSV or JSON file '
+        '(columns: ' + ','.join(onboarding.COLUMNS) + '). Invalid rows are '
+        'reported and skipped; the rest are created in one transaction. '
+        'Unlike the upload endpoint, there is no ONBOARDING_MAX_ROWS limit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row, or a JSON list of rows.')
+        parser.add_argument('--format', dest='fmt', default=None, choices=('csv', 'json'), help='Default: from the file extension.')
+        parser.add_argument('--workers', type=int, default=None, help='Hashing processes (default: ONBOARDING_HASH_WORKERS).')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the rows.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt  = options['fmt'] or ('json' if path.lower().endswith('.json') else 'csv')
+        try:
+            with open(path, 'rb') as fh:
+                data = fh.read()
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+
+        try:
+            if fmt == 'json':
+                try:
+                    rows = onboarding.parse_json(json.loads(data), capped=False)
+                except ValueError:
+                    raise onboarding.OnboardingError('File is not valid JSON.')
+            else:
+                rows = onboarding.parse_csv(data, capped=False)
+        except onboarding.OnboardingError as exc:
+            raise CommandError(str(exc))
+
+        results = onboarding.onboard(rows, workers=options['workers'], dry_run=options['dry_run'])
+        for result in results:
+            if result['status'] == 'error':
+                self.stdout.write(f'Row {result["row"]} ({result["username"] or "-"}): {result["error"]}')
+
+        done   = sum(1 for result in results if result['status'] != 'error')
+        failed = len(results) - done
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{done} rows valid, {failed} invalid (dry run, nothing created).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Created {done} businesses, skipped {failed} rows.'))
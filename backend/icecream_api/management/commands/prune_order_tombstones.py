@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from icecream_api import sharding, sync
+
+
+class Command(BaseCommand):
+    help = 'Deletes order tombstones older than ORDER_TOMBSTONE_RETENTION_DAYS, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = sum(sync.prune_tombstones(batch_size=options['batch_size']) for _ in sharding.each_shard())
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} order tombstones.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from icecream_api import revocation
+
+
+class Command(BaseCommand):
+    help = 'Deletes revoked-token records whose tokens have expired anyway, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = revocation.prune(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revoked tokens.'))
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils                import timezone
+
+from icecream_api import admin_logs
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes admin log entries older than ADMIN_LOG_RETENTION_DAYS in batches, '
+        'after counting them into monthly per-admin, per-action summaries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--before', default=None, help='Purge entries before YYYY-MM-DD instead of the retention cutoff.')
+
+    def handle(self, *args, **options):
+        before = None
+        if options['before']:
+            try:
+                before = timezone.make_aware(datetime.strptime(options['before'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format.')
+        elif admin_logs.cutoff() is None:
+            self.stdout.write('ADMIN_LOG_RETENTION_DAYS is 0, nothing to purge.')
+            return
+
+        deleted = admin_logs.purge(batch_size=options['batch_size'], before=before)
+        self.stdout.write(self.style.SUCCESS(f'Compacted and deleted {deleted} admin log entries.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from icecream_api import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the denormalized order counters on businesses from orders '
+        'and orders_archive, and reports every business whose stored values were wrong.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, action='append', default=None,
+                            help='Only this business id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drifted businesses, do not fix them. Exits 1 when any are found.')
+
+    def handle(self, *args, **options):
+        wrong = counters.rebuild(
+            options['business'],
+            batch_size=options['batch_size'],
+            dry_run=options['check'],
+        )
+        if wrong:
+            self.stdout.write(f'  drifted: {", ".join(map(str, wrong))}')
+
+        if options['check']:
+            self.stdout.write(f'{len(wrong)} businesses have counters that do not match their orders.')
+            if wrong:
+                raise SystemExit(1)
+            return
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the counters of {len(wrong)} businesses.'))
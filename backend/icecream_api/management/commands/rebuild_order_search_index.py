@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from icecream_api        import search, sharding
+from icecream_api.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the order search documents (run once after migrating, or after bulk imports).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        order_ids = Order.objects.order_by('id').values_list('id', flat=True)
+        indexed   = 0
+        for _ in sharding.each_shard():
+            last_id = 0
+            while True:
+                batch = list(order_ids.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                search.index_orders(batch)
+                indexed += len(batch)
+                last_id  = batch[-1]
+                self.stdout.write(f'  indexed {indexed} orders...')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} orders.'))
@@ -0,0 +1,90 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models            import Max, Min
+from django.utils                import timezone
+
+from icecream_api import caching, counters, sharding
+from icecream_api.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Finds orders whose total_amount no longer matches the sum of their '
+        'items (e.g. after editing items in the Django admin) and fixes them. '
+        'Works through the orders table in id windows, one UPDATE per window.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, default=None, help='Only orders of this business id.')
+        parser.add_argument('--from', dest='date_from', default=None, help='Only orders placed on or after YYYY-MM-DD.')
+        parser.add_argument('--to',   dest='date_to',   default=None, help='Only orders placed on or before YYYY-MM-DD.')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Order ids per window.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report mismatches, do not fix them.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        orders = Order.objects.all()
+        if options['business'] is not None:
+            orders = orders.filter(business_id=options['business'])
+        if options['date_from']:
+            orders = orders.filter(order_date__gte=self._day_start(options['date_from'], '--from'))
+        if options['date_to']:
+            orders = orders.filter(order_date__lt=self._day_start(options['date_to'], '--to') + timedelta(days=1))
+
+        dry_run    = options['dry_run']
+        mismatched = 0
+        businesses = set()
+        found      = False
+        for _ in sharding.each_shard():
+            bounds = orders.aggregate(low=Min('id'), high=Max('id'))
+            if bounds['low'] is None:
+                continue
+            found = True
+            for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+                window = list(
+                    orders
+                    .filter(id__gte=low, id__lt=low + batch_size)
+                    .total_mismatches()
+                    .values_list('id', 'business_id')
+                )
+                if not window:
+                    continue
+
+                ids = [order_id for order_id, _ in window]
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'  mismatched: {", ".join(map(str, ids))}')
+                if not dry_run:
+                    Order.objects.filter(id__in=ids).recalculate_totals()
+                    businesses.update(business_id for _, business_id in window)
+                mismatched += len(ids)
+                if options['verbosity'] >= 1:
+                    self.stdout.write(f'  ids {low}..{low + batch_size - 1}: {len(ids)} mismatched')
+
+        if not found:
+            self.stdout.write('No orders to check.')
+            return
+
+        if dry_run:
+            self.stdout.write(f'{mismatched} orders have a total that does not match their items.')
+            return
+
+        if mismatched:
+            # the UPDATEs send no post_save, so invalidate what the signals would have
+            caching.bump_analytics_version()
+            caching.bump_business_versions(*businesses)
+            counters.rebuild(businesses)
+        self.stdout.write(self.style.SUCCESS(f'Fixed the total of {mismatched} orders.'))
+
+    def _day_start(self, value, flag):
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{flag} must be a date in YYYY-MM-DD format.')
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from icecream_api import invoices
+from icecream_api.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders the invoices of every matching order (default: confirmed '
+        'orders) into one ZIP archive. Unchanged invoices come from the '
+        'invoice cache; the rest are rendered in a process pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the ZIP archive to write.')
+        parser.add_argument('--business', type=int, default=None, help='Only orders of this business id.')
+        parser.add_argument('--from', dest='date_from', default=None, help='Only orders placed on or after YYYY-MM-DD.')
+        parser.add_argument('--to',   dest='date_to',   default=None, help='Only orders placed on or before YYYY-MM-DD.')
+        parser.add_argument(
+            '--status', action='append', default=None, choices=[c[0] for c in Order.Status.choices],
+            help='Order status to include (repeatable, default: Confirmed).',
+        )
+        parser.add_argument('--type', dest='fmt', default='html', choices=invoices.FORMATS)
+        parser.add_argument('--workers', type=int, default=None, help='Render processes (default: INVOICE_RENDER_WORKERS).')
+
+    def handle(self, *args, **options):
+        fmt = options['fmt']
+        if fmt == 'pdf' and not invoices.pdf_available():
+            raise CommandError('PDF invoices need the weasyprint package.')
+
+        batches = invoices.shard_batches(
+            business_id = options['business'],
+            start       = self._date(options['date_from'], '--from'),
+            end         = self._date(options['date_to'], '--to'),
+            statuses    = tuple(options['status'] or (Order.Status.CONFIRMED,)),
+        )
+        count = sum(len(order_ids) for _, order_ids in batches)
+        if not count:
+            self.stdout.write('No orders match.')
+            return
+
+        members = invoices.render_batches(batches, fmt, workers=options['workers'])
+        with open(options['output'], 'wb') as fh:
+            for chunk in invoices.stream_zip(members, fmt):
+                fh.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} invoices to {options["output"]}.'))
+
+    @staticmethod
+    def _date(value, flag):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{flag} must be a date in YYYY-MM-DD format.')
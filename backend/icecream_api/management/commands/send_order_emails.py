@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from icecream_api        import emails, sharding
+from icecream_api.models import EmailJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker that delivers queued order emails in batches over a reused SMTP '
+        'connection, retrying failures with exponential backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Seconds a claimed batch stays locked before another worker may retry it.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=5.0,
+            help='Seconds to wait when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue once and exit instead of polling forever.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # email jobs live on their order's shard: one batch per shard per round
+            claimed = 0
+            for _ in sharding.each_shard():
+                jobs = EmailJob.claim_batch(options['batch_size'], options['lease'])
+                if not jobs:
+                    continue
+                claimed += len(jobs)
+                sent, failed = emails.deliver(jobs)
+                self.stdout.write(f'Sent {sent} emails, {failed} failed.')
+
+            if not claimed:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
@@ -0,0 +1,68 @@
+"""
+Process-level runtime metrics for GET /api/admin/metrics/.
+
+Everything here describes the worker process that answers the request:
+connection pools are per process, so a deployment with N workers has N
+pools of up to DB_POOL_MAX_SIZE connections each.
+"""
+import os
+
+from django.conf import settings
+from django.db   import connections
+
+
+def _pool_stats(wrapper):
+    pool = getattr(wrapper, 'pool', None)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    return {
+        'min_size':         pool.min_size,
+        'max_size':         pool.max_size,
+        'size':             stats.get('pool_size', 0),
+        'available':        stats.get('pool_available', 0),
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests_total':   stats.get('requests_num', 0),
+        'requests_queued':  stats.get('requests_queued', 0),
+        'requests_errors':  stats.get('requests_errors', 0),   # timed out waiting for a connection
+        'wait_ms_total':    stats.get('requests_wait_ms', 0),
+        'connections_made': stats.get('connections_num', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+        'returns_bad':      stats.get('returns_bad', 0),
+    }
+
+
+def database_stats():
+    """Connection settings and, when pooling is on, live pool counters per alias."""
+    stats = {}
+    for alias in settings.DATABASES:
+        wrapper = connections[alias]
+        config  = wrapper.settings_dict
+        pool    = _pool_stats(wrapper)
+        stats[alias] = {
+            'vendor':        wrapper.vendor,
+            'pooled':        pool is not None,
+            'conn_max_age':  config.get('CONN_MAX_AGE', 0),
+            'health_checks': config.get('CONN_HEALTH_CHECKS', False),
+            'pool':          pool,
+        }
+    return stats
+
+
+def process_metrics():
+    from . import sharding
+    from .events import broker
+    from .models import EmailJob, WebhookDelivery
+
+    return {
+        'pid':           os.getpid(),
+        'databases':     database_stats(),
+        'event_streams': broker.subscriber_count(),
+        'email_queue':   sum(   # one queue per shard
+            EmailJob.objects.filter(status__in=[EmailJob.Status.PENDING, EmailJob.Status.SENDING]).count()
+            for _ in sharding.each_shard()
+        ),
+        'webhook_queue': WebhookDelivery.objects.filter(
+            status__in=[WebhookDelivery.Status.PENDING, WebhookDelivery.Status.SENDING],
+        ).count(),
+    }
@@ -0,0 +1,147 @@
+import gzip
+import re
+
+from django.conf        import settings
+from django.core.cache  import cache
+from django.utils.cache import patch_vary_headers
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens     import AccessToken
+
+from .routers import replica_aliases, use_primary
+
+try:
+    import brotli
+except ImportError:   # optional, gzip is always available
+    brotli = None
+
+
+_ENCODING_RE = re.compile(r'^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def _accepted_encodings(header):
+    """Parses an Accept-Encoding header into {encoding: q} (q=0 entries dropped)."""
+    accepted = {}
+    for part in header.split(','):
+        match = _ENCODING_RE.match(part)
+        if not match:
+            continue
+        coding, q = match.group(1).lower(), match.group(2)
+        try:
+            q = float(q) if q is not None else 1.0
+        except ValueError:
+            continue
+        if q > 0:
+            accepted[coding] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON responses above RESPONSE_COMPRESSION_MIN_SIZE bytes.
+
+    Brotli is preferred over gzip when the client accepts both and the
+    `brotli` package is installed. Streaming responses (e.g. the order event
+    stream) and already-encoded responses are passed through untouched.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size     = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level   = getattr(settings, 'RESPONSE_COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_level = getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', 4)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith('application/json'):
+            return response
+
+        # vary on the request header even if this particular body is too small
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if len(response.content) < self.min_size:
+            return response
+
+        encoding = self._negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=self.brotli_level)
+        else:
+            compressed = gzip.compress(response.content, compresslevel=self.gzip_level, mtime=0)
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length']   = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # weak etags stay valid across content-encodings, strong ones do not
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def _negotiate(self, header):
+        accepted = _accepted_encodings(header)
+        choices  = []
+        if brotli is not None and 'br' in accepted:
+            choices.append((accepted['br'], 1, 'br'))
+        if 'gzip' in accepted:
+            choices.append((accepted['gzip'], 0, 'gzip'))
+        elif '*' in accepted:
+            choices.append((accepted['*'], 0, 'gzip'))
+        if not choices:
+            return None
+        return max(choices)[2]
+
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Lets safe requests read from a replica, unless it could be stale.
+    Outside this middleware (commands, workers) reads stay on the primary.
+
+    - Non-safe requests (POST / PATCH / ...) run entirely on the primary.
+    - After a successful write, the same user's reads stay on the primary for
+      REPLICA_PIN_SECONDS (read-your-writes). The window is stored in the
+      shared cache so it holds across workers when CACHES points at one.
+
+    Does nothing unless settings.DATABASE_REPLICAS is non-empty.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        is_write = request.method not in _SAFE_METHODS
+        pin_key  = self._pin_key(request)
+        pinned   = is_write or (pin_key is not None and cache.get(pin_key) is not None)
+
+        with use_primary(pinned):
+            response = self.get_response(request)
+
+        if is_write and pin_key is not None and response.status_code < 400:
+            cache.set(pin_key, 1, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+        return response
+
+    def _pin_key(self, request):
+        """Cache key for the caller's read-your-writes window, or None if anonymous."""
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return None
+        try:
+            user_id = AccessToken(auth_header.split(' ', 1)[1]).get('user_id')
+        except TokenError:
+            return None
+        return f'replica-pin:{user_id}' if user_id is not None else None
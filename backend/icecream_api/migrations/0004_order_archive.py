@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0003_order_payment_done_order_payment_screenshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_date', models.DateTimeField(db_index=True)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Confirmed', 'Confirmed'), ('Completed', 'Completed'), ('Cancelled', 'Cancelled')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('email_sent', models.BooleanField(default=False)),
+                ('payment_done', models.BooleanField(default=False)),
+                ('payment_screenshot', models.ImageField(blank=True, null=True, upload_to='payment_screenshots/')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'orders_archive',
+                'ordering': ['-order_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('item_name', models.CharField(max_length=100)),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+            options={
+                'db_table': 'order_items_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'order_date'], name='orders_status_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='business',
+            field=models.ForeignKey(db_column='business_id', on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='icecream_api.business'),
+        ),
+        migrations.AddField(
+            model_name='archivedorderitem',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='icecream_api.archivedorder'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Backend-specific text index over order_search.document.
+# Postgres: trigram GIN index (serves ILIKE '%term%' and similarity ranking).
+# SQLite:   external-content FTS5 table kept in sync by triggers.
+
+_POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX order_search_document_trgm ON order_search USING gin (document gin_trgm_ops)',
+]
+_POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS order_search_document_trgm',
+]
+
+_SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE order_search_fts USING fts5(
+        document,
+        content='order_search',
+        content_rowid='order_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER order_search_ai AFTER INSERT ON order_search BEGIN
+        INSERT INTO order_search_fts(rowid, document) VALUES (new.order_id, new.document);
+    END""",
+    """CREATE TRIGGER order_search_ad AFTER DELETE ON order_search BEGIN
+        INSERT INTO order_search_fts(order_search_fts, rowid, document) VALUES ('delete', old.order_id, old.document);
+    END""",
+    """CREATE TRIGGER order_search_au AFTER UPDATE ON order_search BEGIN
+        INSERT INTO order_search_fts(order_search_fts, rowid, document) VALUES ('delete', old.order_id, old.document);
+        INSERT INTO order_search_fts(rowid, document) VALUES (new.order_id, new.document);
+    END""",
+]
+_SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS order_search_au',
+    'DROP TRIGGER IF EXISTS order_search_ad',
+    'DROP TRIGGER IF EXISTS order_search_ai',
+    'DROP TABLE IF EXISTS order_search_fts',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0004_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSearchDocument',
+            fields=[
+                ('order', models.OneToOneField(db_column='order_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='icecream_api.order')),
+                ('document', models.TextField()),
+                ('business', models.ForeignKey(db_column='business_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='icecream_api.business')),
+            ],
+            options={
+                'db_table': 'order_search',
+            },
+        ),
+        migrations.RunPython(
+            _run({'postgresql': _POSTGRES_FORWARD,  'sqlite': _SQLITE_FORWARD}),
+            _run({'postgresql': _POSTGRES_BACKWARD, 'sqlite': _SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0006_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField()),
+                ('business_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'order_tombstones',
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business', 'updated_at'], name='orders_business_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordertombstone',
+            index=models.Index(fields=['business_id', 'deleted_at'], name='tombstones_business_del_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0007_order_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('claim_token', models.UUIDField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('order_confirmed', 'Order confirmed')], max_length=30)),
+                ('to_email', models.EmailField(max_length=100)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_jobs', to='icecream_api.order')),
+            ],
+            options={
+                'db_table': 'email_jobs',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='email_jobs_due_idx')],
+            },
+        ),
+    ]
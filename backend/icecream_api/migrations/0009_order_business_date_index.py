@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0008_email_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business', '-order_date'], name='orders_business_date_idx'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:42
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+# ?ordering=-last_order_at sorts never-ordered businesses last. A plain
+# (last_order_at, id) index scanned backwards yields NULLs first, so Postgres
+# gets a matching DESC NULLS LAST index; SQLite cannot index NULLS LAST.
+
+def _create_desc_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX businesses_last_order_desc_idx '
+            'ON businesses (last_order_at DESC NULLS LAST, id DESC)'
+        )
+
+
+def _drop_desc_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS businesses_last_order_desc_idx')
+
+
+def backfill_counters(apps, schema_editor):
+    Business      = apps.get_model('icecream_api', 'Business')
+    Order         = apps.get_model('icecream_api', 'Order')
+    ArchivedOrder = apps.get_model('icecream_api', 'ArchivedOrder')
+
+    totals = {}
+    for model in (Order, ArchivedOrder):
+        rows = model.objects.order_by().values('business_id').annotate(
+            orders=Count('id'),
+            open_orders=Count('id', filter=Q(status__in=['Pending', 'Confirmed'])),
+            value=Sum('total_amount', filter=~Q(status='Cancelled')),
+            last=Max('order_date'),
+        )
+        for row in rows:
+            current = totals.setdefault(row['business_id'], [0, 0, Decimal('0'), None])
+            current[0] += row['orders']
+            current[1] += row['open_orders']
+            current[2] += row['value'] or 0
+            if row['last'] is not None and (current[3] is None or row['last'] > current[3]):
+                current[3] = row['last']
+
+    businesses = list(Business.objects.filter(id__in=totals))
+    for business in businesses:
+        (business.order_count, business.open_order_count,
+         business.lifetime_value, business.last_order_at) = totals[business.id]
+    Business.objects.bulk_update(
+        businesses,
+        ['order_count', 'open_order_count', 'lifetime_value', 'last_order_at'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0009_order_business_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='last_order_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='lifetime_value',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='open_order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['order_count', 'id'], name='businesses_orders_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['open_order_count', 'id'], name='businesses_open_orders_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['lifetime_value', 'id'], name='businesses_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['last_order_at', 'id'], name='businesses_last_order_idx'),
+        ),
+        migrations.RunPython(_create_desc_index, _drop_desc_index),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0011_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='scheduled_for',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='StandingOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('items', models.JSONField()),
+                ('weekdays', models.PositiveSmallIntegerField(default=127)),
+                ('interval_days', models.PositiveSmallIntegerField(default=1)),
+                ('start_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('last_generated_on', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('business', models.ForeignKey(db_column='business_id', on_delete=django.db.models.deletion.CASCADE, related_name='standing_orders', to='icecream_api.business')),
+            ],
+            options={
+                'db_table': 'standing_orders',
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='standing_order',
+            field=models.ForeignKey(blank=True, db_column='standing_order_id', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='icecream_api.standingorder'),
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(fields=('standing_order', 'scheduled_for'), name='orders_standing_day_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='standingorder',
+            index=models.Index(fields=['active', 'start_date'], name='standing_orders_active_idx'),
+        ),
+    ]
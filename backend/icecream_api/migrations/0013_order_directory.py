@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0012_standing_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDirectory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'order_directory',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0013_order_directory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_name', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('available', models.PositiveIntegerField(default=0)),
+                ('reserved', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'product_stock',
+                'constraints': [models.UniqueConstraint(fields=('item_name', 'day'), name='product_stock_item_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.IntegerField(db_index=True)),
+                ('quantity', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='icecream_api.productstock')),
+            ],
+            options={
+                'db_table': 'stock_reservations',
+            },
+        ),
+    ]
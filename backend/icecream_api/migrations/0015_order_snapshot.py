@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0014_product_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0016_webhook_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger', models.CharField(choices=[('requested', 'Requested'), ('slow', 'Slow request')], max_length=10)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('sql_ms', models.FloatField(default=0)),
+                ('queries', models.JSONField(default=list)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('profile', models.BinaryField(blank=True, default=b'')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='icecream_api.user')),
+            ],
+            options={
+                'db_table': 'profile_artifacts',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0017_profile_artifacts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminLogSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('action_type', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'admin_log_summaries',
+                'ordering': ['-month', 'admin_user_id', 'action_type'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['action_time', 'id'], name='admin_logs_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='adminlogsummary',
+            name='admin_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_summaries', to='icecream_api.user'),
+        ),
+        migrations.AddConstraint(
+            model_name='adminlogsummary',
+            constraint=models.UniqueConstraint(fields=('month', 'admin_user', 'action_type'), name='admin_log_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+# settings.CACHES defaults to the database cache. Creating its table here
+# means `migrate` is enough to deploy; createcachetable skips tables that
+# exist and caches that are not database caches (Redis, tests' locmem).
+
+def create_cache_table(apps, schema_editor):
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0018_admin_log_retention'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icecream_api', '0019_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='standing_order',
+            field=models.ForeignKey(blank=True, db_column='standing_order_id', db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='icecream_api.standingorder'),
+        ),
+    ]
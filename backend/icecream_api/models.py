@@ -1,5 +1,12 @@
-from django.db   import models
-from django.utils import timezone
+import uuid
+from datetime import timedelta
+from decimal  import Decimal, InvalidOperation
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db        import models, router, transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now, Round
+from django.utils     import timezone
 
 
 class Business(models.Model):
@@ -10,13 +17,38 @@ class Business(models.Model):
     email          = models.EmailField(max_length=100, blank=True, null=True)
     created_at     = models.DateTimeField(default=timezone.now)
 
+    # denormalized order counters, maintained by counters.py
+    order_count      = models.PositiveIntegerField(default=0)
+    open_order_count = models.PositiveIntegerField(default=0)
+    lifetime_value   = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_order_at    = models.DateTimeField(null=True, blank=True)
+
+    COUNTER_FIELDS = ('order_count', 'open_order_count', 'lifetime_value', 'last_order_at')
+
     class Meta:
         db_table = 'businesses'
         ordering = ['name']
+        indexes  = [
+            models.Index(fields=['order_count', 'id'], name='businesses_orders_idx'),
+            models.Index(fields=['open_order_count', 'id'], name='businesses_open_orders_idx'),
+            models.Index(fields=['lifetime_value', 'id'], name='businesses_value_idx'),
+            models.Index(fields=['last_order_at', 'id'], name='businesses_last_order_idx'),
+            # plus businesses_last_order_desc_idx (DESC NULLS LAST) on Postgres, see migration 0010
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # a full save of a stale instance (e.g. the Django admin form) must not
+        # overwrite counters that orders moved on in the meantime
+        if self.pk is not None and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class User(models.Model):
     class Role(models.TextChoices):
@@ -47,6 +79,31 @@ class User(models.Model):
         return self.role == self.Role.ADMIN
 
 
+def items_total():
+    """SUM(price * quantity) of the outer order's items, 0 when it has none."""
+    money = DecimalField(max_digits=12, decimal_places=2)
+    total = (
+        OrderItem.objects
+        .filter(order_id=OuterRef('pk'))
+        .order_by()
+        .values('order_id')
+        .annotate(total=Sum(F('price') * F('quantity'), output_field=money))
+        .values('total')
+    )
+    return Round(Coalesce(Subquery(total), Value(0), output_field=money), 2)
+
+
+class OrderQuerySet(models.QuerySet):
+
+    def total_mismatches(self):
+        """Orders whose stored total_amount differs from the sum of their items."""
+        return self.exclude(total_amount=items_total())
+
+    def recalculate_totals(self):
+        """Recomputes total_amount in one UPDATE. Returns the number of rows written."""
+        return self.update(total_amount=items_total(), updated_at=Now())
+
+
 class Order(models.Model):
     class Status(models.TextChoices):
         PENDING   = 'Pending',   'Pending'
@@ -69,6 +126,9 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     email_sent   = models.BooleanField(default=False)
 
+    # bumped on every save (see save()); drives the ?since= change feed
+    updated_at   = models.DateTimeField(auto_now=True, db_index=True)
+
     # NEW: payment fields added for frontend payment flow
     payment_done       = models.BooleanField(default=False)
     payment_screenshot = models.ImageField(
@@ -77,18 +137,78 @@ class Order(models.Model):
         null=True,
     )
 
+    # set on orders generated from a standing order (see standing.py)
+    standing_order = models.ForeignKey(
+        'StandingOrder',
+        on_delete=models.SET_NULL,
+        related_name='orders',
+        db_column='standing_order_id',
+        db_constraint=False,   # standing orders live on default, sharded orders don't
+        null=True,
+        blank=True,
+    )
+    scheduled_for  = models.DateField(null=True, blank=True)
+
+    # business name + line items as order lists print them, so lists need no
+    # joins; NULL until built (see snapshots.py)
+    snapshot = models.JSONField(null=True, blank=True, editable=False)
+
+    CLOSED_STATUSES = (Status.COMPLETED, Status.CANCELLED)
+
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = 'orders'
         ordering = ['-order_date']
+        indexes  = [
+            models.Index(fields=['status', 'order_date'], name='orders_status_date_idx'),
+            models.Index(fields=['business', 'updated_at'], name='orders_business_updated_idx'),
+            models.Index(fields=['business', '-order_date'], name='orders_business_date_idx'),
+        ]
+        constraints = [
+            # one generated order per standing order and day, however often the generator runs
+            models.UniqueConstraint(fields=['standing_order', 'scheduled_for'], name='orders_standing_day_uniq'),
+        ]
 
     def __str__(self):
         return f'Order #{self.id} - {self.business} ({self.status})'
 
+    # (business_id, status, total_amount) as last read from / written to the
+    # database; counters.order_saved() applies the difference on save
+    _counted = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted = instance.counter_state()
+        return instance
+
+    def counter_state(self):
+        """None while any of the fields is deferred."""
+        loaded = self.__dict__
+        if not all(f in loaded for f in ('business_id', 'status', 'total_amount')):
+            return None
+        return (self.business_id, self.status, self.total_amount)
+
+    def save(self, *args, **kwargs):
+        # partial saves (update_fields=[...]) must still bump updated_at
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'updated_at']
+        super().save(*args, **kwargs)
+
     def recalculate_total(self):
-        total = sum(item.subtotal for item in self.items.all())
-        self.total_amount = total
-        self.save(update_fields=['total_amount'])
-        return total
+        # read back from the database that was written, never a lagging replica
+        from .caching  import bump_business_versions
+        from .counters import order_saved
+
+        alias = router.db_for_write(Order, instance=self)
+        Order.objects.using(alias).filter(pk=self.pk).recalculate_totals()
+        self.refresh_from_db(using=alias, fields=['total_amount', 'updated_at'])
+        # an UPDATE sends no post_save
+        order_saved(self, created=False)
+        bump_business_versions(self.business_id, using=alias)
+        return self.total_amount
 
 
 class OrderItem(models.Model):
@@ -108,6 +228,454 @@ class OrderItem(models.Model):
         return self.price * self.quantity
 
 
+class StandingOrder(models.Model):
+    """
+    A recurring order: the same items, placed automatically on every day the
+    schedule matches. generate_standing_orders materializes the day's due
+    standing orders as ordinary Pending orders.
+
+    The schedule is due on a day when all of these hold:
+    - start_date <= day <= end_date (end_date empty: no end)
+    - the day's weekday is in `weekdays` (bit 0 = Monday ... bit 6 = Sunday)
+    - the day is a multiple of interval_days after start_date
+    """
+    EVERY_DAY = 0b1111111
+    WEEKDAYS  = 0b0011111
+
+    business          = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name='standing_orders',
+        db_column='business_id',
+    )
+    # [{"item_name": "Vanilla Tub", "quantity": 2, "price": "4.50"}, ...]
+    items             = models.JSONField()
+    weekdays          = models.PositiveSmallIntegerField(default=EVERY_DAY)
+    interval_days     = models.PositiveSmallIntegerField(default=1)
+    start_date        = models.DateField(default=timezone.localdate)
+    end_date          = models.DateField(null=True, blank=True)
+    active            = models.BooleanField(default=True)
+    last_generated_on = models.DateField(null=True, blank=True)
+    created_at        = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'standing_orders'
+        indexes  = [
+            models.Index(fields=['active', 'start_date'], name='standing_orders_active_idx'),
+        ]
+
+    def __str__(self):
+        return f'Standing order #{self.id} - {self.business}'
+
+    def is_due(self, day):
+        if not self.active or day < self.start_date:
+            return False
+        if self.end_date is not None and day > self.end_date:
+            return False
+        if not self.weekdays & (1 << day.weekday()):
+            return False
+        return (day - self.start_date).days % max(self.interval_days, 1) == 0
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        if not isinstance(self.items, list) or not self.items:
+            raise ValidationError({'items': 'A standing order needs at least one item.'})
+        for item in self.items:
+            try:
+                valid = (
+                    bool(item['item_name'])
+                    and int(item['quantity']) >= 1
+                    and Decimal(str(item['price'])) > 0
+                )
+            except (KeyError, TypeError, ValueError, InvalidOperation):
+                valid = False
+            if not valid:
+                raise ValidationError({'items': 'Every item needs an item_name, a quantity >= 1 and a price > 0.'})
+        if not self.weekdays & self.EVERY_DAY:
+            raise ValidationError({'weekdays': 'Pick at least one weekday.'})
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValidationError({'end_date': 'end_date must not be before start_date.'})
+
+    def total_amount(self):
+        return sum(
+            (Decimal(str(item['price'])) * int(item['quantity']) for item in self.items),
+            Decimal('0'),
+        )
+
+
+class OrderDirectory(models.Model):
+    """
+    Allocates order ids, and maps them to their business, while orders are
+    sharded (see sharding.py). Lives on `default`; unused otherwise.
+    """
+    business_id = models.IntegerField()
+
+    class Meta:
+        db_table = 'order_directory'
+
+
+class ProductStock(models.Model):
+    """
+    How much of one flavour can still be ordered for one day. Flavours
+    without a row for the day are not tracked and never run out. Changed
+    only through conditional UPDATEs in stock.py, never read-modify-write.
+    """
+    item_name = models.CharField(max_length=100)
+    day       = models.DateField()
+    available = models.PositiveIntegerField(default=0)
+    reserved  = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table    = 'product_stock'
+        constraints = [
+            models.UniqueConstraint(fields=['item_name', 'day'], name='product_stock_item_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.item_name} on {self.day}: {self.available} left'
+
+
+class StockReservation(models.Model):
+    """
+    Stock held by one order. order_id is a plain column rather than a
+    foreign key because orders may live on a shard (see sharding.py).
+    """
+    order_id    = models.IntegerField(db_index=True)
+    stock       = models.ForeignKey(ProductStock, on_delete=models.CASCADE, related_name='reservations')
+    quantity    = models.PositiveIntegerField()
+    created_at  = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'stock_reservations'
+
+
+class OrderTombstone(models.Model):
+    """
+    Marks an order that left the `orders` table (deleted or archived) so
+    ?since= change feeds can tell clients to drop it.
+    Pruned after ORDER_TOMBSTONE_RETENTION_DAYS by prune_order_tombstones.
+    """
+    order_id    = models.BigIntegerField()
+    business_id = models.BigIntegerField()
+    deleted_at  = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'order_tombstones'
+        indexes  = [
+            models.Index(fields=['business_id', 'deleted_at'], name='tombstones_business_del_idx'),
+        ]
+
+    def __str__(self):
+        return f'Order #{self.order_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}'
+
+
+class OrderSearchDocument(models.Model):
+    """
+    Denormalized text of an order (id, business name, contact person, item
+    names) kept in sync by icecream_api.search. The text index over
+    `document` is backend-specific and created in migration 0005: a pg_trgm
+    GIN index on Postgres, an FTS5 shadow table on SQLite.
+    """
+    order    = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        db_column='order_id',
+    )
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='business_id',
+    )
+    document = models.TextField()
+
+    class Meta:
+        db_table = 'order_search'
+
+    def __str__(self):
+        return self.document
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold copy of a closed (Completed / Cancelled) order moved out of `orders`
+    by the archive_orders command. Keeps the original order id.
+    """
+    id           = models.BigIntegerField(primary_key=True)
+    business     = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name='archived_orders',
+        db_column='business_id',
+    )
+    order_date   = models.DateTimeField(db_index=True)
+    status       = models.CharField(max_length=20, choices=Order.Status.choices)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    email_sent   = models.BooleanField(default=False)
+
+    payment_done       = models.BooleanField(default=False)
+    payment_screenshot = models.ImageField(
+        upload_to='payment_screenshots/',
+        blank=True,
+        null=True,
+    )
+
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'orders_archive'
+        ordering = ['-order_date']
+
+    def __str__(self):
+        return f'Archived order #{self.id} - {self.business} ({self.status})'
+
+
+class ArchivedOrderItem(models.Model):
+    id        = models.BigIntegerField(primary_key=True)
+    order     = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    item_name = models.CharField(max_length=100)
+    quantity  = models.PositiveIntegerField()
+    price     = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        db_table = 'order_items_archive'
+
+    def __str__(self):
+        return f'{self.item_name} x{self.quantity}'
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+
+class IdempotencyKey(models.Model):
+    """
+    Remembers the response to a POST /orders/place sent with an
+    Idempotency-Key header so retries replay it instead of placing a new order.
+    The unique (user, key) constraint makes concurrent retries collapse into one insert.
+    """
+    user          = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='user_id',
+    )
+    key           = models.CharField(max_length=255)
+    fingerprint   = models.CharField(max_length=64)
+    status_code   = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at    = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table    = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_keys_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.key} (user #{self.user_id})'
+
+
+class RevokedToken(models.Model):
+    """
+    A JWT (access or refresh) that must no longer be accepted: logged out, or
+    a refresh token replaced by rotation. Kept until the token would have
+    expired anyway; see revocation.py.
+    """
+    jti        = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+
+    def __str__(self):
+        return self.jti
+
+
+class QueuedJob(models.Model):
+    """
+    Base for DB-backed work queues drained by management-command workers.
+
+    Workers claim a batch with claim_batch(): rows are locked with
+    SELECT ... FOR UPDATE SKIP LOCKED where supported, and the claim itself is
+    a conditional UPDATE stamped with a per-claim token, so two workers never
+    get the same row even on SQLite. A claim is a lease: rows whose worker
+    died become claimable again once locked_until passes.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
+        SENT    = 'sent',    'Sent'
+        FAILED  = 'failed',  'Failed'
+
+    status       = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts     = models.PositiveSmallIntegerField(default=0)
+    run_after    = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    claim_token  = models.UUIDField(null=True, blank=True)
+    last_error   = models.TextField(blank=True, default='')
+    created_at   = models.DateTimeField(default=timezone.now)
+    sent_at      = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def claimable(cls, now=None):
+        now = now or timezone.now()
+        return cls.objects.filter(
+            Q(status=cls.Status.PENDING, run_after__lte=now)
+            | Q(status=cls.Status.SENDING, locked_until__lt=now)
+        )
+
+    @classmethod
+    def claim_batch(cls, batch_size, lease_seconds=300, queryset=None):
+        """Claims up to batch_size due jobs for this worker and returns them."""
+        now       = timezone.now()
+        token     = uuid.uuid4()
+        claimable = cls.claimable(now) if queryset is None else queryset & cls.claimable(now)
+        # on the queue's own database, e.g. the pinned shard for EmailJob
+        with transaction.atomic(using=router.db_for_write(cls)):
+            ids = list(
+                claimable
+                .select_for_update(skip_locked=True)
+                .order_by('run_after', 'id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+            claimable.filter(id__in=ids).update(
+                status       = cls.Status.SENDING,
+                locked_until = now + timedelta(seconds=lease_seconds),
+                claim_token  = token,
+                attempts     = F('attempts') + 1,
+            )
+        return list(cls.objects.filter(claim_token=token).order_by('id'))
+
+    def mark_sent(self):
+        self.status       = self.Status.SENT
+        self.sent_at      = timezone.now()
+        self.locked_until = None
+        self.last_error   = ''
+        self.save(update_fields=['status', 'sent_at', 'locked_until', 'last_error'])
+
+    def retry_later(self, error, max_attempts, base_delay, max_delay):
+        """Schedules another attempt with exponential backoff, or gives up after max_attempts."""
+        self.last_error   = str(error)[:2000]
+        self.locked_until = None
+        if self.attempts >= max_attempts:
+            self.status = self.Status.FAILED
+        else:
+            self.status    = self.Status.PENDING
+            self.run_after = timezone.now() + timedelta(
+                seconds=min(base_delay * 2 ** (self.attempts - 1), max_delay),
+            )
+        self.save(update_fields=['status', 'run_after', 'locked_until', 'last_error'])
+
+
+class EmailJob(QueuedJob):
+    """An outgoing email, e.g. the confirmation sent when an admin confirms an order."""
+    class Kind(models.TextChoices):
+        ORDER_CONFIRMED = 'order_confirmed', 'Order confirmed'
+
+    order    = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='email_jobs')
+    kind     = models.CharField(max_length=30, choices=Kind.choices)
+    to_email = models.EmailField(max_length=100)
+    subject  = models.CharField(max_length=255)
+    body     = models.TextField()
+
+    class Meta:
+        db_table = 'email_jobs'
+        indexes  = [
+            models.Index(fields=['status', 'run_after'], name='email_jobs_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} for order #{self.order_id} -> {self.to_email} ({self.status})'
+
+
+class WebhookEndpoint(models.Model):
+    """A partner system (ERP, delivery) that receives order events, see webhooks.py."""
+    name        = models.CharField(max_length=100)
+    url         = models.URLField(max_length=500)
+    secret      = models.CharField(max_length=128, help_text='Shared secret the payload signature is made with.')
+    # comma-separated event types, e.g. "order.created,order.cancelled"; blank = every event
+    event_types = models.CharField(max_length=255, blank=True, default='')
+    active      = models.BooleanField(default=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'webhook_endpoints'
+
+    def __str__(self):
+        return f'{self.name} ({self.url})'
+
+    def wants(self, event_type):
+        types = [t.strip() for t in self.event_types.split(',') if t.strip()]
+        return not types or event_type in types
+
+
+class WebhookDelivery(QueuedJob):
+    """
+    The transactional outbox: one event for one endpoint, inserted in the
+    same transaction as the order change it describes and delivered later
+    by the dispatch_webhooks worker. order_id is a plain column so the row
+    stays on `default` while orders may be sharded.
+    """
+    endpoint   = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event_id   = models.UUIDField(default=uuid.uuid4)
+    event_type = models.CharField(max_length=50)
+    order_id   = models.IntegerField(null=True, blank=True)
+    payload    = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        db_table = 'webhook_outbox'
+        indexes  = [
+            models.Index(fields=['status', 'run_after'], name='webhook_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} for order #{self.order_id} -> {self.endpoint_id} ({self.status})'
+
+
+class ProfileArtifact(models.Model):
+    """
+    One profiled request, captured by ProfilingMiddleware: the cProfile
+    stats (a .prof file, readable with pstats or snakeviz), a text summary
+    of the hottest functions and the SQL it ran with timings.
+    """
+    class Trigger(models.TextChoices):
+        REQUESTED = 'requested', 'Requested'
+        SLOW      = 'slow',      'Slow request'
+
+    trigger     = models.CharField(max_length=10, choices=Trigger.choices)
+    method      = models.CharField(max_length=10)
+    path        = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    user        = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    query_count = models.PositiveIntegerField(default=0)
+    sql_ms      = models.FloatField(default=0)
+    # [{"alias": "default", "sql": "SELECT ...", "ms": 1.2}, ...], without parameters
+    queries     = models.JSONField(default=list)
+    summary     = models.TextField(blank=True, default='')
+    # marshalled pstats data; empty when another request held the profiler
+    profile     = models.BinaryField(blank=True, default=b'')
+    created_at  = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'profile_artifacts'
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration_ms:.0f} ms, {self.trigger})'
+
+
 class AdminLog(models.Model):
     admin_user  = models.ForeignKey(
         User,
@@ -121,10 +689,38 @@ class AdminLog(models.Model):
     class Meta:
         db_table = 'admin_logs'
         ordering = ['-action_time']
+        indexes  = [
+            # newest-first keyset pages, and the retention purge's range scan
+            models.Index(fields=['action_time', 'id'], name='admin_logs_time_idx'),
+        ]
 
     def __str__(self):
         return f'[{self.action_time:%Y-%m-%d %H:%M}] {self.admin_user.username}: {self.action}'
 
     @classmethod
     def record(cls, admin_user, action):
-        return cls.objects.create(admin_user=admin_user, action=action)
\ No newline at end of file
+        return cls.objects.create(admin_user=admin_user, action=action)
+
+
+class AdminLogSummary(models.Model):
+    """
+    How many actions of one type an admin took in one month. Written by
+    admin_logs.purge() when it deletes AdminLog rows past the retention
+    window, so the history stays countable after the rows are gone.
+    """
+    month       = models.DateField(help_text='First day of the month.')
+    admin_user  = models.ForeignKey(User, on_delete=models.CASCADE, related_name='log_summaries')
+    action_type = models.CharField(max_length=50)
+    count       = models.PositiveIntegerField(default=0)
+    first_at    = models.DateTimeField()
+    last_at     = models.DateTimeField()
+
+    class Meta:
+        db_table = 'admin_log_summaries'
+        ordering = ['-month', 'admin_user_id', 'action_type']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'admin_user', 'action_type'], name='admin_log_summary_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.month:%Y-%m} {self.admin_user_id} {self.action_type}: {self.count}'
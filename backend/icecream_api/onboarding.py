@@ -0,0 +1,212 @@
+"""
+Bulk onboarding of businesses and their customer logins, e.g. a new
+distributor network.
+
+Rows come from a CSV file with a header row, or from a JSON list of objects,
+with the fields RegisterView takes:
+
+    username,password,business_name,contact_person,phone,email,address
+
+Every row is checked the way RegisterView checks a sign-up, and all usernames
+are checked against the database in one IN query. The valid rows' passwords
+are hashed in a process pool of ONBOARDING_HASH_WORKERS spawned processes (a
+password hash is slow on purpose, so a few hundred of them are worth a pool),
+then all businesses and users are inserted with bulk_create in a single
+transaction. Invalid rows are reported and skipped; they do not hold back the
+valid ones.
+"""
+import csv
+import io
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf                 import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db                   import IntegrityError, transaction
+
+from . import password_hashing, sharding
+from .models import Business, User
+
+
+# username must be 3-50 alphanumeric/underscore characters
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]{3,50}$')
+
+COLUMNS   = ('username', 'password', 'business_name', 'contact_person', 'phone', 'email', 'address')
+_REQUIRED = ('username', 'password', 'business_name')
+
+# row field -> Business field it is stored in
+_BUSINESS_FIELDS = {
+    'business_name':  'name',
+    'contact_person': 'contact_person',
+    'phone':          'phone',
+    'email':          'email',
+    'address':        'address',
+}
+
+
+class OnboardingError(Exception):
+    """The upload as a whole cannot be read (as opposed to one bad row)."""
+
+
+# ------------------------------------------------------------------
+# Input
+# ------------------------------------------------------------------
+
+def parse_csv(data, capped=True):
+    """
+    Rows of a CSV upload (bytes or text) as dicts. With capped, more than
+    ONBOARDING_MAX_ROWS rows is an error.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise OnboardingError('CSV must be UTF-8 encoded.')
+    reader  = csv.DictReader(io.StringIO(data))
+    missing = [column for column in _REQUIRED if column not in (reader.fieldnames or ())]
+    if missing:
+        raise OnboardingError(f'CSV is missing the column(s): {", ".join(missing)}.')
+    return _checked_size(list(reader), capped)
+
+
+def parse_json(data, capped=True):
+    """Rows of a JSON upload: a list of objects, or {"rows": [...]}. See parse_csv()."""
+    rows = data.get('rows') if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise OnboardingError('Expected a list of rows, or {"rows": [...]}.')
+    return _checked_size(rows, capped)
+
+
+def _checked_size(rows, capped):
+    if not rows:
+        raise OnboardingError('No rows to onboard.')
+    if capped and len(rows) > settings.ONBOARDING_MAX_ROWS:
+        raise OnboardingError(
+            f'At most {settings.ONBOARDING_MAX_ROWS} rows per upload; '
+            'onboard larger files with `python manage.py onboard_businesses`.'
+        )
+    return rows
+
+
+def _clean(row):
+    cleaned = {column: str(row.get(column) or '').strip() for column in COLUMNS}
+    cleaned['password'] = str(row.get('password') or '')   # taken as typed, like RegisterView
+    return cleaned
+
+
+def _row_error(row):
+    if not all(row[column] for column in _REQUIRED):
+        return 'Username, password, and business name are required.'
+    if not USERNAME_RE.match(row['username']):
+        return 'Username must be 3-50 characters and contain only letters, numbers, or underscores.'
+    if len(row['password']) < 8:
+        return 'Password must be at least 8 characters.'
+    for column, field in _BUSINESS_FIELDS.items():
+        max_length = Business._meta.get_field(field).max_length
+        if max_length and len(row[column]) > max_length:
+            return f'{column} must be at most {max_length} characters.'
+    return None
+
+
+# ------------------------------------------------------------------
+# Hashing
+# ------------------------------------------------------------------
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for every password, in a process pool for large batches."""
+    workers = workers or settings.ONBOARDING_HASH_WORKERS
+    if len(passwords) < settings.ONBOARDING_POOL_THRESHOLD or workers < 2:
+        return [make_password(password) for password in passwords]
+
+    hasher      = type(get_hasher())
+    hasher_path = f'{hasher.__module__}.{hasher.__qualname__}'
+    workers     = min(workers, len(passwords))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(
+            password_hashing.hash_password,
+            [hasher_path] * len(passwords),
+            passwords,
+            chunksize=max(1, len(passwords) // (workers * 4)),
+        ))
+
+
+# ------------------------------------------------------------------
+# Onboarding
+# ------------------------------------------------------------------
+
+def _taken(usernames):
+    return set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+
+def _insert(rows, hashes):
+    """Creates a business and a customer per row. Returns the users, in row order."""
+    with transaction.atomic():
+        businesses = Business.objects.bulk_create(
+            Business(**{field: row[column] or None for column, field in _BUSINESS_FIELDS.items()})
+            for row in rows
+        )
+        users = User.objects.bulk_create(
+            User(
+                username      = row['username'],
+                password_hash = password_hash,
+                role          = User.Role.CUSTOMER,
+                business      = business,
+            )
+            for row, password_hash, business in zip(rows, hashes, businesses)
+        )
+        if sharding.enabled():
+            for business in businesses:   # bulk_create sends no post_save
+                sharding.mirror_business(business)
+    return users
+
+
+def onboard(rows, workers=None, dry_run=False):
+    """
+    Validates and creates the given rows. Returns one result per row, in
+    order: {"row": 1, "username": ..., "status": "created", "business_id":
+    ..., "user_id": ...}, or "status": "error" with an "error" message
+    ("valid" instead of "created" on a dry run).
+    """
+    cleaned = [_clean(row) for row in rows]
+    results = [{'row': number, 'username': row['username']} for number, row in enumerate(cleaned, start=1)]
+    errors  = {}
+    seen    = set()
+    for index, row in enumerate(cleaned):
+        error = _row_error(row)
+        if error is None and row['username'] in seen:
+            error = 'Username appears more than once in this upload.'
+        if error is not None:
+            errors[index] = error
+        seen.add(row['username'])
+
+    valid = [index for index in range(len(cleaned)) if index not in errors]
+    taken = _taken([cleaned[index]['username'] for index in valid])
+    for index in valid:
+        if cleaned[index]['username'] in taken:
+            errors[index] = 'Username already taken.'
+    valid = [index for index in valid if index not in errors]
+
+    if not dry_run and valid:
+        hashes = dict(zip(valid, hash_passwords([cleaned[index]['password'] for index in valid], workers)))
+        try:
+            users = _insert([cleaned[index] for index in valid], [hashes[index] for index in valid])
+        except IntegrityError:
+            # a username was registered between the check and the insert: drop it and go again
+            taken = _taken([cleaned[index]['username'] for index in valid])
+            if not taken:
+                raise
+            for index in valid:
+                if cleaned[index]['username'] in taken:
+                    errors[index] = 'Username already taken.'
+            valid = [index for index in valid if index not in errors]
+            users = _insert([cleaned[index] for index in valid], [hashes[index] for index in valid])
+        for index, user in zip(valid, users):
+            results[index].update(status='created', business_id=user.business_id, user_id=user.id)
+    else:
+        for index in valid:
+            results[index]['status'] = 'valid'
+
+    for index, error in errors.items():
+        results[index].update(status='error', error=error)
+    return results
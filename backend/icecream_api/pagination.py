@@ -0,0 +1,101 @@
+"""
+Keyset ("cursor") pagination over a single sort field plus the primary key.
+
+A cursor is the (sort value, id) of the last row of the previous page,
+base64-encoded together with the ordering it belongs to. Pages are fetched
+with `WHERE (field, id) > (value, last_id)`-style conditions, so every page
+costs the same no matter how deep the client scrolls, as long as an index
+on (field, id) exists. NULLs sort last in both directions.
+"""
+import base64
+import json
+from datetime import datetime
+from decimal  import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models       import DateTimeField, DecimalField, F, Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(field, raw):
+    if raw is None:
+        return None
+    if isinstance(field, DateTimeField):
+        value = parse_datetime(raw)
+        if value is None:
+            raise InvalidCursor('Bad cursor value.')
+        return value
+    if isinstance(field, DecimalField):
+        return Decimal(raw)
+    return field.to_python(raw)
+
+
+def encode_cursor(ordering, obj):
+    field = ordering.lstrip('-')
+    raw   = json.dumps([ordering, _encode_value(getattr(obj, field)), obj.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(ordering, model, raw):
+    """Returns (value, pk). Raises InvalidCursor for garbage or a cursor of another ordering."""
+    try:
+        padded = raw + '=' * (-len(raw) % 4)
+        cursor_ordering, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        pk = int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor('Malformed cursor.')
+    if cursor_ordering != ordering:
+        raise InvalidCursor('Cursor belongs to a different ordering.')
+
+    field = model._meta.get_field(ordering.lstrip('-'))
+    try:
+        return _decode_value(field, value), pk
+    except (ValueError, TypeError, ArithmeticError, ValidationError):
+        raise InvalidCursor('Malformed cursor.')
+
+
+def _after(field, descending, value, pk):
+    name = field.name
+    op   = 'lt' if descending else 'gt'
+    if value is None:   # already inside the NULL tail
+        return Q(**{f'{name}__isnull': True, f'pk__{op}': pk})
+    after = Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'pk__{op}': pk})
+    if field.null:
+        after |= Q(**{f'{name}__isnull': True})
+    return after
+
+
+def paginate(queryset, ordering, limit=None, cursor=None):
+    """
+    Returns (rows, next_cursor) for one page of `queryset` sorted by
+    `ordering` ('field' or '-field'); next_cursor is None on the last page.
+    Without a limit every remaining row is returned.
+    """
+    field      = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    sort       = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+    queryset   = queryset.order_by(sort, '-pk' if descending else 'pk')
+
+    if cursor is not None:
+        value, pk = decode_cursor(ordering, queryset.model, cursor)
+        queryset  = queryset.filter(_after(queryset.model._meta.get_field(field), descending, value, pk))
+
+    if limit is None:
+        return list(queryset), None
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(ordering, rows[-1])
@@ -0,0 +1,12 @@
+"""
+Password hashing for bulk onboarding, kept free of Django settings:
+onboarding.py runs hash_password() in spawned worker processes, which only
+import this module and the hasher class named by the parent.
+"""
+from django.utils.module_loading import import_string
+
+
+def hash_password(hasher_path, password):
+    """make_password() with an explicit hasher class, e.g. 'django.contrib.auth.hashers.PBKDF2PasswordHasher'."""
+    hasher = import_string(hasher_path)()
+    return hasher.encode(password, hasher.salt())
@@ -0,0 +1,169 @@
+"""
+On-demand request profiling for admins.
+
+Off unless settings.PROFILING_ENABLED. When on, ProfilingMiddleware profiles:
+
+- a request an admin asks for, with `?profile=1` or an `X-Profile: 1` header.
+  The response carries `X-Profile-Id: <artifact id>`.
+- a PROFILING_SAMPLE_RATE share of all other requests, kept only when they
+  took longer than PROFILING_SLOW_REQUEST_MS (0 disables the sampler).
+
+Each capture runs the request under cProfile and wraps every database
+connection with an execute wrapper that times each statement, then stores a
+ProfileArtifact: the marshalled stats (downloadable as a .prof file), the 30
+hottest functions by cumulative time and the SQL. SQL parameters are not
+stored, and neither is the event stream's `?token=`. Only the newest
+PROFILING_MAX_ARTIFACTS artifacts are kept.
+
+cProfile sees the request's own thread only, so the shard fan-out threads
+show up as time spent waiting on them, and their SQL is not captured. One
+request per process is profiled at a time; a request that comes in while
+another holds the profiler gets its SQL captured without a profile.
+Streaming responses are profiled up to the point their body starts.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db   import connections
+
+from .models import ProfileArtifact
+
+
+_SUMMARY_LINES = 30
+
+# cProfile is per thread on 3.11 but process-wide from 3.12 on; either way one
+# profiled request at a time keeps the overhead bounded
+_profiler_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Execute wrapper that times every statement a connection runs."""
+
+    def __init__(self, limit):
+        self.limit    = limit
+        self.queries  = []
+        self.count    = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count    += 1
+            self.total_ms += elapsed
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'alias': context['connection'].alias,
+                    'sql':   sql,
+                    'ms':    round(elapsed, 3),
+                })
+
+
+def _summary(profiler):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(_SUMMARY_LINES)
+    return stream.getvalue()
+
+
+def _logged_path(request):
+    """Path and query string, minus the event stream's access token."""
+    query = request.GET.copy()
+    query.pop('token', None)
+    path  = request.path + (f'?{query.urlencode()}' if query else '')
+    return path[:500]
+
+
+def _wants_profile(request):
+    return request.GET.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+
+
+def _requesting_admin(request):
+    from .views import get_user_from_token
+
+    user = get_user_from_token(request)
+    return user if user is not None and user.is_admin else None
+
+
+def prune(keep=None):
+    """Deletes all but the newest `keep` artifacts. Returns how many went."""
+    keep  = settings.PROFILING_MAX_ARTIFACTS if keep is None else keep
+    stale = list(ProfileArtifact.objects.values_list('id', flat=True)[keep:])
+    if not stale:
+        return 0
+    ProfileArtifact.objects.filter(id__in=stale).delete()
+    return len(stale)
+
+
+class ProfilingMiddleware:
+    """See the module docstring. Does nothing unless PROFILING_ENABLED."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        admin = _requesting_admin(request) if _wants_profile(request) else None
+        if admin is not None:
+            trigger = ProfileArtifact.Trigger.REQUESTED
+        elif settings.PROFILING_SLOW_REQUEST_MS > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger = ProfileArtifact.Trigger.SLOW
+        else:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(settings.PROFILING_MAX_QUERIES)
+        profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+        start    = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(recorder))
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if profiler is not None:
+                _profiler_lock.release()
+
+        if trigger == ProfileArtifact.Trigger.SLOW and duration_ms < settings.PROFILING_SLOW_REQUEST_MS:
+            return response
+
+        summary = ''
+        stats   = b''
+        if profiler is not None:
+            profiler.create_stats()
+            summary = _summary(profiler)
+            stats   = marshal.dumps(profiler.stats)
+
+        artifact = ProfileArtifact.objects.create(
+            trigger     = trigger,
+            method      = request.method,
+            path        = _logged_path(request),
+            status_code = response.status_code,
+            duration_ms = round(duration_ms, 3),
+            user        = admin,
+            query_count = recorder.count,
+            sql_ms      = round(recorder.total_ms, 3),
+            queries     = recorder.queries,
+            summary     = summary,
+            profile     = stats,
+        )
+        prune()
+        if admin is not None:
+            response['X-Profile-Id'] = str(artifact.id)
+        return response
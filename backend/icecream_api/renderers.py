@@ -0,0 +1,44 @@
+from rest_framework.renderers     import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:   # optional speed-up, the stock renderer is used without it
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    Output is byte-for-byte compatible with the stock renderer for the payloads
+    this API produces: datetimes, dates and Decimals that reach the renderer
+    un-serialized are handed back to DRF's own JSONEncoder.default(), so
+    '+00:00' still becomes 'Z' and Decimals still become floats.
+
+    Falls back to the stock json.dumps path when orjson is not installed,
+    when an indented response is requested, or when orjson rejects the data
+    (e.g. integers wider than 64 bits).
+    """
+
+    _encoder = JSONEncoder()
+
+    if orjson is not None:
+        _options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default, option=self._options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # keep the stock renderer's guarantee that output is a strict javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
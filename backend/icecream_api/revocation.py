@@ -0,0 +1,145 @@
+"""
+Revoked JWT store, keyed by the token's `jti`.
+
+Logout revokes the refresh token (and the access token it was called with);
+refresh rotation revokes the refresh token it replaces. A revoked jti is kept
+in the `revoked_tokens` table until the token would have expired anyway, and
+prune_revoked_tokens deletes it after that.
+
+Every process keeps a bloom filter of the revoked jtis:
+
+- a miss (almost every check) is answered from memory in microseconds;
+- a hit is confirmed against the table, so false positives cost one query.
+
+Revocations made in this process are added to the filter at once. Those made
+by other workers are pulled in by an indexed `id > last seen` query at most
+every REVOKED_TOKEN_SYNC_SECONDS, which bounds how long they can be missed.
+Ids are handed out at insert but become visible at commit, so a revocation
+can commit after a higher id was already synced; each sync therefore re-reads
+the last REVOKED_TOKEN_SYNC_OVERLAP ids below the last one seen (adding a jti
+to the filter twice is harmless).
+The filter is rebuilt from unexpired rows every REVOKED_TOKEN_REBUILD_SECONDS
+so expired entries do not fill it up.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf  import settings
+from django.db    import router
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+
+    def __init__(self, bits, hashes):
+        self.bits   = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key):
+        # double hashing: position_i = h1 + i*h2 (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        array = self._array
+        return all(array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+def _primary():
+    # a replica may not have a revocation that was just written yet
+    return RevokedToken.objects.using(router.db_for_write(RevokedToken))
+
+
+class RevocationStore:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom      = BloomFilter(settings.REVOKED_TOKEN_BLOOM_BITS, settings.REVOKED_TOKEN_BLOOM_HASHES)
+            self._last_id    = 0
+            self._synced_at  = float('-inf')
+            self._rebuilt_at = float('-inf')
+
+    # -- writes ------------------------------------------------------
+
+    def revoke(self, jti, expires_at):
+        """
+        Revokes a jti until expires_at. Returns False when it was already
+        revoked, so only one of two concurrent rotations of a token wins.
+        """
+        _, created = RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+        with self._lock:
+            self._bloom.add(jti)
+        return created
+
+    # -- reads -------------------------------------------------------
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        return _primary().filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+    def _sync(self):
+        now = time.monotonic()
+        if now - self._synced_at < settings.REVOKED_TOKEN_SYNC_SECONDS:
+            return
+        with self._lock:
+            if now - self._synced_at < settings.REVOKED_TOKEN_SYNC_SECONDS:
+                return   # another thread synced while we waited
+            if now - self._rebuilt_at >= settings.REVOKED_TOKEN_REBUILD_SECONDS:
+                self._bloom      = BloomFilter(self._bloom.bits, self._bloom.hashes)
+                self._last_id    = 0
+                self._rebuilt_at = now
+
+            rows = (
+                _primary()
+                .filter(id__gt=self._last_id - settings.REVOKED_TOKEN_SYNC_OVERLAP, expires_at__gt=timezone.now())
+                .order_by('id')
+                .values_list('id', 'jti')
+            )
+            for row_id, jti in rows.iterator():
+                self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._synced_at = now
+
+
+store = RevocationStore()
+
+
+def token_expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+def revoke_token(token):
+    """Revokes a decoded simplejwt token (AccessToken / RefreshToken)."""
+    return store.revoke(token['jti'], token_expiry(token))
+
+
+def is_token_revoked(token):
+    return store.is_revoked(token['jti'])
+
+
+def prune(batch_size=1000):
+    """Deletes revocations of tokens that have expired anyway. Returns the number deleted."""
+    deleted = 0
+    expired = RevokedToken.objects.filter(expires_at__lte=timezone.now()).order_by('id').values_list('id', flat=True)
+    while True:
+        ids = list(expired[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RevokedToken.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,130 @@
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db   import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# Primary pinning
+# ------------------------------------------------------------------
+
+# True while the current thread or task must read from the primary. Pinned by
+# default, so management commands and workers (whose SELECT ... FOR UPDATE
+# claims a hot standby rejects) never read a replica; ReplicaPinningMiddleware
+# unpins safe requests outside a user's read-your-writes window.
+_pinned = contextvars.ContextVar('icecream_primary_pinned', default=True)
+
+
+@contextmanager
+def use_primary(pinned=True):
+    """Forces every read inside the block onto the primary database."""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+# ------------------------------------------------------------------
+# Health-checked replica selection
+# ------------------------------------------------------------------
+
+_health_lock = threading.Lock()
+_health      = {}                  # alias -> (healthy, checked_at monotonic)
+_round_robin = itertools.count()
+
+
+def _check_replica(alias):
+    """Runs a trivial query on the replica. Returns True when it answers."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except Exception:
+        logger.warning('Read replica %r failed its health check', alias, exc_info=True)
+        connections[alias].close()
+        return False
+
+
+def replica_is_healthy(alias):
+    """Cached health status; re-checked at most every REPLICA_HEALTH_CHECK_INTERVAL seconds."""
+    interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 10)
+    now      = time.monotonic()
+    with _health_lock:
+        healthy, checked_at = _health.get(alias, (None, 0.0))
+    if healthy is not None and now - checked_at < interval:
+        return healthy
+
+    healthy = _check_replica(alias)
+    with _health_lock:
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def mark_replica_unhealthy(alias):
+    with _health_lock:
+        _health[alias] = (False, time.monotonic())
+
+
+def reset_replica_health():
+    with _health_lock:
+        _health.clear()
+
+
+def choose_replica():
+    """Round-robins over healthy replicas. Returns None when none is usable."""
+    aliases = replica_aliases()
+    if not aliases:
+        return None
+    start = next(_round_robin)
+    for offset in range(len(aliases)):
+        alias = aliases[(start + offset) % len(aliases)]
+        if replica_is_healthy(alias):
+            return alias
+    return None
+
+
+# ------------------------------------------------------------------
+# Router
+# ------------------------------------------------------------------
+
+class ReplicaRouter:
+    """
+    Sends reads to a healthy replica from settings.DATABASE_REPLICAS and every
+    write to the primary. Reads stay on the primary while pinned, which is
+    everywhere except safe requests ReplicaPinningMiddleware unpins, so a user
+    always sees their own writes and background jobs lock rows on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        # DatabaseCache's table: cache versions read from a lagging replica would be stale
+        if _pinned.get() or model._meta.app_label == 'django_cache':
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas receive their schema through replication
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,159 @@
+"""
+Server-side order search.
+
+Every order has one OrderSearchDocument row holding "#<id> <business name>
+<contact person> <item names...>". The text index behind it depends on the
+database (see migration 0005_order_search):
+
+- Postgres: pg_trgm GIN index, queried with ILIKE and ranked by trigram
+  word similarity.
+- SQLite:   FTS5 shadow table, queried with MATCH and ranked by bm25().
+- Anything else falls back to an unindexed icontains scan.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+
+from .models import Order, OrderItem, OrderSearchDocument
+
+
+MAX_RESULTS = 50
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+# ------------------------------------------------------------------
+# Indexing
+# ------------------------------------------------------------------
+
+def build_document(order_id, business_name, contact_person, item_names):
+    parts = [f'#{order_id}', business_name or '', contact_person or '']
+    parts.extend(dict.fromkeys(item_names))   # de-duplicated, order kept
+    return ' '.join(p for p in parts if p)
+
+
+def index_orders(order_ids):
+    """(Re)builds the search documents of the given orders in two queries + one insert."""
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+
+    item_names = defaultdict(list)
+    for order_id, item_name in (
+        OrderItem.objects
+        .filter(order_id__in=order_ids)
+        .order_by('id')
+        .values_list('order_id', 'item_name')
+    ):
+        item_names[order_id].append(item_name)
+
+    documents = [
+        OrderSearchDocument(
+            order_id    = order_id,
+            business_id = business_id,
+            document    = build_document(order_id, name, contact, item_names[order_id]),
+        )
+        for order_id, business_id, name, contact in (
+            Order.objects
+            .filter(id__in=order_ids)
+            .values_list('id', 'business_id', 'business__name', 'business__contact_person')
+        )
+    ]
+
+    with transaction.atomic():
+        OrderSearchDocument.objects.filter(order_id__in=order_ids).delete()
+        OrderSearchDocument.objects.bulk_create(documents)
+
+
+def index_order(order):
+    index_orders([order.pk])
+
+
+def reindex_business(business_id, batch_size=1000):
+    """Rebuilds the documents of every order of a business, e.g. after a rename."""
+    order_ids = (
+        Order.objects
+        .filter(business_id=business_id)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    last_id = 0
+    while True:
+        batch = list(order_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        index_orders(batch)
+        last_id = batch[-1]
+
+
+# ------------------------------------------------------------------
+# Querying
+# ------------------------------------------------------------------
+
+def search_order_ids(query, business_id=None, limit=20):
+    """Returns up to `limit` order ids matching `query`, best match first."""
+    tokens = _TOKEN_RE.findall(query or '')
+    if not tokens:
+        return []
+    limit = max(1, min(int(limit), MAX_RESULTS))
+
+    alias  = router.db_for_read(OrderSearchDocument)
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite':
+        ids = _search_sqlite(alias, tokens, business_id, limit)
+    elif vendor == 'postgresql':
+        ids = _search_postgres(alias, query, tokens, business_id, limit)
+    else:
+        ids = _search_fallback(alias, tokens, business_id, limit)
+
+    # an exact order id always ranks first
+    exact = next((int(t) for t in tokens if t.isdigit()), None)
+    if exact is not None and exact in ids:
+        ids.remove(exact)
+        ids.insert(0, exact)
+    return ids
+
+
+def _search_sqlite(alias, tokens, business_id, limit):
+    # every token must match as a prefix: "mang" "kul" -> "mang"* AND "kul"*
+    match = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in tokens)
+    sql   = (
+        'SELECT f.rowid FROM order_search_fts f '
+        'JOIN order_search s ON s.order_id = f.rowid '
+        'WHERE order_search_fts MATCH %s'
+    )
+    params = [match]
+    if business_id is not None:
+        sql += ' AND s.business_id = %s'
+        params.append(business_id)
+    sql += ' ORDER BY bm25(order_search_fts) LIMIT %s'
+    params.append(limit)
+
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_postgres(alias, query, tokens, business_id, limit):
+    # each ILIKE is served by the trigram GIN index; similarity orders the hits
+    sql    = 'SELECT order_id FROM order_search WHERE ' + ' AND '.join(['document ILIKE %s'] * len(tokens))
+    params = ['%' + t.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for t in tokens]
+    if business_id is not None:
+        sql += ' AND business_id = %s'
+        params.append(business_id)
+    sql += ' ORDER BY word_similarity(%s, document) DESC, order_id DESC LIMIT %s'
+    params.extend([query, limit])
+
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_fallback(alias, tokens, business_id, limit):
+    documents = OrderSearchDocument.objects.using(alias)
+    for token in tokens:
+        documents = documents.filter(document__icontains=token)
+    if business_id is not None:
+        documents = documents.filter(business_id=business_id)
+    return list(documents.order_by('-order_id').values_list('order_id', flat=True)[:limit])
@@ -1,14 +1,21 @@
 from django.contrib.auth.hashers import make_password
 from rest_framework              import serializers
 
-from .models import Business, User, Order, OrderItem, AdminLog
+from . import search, snapshots
+from .models import (
+    Business, User, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, StandingOrder, AdminLog, AdminLogSummary,
+    ProfileArtifact,
+)
 
 
 class BusinessSerializer(serializers.ModelSerializer):
     class Meta:
         model  = Business
-        fields = ['id', 'name', 'contact_person', 'address', 'phone', 'email', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'name', 'contact_person', 'address', 'phone', 'email', 'created_at',
+            'order_count', 'open_order_count', 'lifetime_value', 'last_order_at',
+        ]
+        read_only_fields = ['id', 'created_at', *Business.COUNTER_FIELDS]
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -87,12 +94,13 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         order      = Order.objects.create(**validated_data)
-        total      = 0
-        for item_data in items_data:
-            item   = OrderItem.objects.create(order=order, **item_data)
-            total += item.subtotal
-        order.total_amount = total
-        order.save(update_fields=['total_amount'])
+        items      = OrderItem.objects.bulk_create(
+            OrderItem(order=order, **item_data) for item_data in items_data
+        )
+        order.total_amount = sum(item.subtotal for item in items)
+        order.snapshot     = snapshots.build_for(order, items)
+        order.save(update_fields=['total_amount', 'snapshot'])
+        search.index_order(order)
         return order
 
     def update(self, instance, validated_data):
@@ -102,19 +110,148 @@ class OrderSerializer(serializers.ModelSerializer):
         instance.save()
         if items_data is not None:
             instance.items.all().delete()
-            total = 0
-            for item_data in items_data:
-                item   = OrderItem.objects.create(order=instance, **item_data)
-                total += item.subtotal
-            instance.total_amount = total
-            instance.save(update_fields=['total_amount'])
+            items = OrderItem.objects.bulk_create(
+                OrderItem(order=instance, **item_data) for item_data in items_data
+            )
+            instance.total_amount = sum(item.subtotal for item in items)
+        else:
+            items = list(instance.items.all())
+        instance.snapshot = snapshots.build_for(instance, items)
+        instance.save(update_fields=['total_amount', 'snapshot'])
+        search.index_order(instance)
         return instance
 
 
+class OrderSnapshotSerializer(OrderSerializer):
+    """
+    Prints the same fields as OrderSerializer, but takes the business name
+    and items from Order.snapshot instead of joined tables (see snapshots.py).
+    Read only; only for orders whose snapshot is set.
+    """
+    business_name = serializers.CharField(source='snapshot.business_name', read_only=True)
+    items         = serializers.ListField(source='snapshot.items', read_only=True)
+
+
+class ArchivedOrderItemSerializer(serializers.ModelSerializer):
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model  = ArchivedOrderItem
+        fields = ['id', 'item_name', 'quantity', 'price', 'subtotal']
+        read_only_fields = fields
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """Read-only counterpart of OrderSerializer for orders moved to the archive."""
+    items                  = ArchivedOrderItemSerializer(many=True, read_only=True)
+    business_name          = serializers.CharField(source='business.name', read_only=True)
+    payment_screenshot_url = serializers.SerializerMethodField()
+    archived               = serializers.SerializerMethodField()
+
+    class Meta:
+        model  = ArchivedOrder
+        fields = [
+            'id', 'business', 'business_name',
+            'order_date', 'status', 'total_amount', 'email_sent',
+            'payment_done', 'payment_screenshot_url',
+            'items', 'archived',
+        ]
+        read_only_fields = fields
+
+    get_payment_screenshot_url = OrderSerializer.get_payment_screenshot_url
+
+    def get_archived(self, obj):
+        return True
+
+
+class WeekdaysField(serializers.Field):
+    """StandingOrder.weekdays bitmask as a list of weekday numbers, Monday = 0."""
+
+    def to_representation(self, value):
+        return [day for day in range(7) if value & (1 << day)]
+
+    def to_internal_value(self, data):
+        if (
+            not isinstance(data, list) or not data
+            or not all(isinstance(day, int) and 0 <= day <= 6 for day in data)
+        ):
+            raise serializers.ValidationError('weekdays must be a non-empty list of 0 (Monday) to 6 (Sunday).')
+        return sum(1 << day for day in set(data))
+
+
+class StandingOrderSerializer(serializers.ModelSerializer):
+    items         = OrderItemSerializer(many=True)
+    weekdays      = WeekdaysField(required=False)
+    business_name = serializers.CharField(source='business.name', read_only=True)
+
+    class Meta:
+        model  = StandingOrder
+        fields = [
+            'id', 'business', 'business_name', 'items',
+            'weekdays', 'interval_days', 'start_date', 'end_date', 'active',
+            'last_generated_on', 'created_at',
+        ]
+        read_only_fields = ['id', 'business_name', 'last_generated_on', 'created_at']
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError('A standing order must have at least one item.')
+        # stored as JSON, so the price goes in as a string
+        return [
+            {'item_name': item['item_name'], 'quantity': item['quantity'], 'price': str(item['price'])}
+            for item in value
+        ]
+
+    def validate_interval_days(self, value):
+        if value < 1:
+            raise serializers.ValidationError('interval_days must be at least 1.')
+        return value
+
+    def validate(self, attrs):
+        start = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end   = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start is not None and end is not None and end < start:
+            raise serializers.ValidationError({'end_date': 'end_date must not be before start_date.'})
+        return attrs
+
+
 class AdminLogSerializer(serializers.ModelSerializer):
     admin_username = serializers.CharField(source='admin_user.username', read_only=True)
 
     class Meta:
         model  = AdminLog
         fields = ['id', 'admin_username', 'action', 'action_time']
-        read_only_fields = ['id', 'admin_username', 'action', 'action_time']
\ No newline at end of file
+        read_only_fields = ['id', 'admin_username', 'action', 'action_time']
+
+
+class AdminLogSummarySerializer(serializers.ModelSerializer):
+    admin_username = serializers.CharField(source='admin_user.username', read_only=True)
+    month          = serializers.DateField(format='%Y-%m', read_only=True)
+
+    class Meta:
+        model  = AdminLogSummary
+        fields = ['month', 'admin_user', 'admin_username', 'action_type', 'count', 'first_at', 'last_at']
+        read_only_fields = fields
+
+
+class ProfileArtifactSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+
+    class Meta:
+        model  = ProfileArtifact
+        fields = [
+            'id', 'trigger', 'method', 'path', 'status_code', 'duration_ms',
+            'query_count', 'sql_ms', 'username', 'created_at',
+        ]
+        read_only_fields = fields
+
+
+class ProfileArtifactDetailSerializer(ProfileArtifactSerializer):
+    has_profile = serializers.SerializerMethodField()
+
+    class Meta(ProfileArtifactSerializer.Meta):
+        fields = ProfileArtifactSerializer.Meta.fields + ['has_profile', 'summary', 'queries']
+        read_only_fields = fields
+
+    def get_has_profile(self, obj):
+        return bool(obj.profile)
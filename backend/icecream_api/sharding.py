@@ -0,0 +1,327 @@
+"""
+Opt-in sharding of order data by business.
+
+Off unless settings.DATABASE_SHARDS lists database aliases. When on:
+
+- Orders and everything hanging off them (items, search documents,
+  tombstones, archived orders, email jobs) live on the shard of their
+  business: SHARD_MAP[business_id] if the business is mapped explicitly
+  (e.g. a large customer on its own database), else
+  DATABASE_SHARDS[business_id % len(DATABASE_SHARDS)].
+- Everything else (businesses, users, logs, ...) stays on `default`.
+  Businesses are mirrored to every shard so order rows keep their foreign
+  key and select_related('business') still joins locally.
+- Order ids come from the order_directory table on `default`, so they are
+  unique across shards and an order id alone finds its shard.
+
+Queries on sharded models are routed by, in order: the instance they come
+from (obj.items.all(), obj.save()), the shard pinned for the current request
+(pin_business() / pin_order() / use_shard()), and otherwise fail with
+ShardingError instead of silently reading `default`. Customers' requests are
+pinned to their business's shard by require_auth(); admin-wide reads (order
+lists, item demand, invoice batches, metrics) fan out over every shard and
+merge. Workers and maintenance commands (emails, archive, reconcile,
+counters, snapshots, search rebuild, tombstones, standing orders) loop over
+the shards with each_shard().
+
+Known gaps: moving existing orders onto shards is not automated, and the
+webhook outbox stays on `default`, so it commits after, not with, the
+order it announces (see webhooks.py).
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib         import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db   import DEFAULT_DB_ALIAS, connections, transaction
+
+
+SHARDED_MODELS = {
+    'order', 'orderitem', 'ordersearchdocument', 'ordertombstone',
+    'archivedorder', 'archivedorderitem', 'emailjob',
+}
+
+
+class ShardingError(Exception):
+    """A query on sharded data could not be routed to a shard."""
+
+
+# the shard the current request (thread or task) works on; reset per request
+# by ShardPinningMiddleware
+_current = contextvars.ContextVar('icecream_shard', default=None)
+
+
+def shard_aliases():
+    return list(getattr(settings, 'DATABASE_SHARDS', ()))
+
+
+def enabled():
+    return bool(shard_aliases())
+
+
+def shard_for(business_id):
+    shards = shard_aliases()
+    mapped = settings.SHARD_MAP.get(str(business_id))
+    if mapped is not None:
+        return mapped
+    return shards[int(business_id) % len(shards)]
+
+
+def current_shard():
+    return _current.get()
+
+
+@contextmanager
+def use_shard(alias):
+    """Routes unhinted queries on sharded models inside the block to `alias`."""
+    token = _current.set(alias)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def for_business(business_id):
+    """use_shard() for a business's shard; a no-op when sharding is off."""
+    if not enabled() or business_id is None:
+        return nullcontext()
+    return use_shard(shard_for(business_id))
+
+
+def following(instance):
+    """use_shard() for the shard an already saved / loaded instance lives on."""
+    alias = instance._state.db
+    return use_shard(alias) if alias in shard_aliases() else nullcontext()
+
+
+# ------------------------------------------------------------------
+# Request pinning
+# ------------------------------------------------------------------
+
+def pin(alias):
+    """Pins the rest of the current request to a shard (see ShardPinningMiddleware)."""
+    _current.set(alias)
+
+
+def pin_business(business_id):
+    if enabled() and business_id is not None:
+        pin(shard_for(business_id))
+
+
+def pin_order(order_id):
+    """Pins to the shard holding order_id. Returns False when the order is unknown."""
+    if not enabled():
+        return True
+    alias = locate_order(order_id)
+    if alias is None:
+        return False
+    pin(alias)
+    return True
+
+
+def iterate_on(alias, iterable):
+    """
+    Iterates `iterable` with every step pinned to `alias` (unpinned when it
+    is None), for generators drained after the pin they were made under is
+    gone, e.g. by a streaming response.
+    """
+    if alias is None:
+        return iterable
+    return _iterate_on(alias, iter(iterable))
+
+
+def _iterate_on(alias, iterator):
+    while True:
+        with use_shard(alias):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def atomic():
+    """transaction.atomic() on the pinned shard; a no-op when sharding is off."""
+    alias = current_shard()
+    return transaction.atomic(using=alias) if alias else nullcontext()
+
+
+class ShardPinningMiddleware:
+    """
+    Gives every request its own shard pin, and turns queries a view could not
+    route into a 501 instead of a 500.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, ShardingError):
+            from django.http import JsonResponse
+            return JsonResponse({'error': 'This endpoint does not support sharded orders yet.'}, status=501)
+        return None
+
+
+# ------------------------------------------------------------------
+# Order ids
+# ------------------------------------------------------------------
+
+def assign_order_ids(orders):
+    """Gives unsaved orders ids from the directory on `default` (one INSERT)."""
+    from .models import OrderDirectory
+
+    pending = [order for order in orders if order.pk is None]
+    if not pending:
+        return
+    entries = OrderDirectory.objects.bulk_create(
+        OrderDirectory(business_id=order.business_id) for order in pending
+    )
+    for order, entry in zip(pending, entries):
+        order.pk = entry.pk
+
+
+def locate_order(order_id):
+    from .models import OrderDirectory
+
+    business_id = OrderDirectory.objects.filter(pk=order_id).values_list('business_id', flat=True).first()
+    return None if business_id is None else shard_for(business_id)
+
+
+# ------------------------------------------------------------------
+# Business mirror
+# ------------------------------------------------------------------
+
+def mirror_business(business):
+    """Copies a business row to every shard (insert or update)."""
+    from .models import Business
+
+    fields = [f.attname for f in Business._meta.concrete_fields if not f.primary_key]
+    for alias in shard_aliases():
+        Business.objects.using(alias).bulk_create(
+            [business],
+            update_conflicts = True,
+            unique_fields    = ['id'],
+            update_fields    = fields,
+        )
+    business._state.db = DEFAULT_DB_ALIAS   # bulk_create re-tags the instance
+
+
+def unmirror_business(business_id):
+    """Deletes a business, and with it its orders, from every shard."""
+    from .models import Business
+
+    for alias in shard_aliases():
+        Business.objects.using(alias).filter(pk=business_id).delete()
+
+
+# ------------------------------------------------------------------
+# Fan-out
+# ------------------------------------------------------------------
+
+def each_shard():
+    """
+    Runs the body of `for alias in each_shard():` once per shard, pinned to
+    it, for workers and maintenance commands that cover every business.
+    While sharding is off the body runs once, unpinned, with alias `default`.
+    """
+    if not enabled():
+        yield DEFAULT_DB_ALIAS
+        return
+    for alias in shard_aliases():
+        with use_shard(alias):
+            yield alias
+
+
+def each_shard_of(business_ids):
+    """
+    Like each_shard(), but only over the shards holding the given businesses,
+    yielding (alias, the ids of those on it).
+    """
+    business_ids = list(business_ids)
+    if not enabled():
+        yield DEFAULT_DB_ALIAS, business_ids
+        return
+    groups = {}
+    for business_id in business_ids:
+        groups.setdefault(shard_for(business_id), []).append(business_id)
+    for alias, ids in groups.items():
+        with use_shard(alias):
+            yield alias, ids
+
+
+def fan_out(fn):
+    """
+    Calls fn(alias) for every shard in parallel threads, each pinned to its
+    shard, and returns the results in shard order.
+    """
+    def run(alias):
+        try:
+            with use_shard(alias):
+                return fn(alias)
+        finally:
+            connections.close_all()   # the thread's own connections
+
+    shards = shard_aliases()
+    with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix='shard-fan-out') as executor:
+        return list(executor.map(run, shards))
+
+
+# ------------------------------------------------------------------
+# Router
+# ------------------------------------------------------------------
+
+def _instance_shard(instance):
+    shards = shard_aliases()
+    if instance._state.db in shards:
+        return instance._state.db
+    business_id = getattr(instance, 'business_id', None)
+    if business_id is not None:
+        return shard_for(business_id)
+    order = instance._state.fields_cache.get('order')
+    if order is not None:
+        return order._state.db if order._state.db in shards else shard_for(order.business_id)
+    order_id = getattr(instance, 'order_id', None)
+    if order_id is not None:
+        return locate_order(order_id)
+    return None
+
+
+class ShardRouter:
+    """
+    Sends order data to its business's shard. Does nothing (returns None for
+    everything) while sharding is off, so ReplicaRouter decides as before.
+    """
+
+    def _route(self, model, **hints):
+        if not enabled() or model._meta.model_name not in SHARDED_MODELS:
+            return None
+        instance = hints.get('instance')
+        alias    = _instance_shard(instance) if instance is not None else None
+        alias    = alias or current_shard()
+        if alias is None:
+            raise ShardingError(
+                f'{model.__name__} query has no shard: pin one with sharding.pin_business(), '
+                'pin_order() or use_shard(), or use .using().'
+            )
+        return alias
+
+    db_for_read  = _route
+    db_for_write = _route
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # orders on a shard point at businesses loaded from default
+        if enabled():
+            databases = {DEFAULT_DB_ALIAS, *shard_aliases()}
+            if obj1._state.db in databases and obj2._state.db in databases:
+                return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None   # shards carry the full schema
@@ -0,0 +1,99 @@
+"""
+Model signal handlers that keep derived data in sync with writes made
+outside the API views (Django admin, shell, management commands).
+
+Connected in IcecreamApiConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch          import receiver
+
+from . import caching, counters, search, sharding, snapshots
+from .models import Business, Order, OrderItem, OrderTombstone
+
+
+@receiver(pre_save, sender=Business)
+def _remember_business_search_fields(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._search_stale   = False
+        instance._snapshot_stale = False
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list('name', 'contact_person').first()
+    instance._search_stale   = old != (instance.name, instance.contact_person)
+    instance._snapshot_stale = old is not None and old[0] != instance.name
+
+
+# connected first: the receivers below read the business through the shard copies
+@receiver(post_save, sender=Business)
+def _mirror_business(sender, instance, raw=False, using=None, **kwargs):
+    if not raw and sharding.enabled() and using not in sharding.shard_aliases():
+        sharding.mirror_business(instance)
+
+
+@receiver(post_save, sender=Business)
+def _reindex_business_orders(sender, instance, created, raw=False, **kwargs):
+    if not raw and getattr(instance, '_search_stale', False):
+        with sharding.for_business(instance.pk):
+            search.reindex_business(instance.pk)
+
+
+@receiver(post_save, sender=Business)
+def _refresh_business_snapshots(sender, instance, created, raw=False, **kwargs):
+    if not raw and getattr(instance, '_snapshot_stale', False):
+        with sharding.for_business(instance.pk):
+            snapshots.refresh_business(instance.pk)
+
+
+@receiver(post_delete, sender=Business)
+def _unmirror_business(sender, instance, using=None, **kwargs):
+    if sharding.enabled() and using not in sharding.shard_aliases():
+        sharding.unmirror_business(instance.pk)
+
+
+@receiver(pre_save, sender=Order)
+def _allocate_sharded_order_id(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is None and sharding.enabled():
+        sharding.assign_order_ids([instance])
+
+
+@receiver(post_save,   sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def _reindex_order(sender, instance, raw=False, origin=None, **kwargs):
+    # OrderSerializer creates items with bulk_create and indexes once itself;
+    # these fire for single-item edits such as the Django admin.
+    if isinstance(origin, Order) or getattr(origin, 'model', None) is Order:
+        return   # the whole order is being deleted, its document goes with it
+    if not raw:
+        with sharding.following(instance):
+            search.index_orders([instance.order_id])
+            snapshots.refresh_orders([instance.order_id])
+            caching.bump_analytics_version(using=instance._state.db)
+            caching.bump_business_versions(
+                Order.objects.filter(pk=instance.order_id).values_list('business_id', flat=True).first(),
+                using=instance._state.db,
+            )
+
+
+@receiver(post_save,   sender=Order)
+@receiver(post_delete, sender=Order)
+def _invalidate_order_caches(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        caching.bump_analytics_version(using=using)
+        caching.bump_business_versions(instance.business_id, using=using)
+
+
+@receiver(post_save, sender=Order)
+def _count_saved_order(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        with sharding.following(instance):
+            counters.order_saved(instance, created)
+
+
+@receiver(post_delete, sender=Order)
+def _uncount_deleted_order(sender, instance, **kwargs):
+    with sharding.following(instance):
+        counters.order_deleted(instance)
+
+
+@receiver(post_delete, sender=Order)
+def _record_order_tombstone(sender, instance, **kwargs):
+    OrderTombstone.objects.create(order_id=instance.pk, business_id=instance.business_id)
@@ -0,0 +1,185 @@
+"""
+Standing (recurring) orders.
+
+generate() turns every standing order due on a day into an ordinary Pending
+order, a chunk of standing orders per transaction:
+
+- stock is reserved for the whole chunk with stock.reserve_many(); a
+  standing order short of stock is skipped and reported, and stays due, so
+  a re-run after restocking places it;
+- orders and items are inserted with two bulk_create calls per chunk;
+- admin logs, search documents, order snapshots, business counters,
+  cache versions, order.created webhook deliveries and stream events are
+  written once per chunk, since bulk_create sends no post_save;
+- the chunk's standing orders are locked and stamped with last_generated_on,
+  and orders_standing_day_uniq backs that up, so re-running on the same day
+  (or two generators at once) never places an order twice;
+- with sharding on, a chunk's orders are written shard by shard, each in a
+  transaction on its shard nested in the chunk's one on `default`. A run
+  that dies between the two commits leaves placed orders behind unstamped
+  standing orders; the next run finds and stamps those instead of placing
+  them again.
+"""
+from django.db    import transaction
+from django.utils import timezone
+
+from . import caching, counters, events, search, sharding, snapshots, stock, webhooks
+from .models      import AdminLog, Order, OrderItem, StandingOrder, StockReservation
+from .serializers import OrderSerializer
+
+
+def due_ids(day):
+    """Ids of the standing orders that still need an order on `day`."""
+    candidates = (
+        StandingOrder.objects
+        .filter(active=True, start_date__lte=day)
+        .exclude(end_date__lt=day)
+        .exclude(last_generated_on__gte=day)
+        .order_by('id')
+        .only('id', 'weekdays', 'interval_days', 'start_date', 'end_date', 'active')
+    )
+    return [standing.id for standing in candidates.iterator() if standing.is_due(day)]
+
+
+def generate(day=None, admin_user=None, chunk_size=500):
+    """
+    Places the orders due on `day` (default: today). Returns the created
+    orders and {standing order id: stock.OutOfStock} for the ones skipped
+    for lack of stock. When admin_user is given, every order is logged
+    under that admin.
+    """
+    day = day or timezone.localdate()
+    ids = due_ids(day)
+    created   = []
+    shortages = {}
+    for start in range(0, len(ids), chunk_size):
+        orders, short = _generate_chunk(ids[start:start + chunk_size], day, admin_user)
+        created.extend(orders)
+        shortages.update(short)
+    return created, shortages
+
+
+@transaction.atomic
+def _generate_chunk(standing_ids, day, admin_user):
+    standing_orders = list(
+        StandingOrder.objects
+        .select_for_update()
+        .filter(id__in=standing_ids)
+        .exclude(last_generated_on__gte=day)   # placed by a concurrent run meanwhile
+        .order_by('id')
+    )
+    standing_orders = _skip_placed(standing_orders, day)
+    reservations, shortages = stock.reserve_many(
+        {s.id: [(item['item_name'], item['quantity']) for item in s.items] for s in standing_orders},
+        day,
+    )
+    standing_orders = [s for s in standing_orders if s.id not in shortages]
+    if not standing_orders:
+        return [], shortages
+
+    now    = timezone.now()
+    orders = [
+        Order(
+            business_id    = standing.business_id,
+            order_date     = now,
+            status         = Order.Status.PENDING,
+            total_amount   = standing.total_amount(),
+            standing_order = standing,
+            scheduled_for  = day,
+        )
+        for standing in standing_orders
+    ]
+    for placed in _by_shard(zip(standing_orders, orders)):
+        with sharding.atomic():
+            _insert(placed)
+    StockReservation.objects.bulk_create(
+        StockReservation(order_id=order.id, stock_id=reservation.stock_id, quantity=reservation.quantity)
+        for standing, order in zip(standing_orders, orders)
+        for reservation in reservations[standing.id]
+    )
+    StandingOrder.objects.filter(id__in=[s.id for s in standing_orders]).update(last_generated_on=day)
+
+    if admin_user is not None:
+        AdminLog.objects.bulk_create(
+            AdminLog(
+                admin_user  = admin_user,
+                action      = f'Placed order #{order.id} for business #{order.business_id} '
+                              f'from standing order #{order.standing_order_id}',
+                action_time = now,
+            )
+            for order in orders
+        )
+
+    counters.orders_created(orders)
+    caching.bump_analytics_version()
+    caching.bump_business_versions(*{order.business_id for order in orders})
+    return orders, shortages
+
+
+def _skip_placed(standing_orders, day):
+    """
+    Drops, and stamps, the standing orders whose order for `day` is already
+    on their shard. With sharding on, a chunk's orders commit on their shards
+    before its stamps commit on `default`, so a run that died in between
+    leaves placed orders behind unstamped standing orders.
+    """
+    if not sharding.enabled():
+        return standing_orders
+    placed = set()
+    for _, ids in sharding.each_shard_of({s.business_id for s in standing_orders}):
+        placed.update(
+            Order.objects
+            .filter(business_id__in=ids, standing_order__in=standing_orders, scheduled_for=day)
+            .values_list('standing_order_id', flat=True)
+        )
+    if placed:
+        StandingOrder.objects.filter(id__in=placed).update(last_generated_on=day)
+    return [s for s in standing_orders if s.id not in placed]
+
+
+def _by_shard(pairs):
+    """
+    Groups (standing order, order) pairs by the shard their orders go to,
+    yielding each group pinned to its shard; a single unpinned group while
+    sharding is off.
+    """
+    pairs = list(pairs)
+    for _, business_ids in sharding.each_shard_of({order.business_id for _, order in pairs}):
+        business_ids = set(business_ids)
+        yield [(standing, order) for standing, order in pairs if order.business_id in business_ids]
+
+
+def _insert(pairs):
+    """Writes one shard's orders with their items, search documents, snapshots and events."""
+    orders = [order for _, order in pairs]
+    if sharding.enabled():
+        sharding.assign_order_ids(orders)   # bulk_create sends no pre_save
+    Order.objects.bulk_create(orders)
+    OrderItem.objects.bulk_create(
+        (
+            OrderItem(
+                order     = order,
+                item_name = item['item_name'],
+                quantity  = int(item['quantity']),
+                price     = item['price'],
+            )
+            for standing, order in pairs
+            for item in standing.items
+        ),
+        batch_size=1000,
+    )
+    order_ids = [order.id for order in orders]
+    search.index_orders(order_ids)
+    snapshots.refresh_orders(order_ids)
+    _announce(order_ids)
+
+
+def _announce(order_ids):
+    """
+    order.created webhook outbox rows and stream events for the chunk's
+    orders, as placing them by hand writes.
+    """
+    placed = Order.objects.select_related('business').prefetch_related('items').filter(id__in=order_ids).order_by('id')
+    pairs  = [(order, OrderSerializer(order).data) for order in placed]
+    webhooks.enqueue_many(events.ORDER_CREATED, pairs)
+    events.publish_order_events(events.ORDER_CREATED, pairs)
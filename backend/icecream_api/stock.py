@@ -0,0 +1,154 @@
+"""
+Daily stock per flavour: reserved when an order is placed (or generated from
+a standing order), released when it is cancelled.
+
+Every change is a conditional UPDATE on a single product_stock row:
+
+    UPDATE product_stock SET available = available - n, reserved = reserved + n
+    WHERE id = %s AND available >= n
+
+Concurrent orders for the same flavour only queue on that row's lock for the
+rest of their transaction, and an order that would oversell matches no row
+and fails. There is no SELECT ... FOR UPDATE and no table lock. An order
+touches its rows in item_name order, so two orders for the same flavours
+cannot deadlock.
+
+Flavours without a ProductStock row for the day are not tracked.
+"""
+from collections import defaultdict
+
+from django.db.models import F
+from django.utils     import timezone
+
+from .models import ProductStock, StockReservation
+
+
+class OutOfStock(Exception):
+    """An order asked for more of a flavour than is left for the day."""
+
+    def __init__(self, item_name, requested, available):
+        super().__init__(f'Only {available} x {item_name} left today, {requested} requested.')
+        self.item_name = item_name
+        self.requested = requested
+        self.available = available
+
+
+def _take(stock_id, quantity):
+    return (
+        ProductStock.objects
+        .filter(id=stock_id, available__gte=quantity)
+        .update(available=F('available') - quantity, reserved=F('reserved') + quantity)
+    )
+
+
+def _give_back(stock_id, quantity):
+    ProductStock.objects.filter(id=stock_id).update(
+        available = F('available') + quantity,
+        reserved  = F('reserved') - quantity,
+    )
+
+
+def _available(stock_id):
+    return ProductStock.objects.filter(id=stock_id).values_list('available', flat=True).first() or 0
+
+
+def _wanted(items):
+    wanted = defaultdict(int)
+    for item_name, quantity in items:
+        wanted[item_name] += int(quantity)
+    return wanted
+
+
+def _tracked(day, item_names):
+    return dict(
+        ProductStock.objects
+        .filter(day=day, item_name__in=list(item_names))
+        .values_list('item_name', 'id')
+    )
+
+
+def reserve(items, day=None):
+    """
+    Takes stock for one order's (item_name, quantity) pairs. Call inside a
+    transaction: on OutOfStock the caller rolls back what was already taken.
+    Returns unsaved reservations to record() once the order has an id.
+    """
+    wanted  = _wanted(items)
+    tracked = _tracked(day or timezone.localdate(), wanted)
+
+    reservations = []
+    for item_name in sorted(tracked):
+        stock_id = tracked[item_name]
+        quantity = wanted[item_name]
+        if not _take(stock_id, quantity):
+            raise OutOfStock(item_name, quantity, _available(stock_id))
+        reservations.append(StockReservation(stock_id=stock_id, quantity=quantity))
+    return reservations
+
+
+def reserve_many(orders, day=None):
+    """
+    reserve() for many orders at once, e.g. a chunk of standing orders:
+    `orders` maps a key to that order's (item_name, quantity) pairs.
+
+    Flavours are taken in item_name order across all the orders, so this
+    queues behind (and never deadlocks with) single reserve() calls, and a
+    flavour with enough left for every order costs one UPDATE. When it is
+    short, orders are served one by one in key order; an order that cannot
+    be served gets back what it already took and is left out.
+
+    Returns (reservations, shortages): {key: unsaved reservations} for the
+    orders that got their stock, and {key: OutOfStock} for those that did not.
+    """
+    wanted  = {key: _wanted(items) for key, items in orders.items()}
+    tracked = _tracked(day or timezone.localdate(), {name for items in wanted.values() for name in items})
+
+    taken     = defaultdict(list)
+    shortages = {}
+    for item_name in sorted(tracked):
+        stock_id = tracked[item_name]
+        needing  = [
+            (key, items[item_name]) for key, items in wanted.items()
+            if key not in shortages and item_name in items
+        ]
+        if not needing:
+            continue
+        if _take(stock_id, sum(quantity for _, quantity in needing)):
+            served = needing
+        else:
+            served = []
+            for key, quantity in needing:
+                if _take(stock_id, quantity):
+                    served.append((key, quantity))
+                    continue
+                shortages[key] = OutOfStock(item_name, quantity, _available(stock_id))
+                for reservation in taken.pop(key, ()):
+                    _give_back(reservation.stock_id, reservation.quantity)
+        for key, quantity in served:
+            taken[key].append(StockReservation(stock_id=stock_id, quantity=quantity))
+
+    return {key: taken.get(key, []) for key in orders if key not in shortages}, shortages
+
+
+def record(order, reservations):
+    if reservations:
+        for reservation in reservations:
+            reservation.order_id = order.pk
+        StockReservation.objects.bulk_create(reservations)
+
+
+def release(order_id):
+    """Gives an order's stock back. Safe to call twice. Returns the units released."""
+    now      = timezone.now()
+    released = 0
+    for reservation_id, stock_id, quantity in (
+        StockReservation.objects
+        .filter(order_id=order_id, released_at__isnull=True)
+        .order_by('stock__item_name')
+        .values_list('id', 'stock_id', 'quantity')
+    ):
+        # claimed first, so concurrent cancels give each reservation back once
+        if StockReservation.objects.filter(id=reservation_id, released_at__isnull=True).update(released_at=now):
+            _give_back(stock_id, quantity)
+            released += quantity
+    return released
@@ -2,9 +2,11 @@
 from django.contrib.auth.hashers import make_password
 from rest_framework.test         import APIClient
 from rest_framework              import status
-from django.test                 import TestCase
+from django.test                 import TestCase, TransactionTestCase, override_settings
 
-from .models import Business, User, Order, OrderItem, AdminLog
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Business, User, Order, OrderItem, AdminLog, IdempotencyKey
 
 class BaseTestCase(TestCase):
     """Creates shared test data used across all test classes."""
@@ -38,6 +40,19 @@ class BaseTestCase(TestCase):
         """Returns the X-User-Id header dict for a given user."""
         return {'HTTP_X_USER_ID': str(user.id)}
 
+    def bearer(self, user):
+        """Returns a Bearer Authorization header dict for a given user."""
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    def make_order(self, business=None, items=(('Vanilla Tub', 2, '4.50'),), **fields):
+        """Creates an order with items directly in the database, running its on-commit hooks."""
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(business=business or self.business, **fields)
+            for item_name, quantity, price in items:
+                OrderItem.objects.create(order=order, item_name=item_name, quantity=quantity, price=price)
+            order.recalculate_total()
+        return order
+
 
 class LoginTests(BaseTestCase):
 
@@ -135,7 +150,8 @@ class UpdateOrderStatusTests(BaseTestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'Confirmed')
-        self.assertTrue(response.data['email_sent'])
+        # the confirmation email is queued; email_sent flips once it is delivered
+        self.assertFalse(response.data['email_sent'])
 
     def test_customer_cannot_update_status(self):
         response = self.client.patch(
@@ -175,4 +191,2133 @@ class AdminLogTests(BaseTestCase):
 
     def test_customer_cannot_view_logs(self):
         response = self.client.get('/api/admin/logs/', **self.auth_header(self.customer))
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RendererTests(BaseTestCase):
+
+    def test_fast_renderer_matches_stock_output(self):
+        from datetime import datetime, timezone as dt_timezone
+        from decimal  import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+
+        data = {
+            'when':   datetime(2026, 5, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'amount': Decimal('12.50'),
+            'name':   'Kesar\u2028Pista',
+            'nested': [{'id': 1, 'ok': True, 'none': None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_order_list_is_rendered_identically(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        from .views     import _order_list_qs, _serialize_order_list
+
+        self.make_order(items=[('Mango Kulfi', 3, '120.00'), ('Choc Scoop', 1, '1.20')])
+        data = _serialize_order_list(_order_list_qs())
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(RESPONSE_COMPRESSION_MIN_SIZE=200)
+class CompressionTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(10):
+            self.make_order(items=[('Mango Kulfi', 3, '120.00'), ('Vanilla Tub', 2, '4.50')])
+
+    def test_large_json_is_gzipped_when_accepted(self):
+        import gzip, json
+        response = self.client.get('/api/orders/', HTTP_ACCEPT_ENCODING='gzip', **self.bearer(self.admin))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 10)
+
+    def test_identity_when_not_accepted(self):
+        response = self.client.get('/api/orders/', **self.bearer(self.admin))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(response.json()), 10)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/api/auth/me/', HTTP_ACCEPT_ENCODING='gzip', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_brotli_preferred_when_available(self):
+        from . import middleware
+        if middleware.brotli is None:
+            self.skipTest('brotli not installed')
+        response = self.client.get('/api/orders/', HTTP_ACCEPT_ENCODING='gzip, br', **self.bearer(self.admin))
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+
+class ArchiveOrdersTests(BaseTestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        super().setUp()
+        now = timezone.now()
+        self.old_done = self.make_order(status=Order.Status.COMPLETED, order_date=now - timedelta(days=400))
+        self.old_open = self.make_order(status=Order.Status.PENDING,   order_date=now - timedelta(days=300))
+        self.recent   = self.make_order(status=Order.Status.COMPLETED)
+
+    def archive(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('archive_orders', stdout=StringIO(), **options)
+
+    def test_command_moves_only_old_closed_orders(self):
+        from .models import ArchivedOrder, ArchivedOrderItem
+
+        self.archive(days=180, batch_size=1)
+
+        self.assertFalse(Order.objects.filter(id=self.old_done.id).exists())
+        self.assertEqual(list(ArchivedOrder.objects.values_list('id', flat=True)), [self.old_done.id])
+        self.assertEqual(ArchivedOrderItem.objects.filter(order_id=self.old_done.id).count(), 1)
+        self.assertEqual(ArchivedOrder.objects.get().total_amount, self.old_done.total_amount)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_include_archived_unions_both_stores(self):
+        self.archive(days=180)
+
+        hot = self.client.get('/api/orders/my-orders/', **self.bearer(self.customer)).json()
+        self.assertEqual([o['id'] for o in hot], [self.recent.id, self.old_open.id])
+
+        everything = self.client.get('/api/orders/?include_archived=true', **self.bearer(self.admin)).json()
+        self.assertEqual(
+            [o['id'] for o in everything],
+            [self.recent.id, self.old_open.id, self.old_done.id],
+        )
+        self.assertTrue(everything[2]['archived'])
+        self.assertNotIn('archived', everything[0])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(BaseTestCase):
+    """Runs against the two SQLite databases configured in icecream_project.test_settings."""
+
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .routers import reset_replica_health
+        super().setUp()
+        cache.clear()
+        reset_replica_health()
+        # the "replica" deliberately lags: it only knows about the business
+        Business.objects.using('replica_1').create(id=self.business.id, name=self.business.name)
+        self.make_order()
+
+    def test_reads_go_to_replica(self):
+        response = self.client.get('/api/orders/my-orders/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)   # user row not replicated yet
+
+        User.objects.using('replica_1').create(
+            id=self.customer.id, username='sunny_user', password_hash='x',
+            role=User.Role.CUSTOMER, business_id=self.business.id,
+        )
+        response = self.client.get('/api/orders/my-orders/', **self.bearer(self.customer))
+        self.assertEqual(response.json(), [])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        payload = {'items': [{'item_name': 'Mango Kulfi', 'quantity': 1, 'price': '100.00'}]}
+        response = self.client.post('/api/orders/place/', payload, format='json', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get('/api/orders/my-orders/', **self.bearer(self.customer))
+        self.assertEqual(len(response.json()), 2)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        from .routers import mark_replica_unhealthy
+        mark_replica_unhealthy('replica_1')
+        response = self.client.get('/api/orders/my-orders/', **self.bearer(self.customer))
+        self.assertEqual(len(response.json()), 1)
+
+    def test_router_sends_writes_to_primary(self):
+        from django.core.cache.backends.db import DatabaseCache
+        from .routers import ReplicaRouter, use_primary
+        router      = ReplicaRouter()
+        cache_model = DatabaseCache('django_cache', {}).cache_model_class
+        self.assertEqual(router.db_for_write(Order), 'default')
+        self.assertEqual(router.db_for_read(Order), 'default')   # outside a request
+        with use_primary(False):
+            self.assertEqual(router.db_for_read(Order), 'replica_1')
+            self.assertEqual(router.db_for_read(cache_model), 'default')
+        self.assertFalse(router.allow_migrate('replica_1', 'icecream_api'))
+
+    def test_workers_claim_jobs_on_the_primary(self):
+        from .models import EmailJob
+
+        order = Order.objects.create(business=self.business)
+        job   = EmailJob.objects.create(order=order, kind=EmailJob.Kind.ORDER_CONFIRMED, to_email='a@b.com')
+        self.assertEqual([j.id for j in EmailJob.claim_batch(5)], [job.id])
+
+
+class OrderSearchTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = Business.objects.create(name='Polar Parlour', contact_person='Ravi Sharma')
+        self.mango = self.make_order(items=[('Mango Kulfi', 3, '120.00')])
+        self.choc  = self.make_order(business=self.other, items=[('Chocolate Cone', 1, '50.00')])
+
+    def search(self, user, query):
+        from urllib.parse import quote
+        response = self.client.get(f'/api/orders/search/?q={quote(query)}', **self.bearer(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [o['id'] for o in response.json()]
+
+    def test_matches_item_business_contact_and_id(self):
+        self.assertEqual(self.search(self.admin, 'mango kul'), [self.mango.id])
+        self.assertEqual(self.search(self.admin, 'polar'), [self.choc.id])
+        self.assertEqual(self.search(self.admin, 'ravi'), [self.choc.id])
+        self.assertEqual(self.search(self.admin, str(self.choc.id))[0], self.choc.id)
+
+    def test_customers_only_see_their_own_orders(self):
+        self.assertEqual(self.search(self.customer, 'polar'), [])
+        self.assertEqual(self.search(self.customer, 'mango'), [self.mango.id])
+
+    def test_index_follows_business_rename_and_serializer_writes(self):
+        self.other.name = 'Igloo Treats'
+        self.other.save()
+        self.assertEqual(self.search(self.admin, 'igloo'), [self.choc.id])
+        self.assertEqual(self.search(self.admin, 'polar'), [])
+
+        response = self.client.post('/api/orders/place/', {
+            'items': [{'item_name': 'Kesar Pista', 'quantity': 2, 'price': '80.00'}],
+        }, format='json', **self.bearer(self.customer))
+        self.assertEqual(self.search(self.admin, 'kesar'), [response.json()['id']])
+
+    def test_query_is_required(self):
+        response = self.client.get('/api/orders/search/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItemDemandTests(BaseTestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        super().setUp()
+        cache.clear()
+        self.other = Business.objects.create(name='Polar Parlour')
+        self.make_order(items=[('Mango Kulfi', 3, '120.00'), ('Vanilla Tub', 2, '4.50')])
+        self.make_order(business=self.other, items=[('Mango Kulfi', 5, '100.00')])
+        self.make_order(items=[('Mango Kulfi', 50, '1.00')], status=Order.Status.CANCELLED)
+
+    def get(self, query=''):
+        response = self.client.get(f'/api/admin/analytics/items/{query}', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_totals_per_item_skip_cancelled_orders(self):
+        items = {i['item_name']: i for i in self.get()['items']}
+        self.assertEqual(items['Mango Kulfi']['total_quantity'], 8)
+        self.assertEqual(items['Mango Kulfi']['total_revenue'], 860.0)
+        self.assertEqual(items['Vanilla Tub']['total_quantity'], 2)
+
+    def test_breakdown_by_business(self):
+        mango = self.get('?group_by=business')['items'][0]
+        self.assertEqual(
+            {(b['business_name'], b['quantity']) for b in mango['breakdown']},
+            {('Sunny Scoops Ltd', 3), ('Polar Parlour', 5)},
+        )
+
+    def test_breakdown_by_day_is_a_single_query(self):
+        from django.utils import timezone
+        with self.assertNumQueries(1):
+            from .analytics import item_demand
+            rows = item_demand(timezone.localdate(), timezone.localdate(), group_by='day')
+        self.assertEqual(rows[0]['breakdown'][0]['day'], timezone.localdate().isoformat())
+
+    def test_cache_is_invalidated_by_order_writes(self):
+        self.assertEqual(self.get()['items'][0]['total_quantity'], 8)
+        self.make_order(items=[('Mango Kulfi', 1, '100.00')])
+        self.assertEqual(self.get()['items'][0]['total_quantity'], 9)
+
+    def test_rejects_bad_parameters(self):
+        for query in ('?group_by=flavour', '?start=yesterday', '?status=Melted', '?start=2026-05-02&end=2026-05-01'):
+            response = self.client.get(f'/api/admin/analytics/items/{query}', **self.bearer(self.admin))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_customers_are_forbidden(self):
+        response = self.client.get('/api/admin/analytics/items/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class IdempotencyKeyTests(BaseTestCase):
+
+    payload = {'items': [{'item_name': 'Mango Kulfi', 'quantity': 2, 'price': '120.00'}]}
+
+    def place(self, payload=None, key='retry-123'):
+        headers = self.bearer(self.customer)
+        if key is not None:
+            headers['HTTP_IDEMPOTENCY_KEY'] = key
+        return self.client.post('/api/orders/place/', payload or self.payload, format='json', **headers)
+
+    def test_retry_replays_original_response(self):
+        first  = self.place()
+        second = self.place()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_replay_does_not_run_the_serializer(self):
+        from unittest import mock
+        self.place()
+        with mock.patch('icecream_api.views.OrderSerializer') as serializer:
+            self.place()
+        serializer.assert_not_called()
+
+    def test_reused_key_with_different_payload_is_rejected(self):
+        self.place()
+        other = {'items': [{'item_name': 'Vanilla Tub', 'quantity': 1, 'price': '4.50'}]}
+        self.assertEqual(self.place(other).status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_invalid_request_releases_the_key(self):
+        bad = {'items': [{'item_name': 'Mango Kulfi', 'quantity': 0, 'price': '120.00'}]}
+        self.assertEqual(self.place(bad).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_without_key_every_request_places_an_order(self):
+        self.place(key=None)
+        self.place(key=None)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expired_keys_are_ignored_and_pruned(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .idempotency import prune
+
+        self.place()
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(prune(batch_size=1), 1)
+        self.place()
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class OrderEventStreamTests(BaseTestCase):
+
+    async def read_event(self, stream):
+        import asyncio
+        return await asyncio.wait_for(anext(stream), timeout=2)
+
+    async def next_event_after(self, stream, *events):
+        """Starts waiting on the stream (which subscribes it), then publishes events."""
+        import asyncio
+        from .events import broker
+        pending = asyncio.ensure_future(self.read_event(stream))
+        await asyncio.sleep(0.05)
+        for event in events:
+            broker.publish(event)
+        return (await pending).decode()
+
+    async def open_stream(self, user, headers=None):
+        from django.test import AsyncClient
+        token    = AccessToken.for_user(user)
+        response = await AsyncClient().get(f'/api/orders/events/?token={token}', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await self.read_event(stream)).startswith(b'retry:'))
+        return stream
+
+    async def test_customer_receives_only_own_business_events(self):
+        from .events import Event
+        stream = await self.open_stream(self.customer)
+
+        chunk = await self.next_event_after(
+            stream,
+            Event(1, 'order.created', self.business.id + 1, {'order_id': 99}),
+            Event(2, 'order.created', self.business.id, {'order_id': 7}),
+        )
+        self.assertIn('event: order.created', chunk)
+        self.assertIn('"order_id": 7', chunk)
+        await stream.aclose()
+
+    async def test_resume_replays_missed_events(self):
+        from .events import Event, broker
+        broker.publish(Event(10_001, 'order.status_changed', self.business.id, {'order_id': 1}))
+        broker.publish(Event(10_002, 'order.cancelled', self.business.id, {'order_id': 2}))
+
+        stream = await self.open_stream(self.admin, headers={'Last-Event-ID': '10001'})
+        chunk  = (await self.read_event(stream)).decode()
+        self.assertTrue(chunk.startswith('id: 10002\nevent: order.cancelled'))
+        await stream.aclose()
+
+    async def test_requires_a_valid_token(self):
+        from django.test import AsyncClient
+        response = await AsyncClient().get('/api/orders/events/?token=nope')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_not_served_under_wsgi(self):
+        response = self.client.get('/api/orders/events/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_order_writes_publish_events(self):
+        from unittest import mock
+        with mock.patch('icecream_api.events.broker.publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post('/api/orders/place/', {
+                'items': [{'item_name': 'Mango Kulfi', 'quantity': 1, 'price': '100.00'}],
+            }, format='json', **self.bearer(self.customer)).json()
+            self.client.patch(f'/api/orders/{created["id"]}/cancel/', {}, format='json', **self.bearer(self.customer))
+
+        published = [call.args[0] for call in publish.call_args_list]
+        self.assertEqual([e.type for e in published], ['order.created', 'order.cancelled'])
+        self.assertEqual(published[1].data['previous_status'], 'Pending')
+        self.assertEqual(published[0].business_id, self.business.id)
+
+    def test_failed_publish_does_not_fail_the_committed_order(self):
+        from unittest import mock
+        with self.assertLogs(level='ERROR'), \
+                mock.patch('icecream_api.events.broker.publish', side_effect=RuntimeError('broker down')), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/place/', {
+                'items': [{'item_name': 'Mango Kulfi', 'quantity': 1, 'price': '100.00'}],
+            }, format='json', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Order.objects.filter(id=response.json()['id']).exists())
+
+    def test_generated_standing_orders_publish_events(self):
+        from datetime import date
+        from unittest import mock
+        from . import standing
+        from .models import StandingOrder
+
+        StandingOrder.objects.create(
+            business   = self.business,
+            items      = [{'item_name': 'Vanilla Tub', 'quantity': 4, 'price': '4.50'}],
+            start_date = date(2026, 6, 1),
+        )
+        with mock.patch('icecream_api.events.broker.publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            placed, _ = standing.generate(date(2026, 6, 2))
+
+        published = [call.args[0] for call in publish.call_args_list]
+        self.assertEqual([(e.type, e.data['order_id']) for e in published], [('order.created', placed[0].id)])
+        self.assertEqual(published[0].data['order']['items'][0]['item_name'], 'Vanilla Tub')
+
+
+class OrderChangeFeedTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first  = self.make_order()
+        self.second = self.make_order()
+
+    def sync_token(self, url, user):
+        response = self.client.get(url, **self.bearer(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['X-Sync-Token']
+
+    def changes(self, url, user, token):
+        response = self.client.get(f'{url}?since={token}', **self.bearer(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def age_everything(self, seconds=60):
+        from datetime import timedelta
+        from django.utils import timezone
+        Order.objects.update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_only_changed_and_deleted_orders_are_returned(self):
+        self.age_everything()
+        token = self.sync_token('/api/orders/my-orders/', self.customer)
+
+        self.client.patch(f'/api/orders/{self.first.id}/cancel/', {}, format='json', **self.bearer(self.customer))
+        deleted_id = self.second.id
+        self.second.delete()
+
+        delta = self.changes('/api/orders/my-orders/', self.customer, token)
+        self.assertEqual([o['id'] for o in delta['orders']], [self.first.id])
+        self.assertEqual(delta['orders'][0]['status'], 'Cancelled')
+        self.assertEqual(delta['deleted'], [deleted_id])
+        self.assertTrue(delta['sync_token'])
+
+    def test_status_update_bumps_updated_at(self):
+        self.age_everything()
+        token = self.sync_token('/api/orders/', self.admin)
+        self.client.patch(
+            f'/api/orders/{self.second.id}/status/', {'status': 'Completed'},
+            format='json', **self.bearer(self.admin),
+        )
+        delta = self.changes('/api/orders/', self.admin, token)
+        self.assertEqual([o['id'] for o in delta['orders']], [self.second.id])
+
+    def test_business_rename_shows_up_in_the_feed(self):
+        self.age_everything()
+        token = self.sync_token('/api/orders/my-orders/', self.customer)
+        self.business.name = 'Sunny Scoops & Sons'
+        self.business.save()
+
+        delta = self.changes('/api/orders/my-orders/', self.customer, token)
+        self.assertEqual(sorted(o['id'] for o in delta['orders']), [self.first.id, self.second.id])
+        self.assertEqual({o['business_name'] for o in delta['orders']}, {'Sunny Scoops & Sons'})
+
+    def test_other_businesses_deletions_are_hidden_from_customers(self):
+        other = Business.objects.create(name='Polar Parlour')
+        order = self.make_order(business=other)
+        token = self.sync_token('/api/orders/my-orders/', self.customer)
+        order.delete()
+        self.assertEqual(self.changes('/api/orders/my-orders/', self.customer, token)['deleted'], [])
+
+    def test_bad_and_expired_tokens(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+
+        response = self.client.get('/api/orders/?since=garbage', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() - timedelta(days=60)):
+            old_token = self.sync_token('/api/orders/', self.admin)
+        response = self.client.get(f'/api/orders/?since={old_token}', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+
+class OrderEmailQueueTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.order = self.make_order(items=[('Mango Kulfi', 3, '120.00')])
+
+    def confirm(self, order=None):
+        order = order or self.order
+        return self.client.patch(
+            f'/api/orders/{order.id}/status/', {'status': 'Confirmed'},
+            format='json', **self.bearer(self.admin),
+        )
+
+    def run_worker(self):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('send_order_emails', once=True, stdout=StringIO())
+
+    def test_confirmation_is_queued_then_sent_by_the_worker(self):
+        from django.core import mail
+        from .models import EmailJob
+
+        self.assertEqual(self.confirm().status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        job = EmailJob.objects.get()
+        self.assertEqual(job.to_email, 'sunny@scoops.com')
+
+        self.run_worker()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f'Order #{self.order.id} confirmed', mail.outbox[0].subject)
+        self.assertIn('Mango Kulfi', mail.outbox[0].body)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.email_sent)
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.Status.SENT)
+
+    def test_confirming_again_does_not_queue_a_second_email(self):
+        from .models import EmailJob
+
+        self.confirm()
+        self.client.patch(f'/api/orders/{self.order.id}/status/', {'status': 'Pending'},
+                          format='json', **self.bearer(self.admin))
+        self.confirm()
+        self.assertEqual(EmailJob.objects.filter(order=self.order).count(), 1)
+
+    def test_batch_reuses_one_connection(self):
+        from unittest import mock
+        from django.core import mail
+
+        for _ in range(3):
+            self.confirm(self.make_order())
+        with mock.patch('icecream_api.emails.get_connection', wraps=mail.get_connection) as get_connection:
+            self.run_worker()
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        from unittest import mock
+        from django.utils import timezone
+        from .models import EmailJob
+
+        self.confirm()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('smtp down')):
+            self.run_worker()
+
+        job = EmailJob.objects.get()
+        self.assertEqual(job.status, EmailJob.Status.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('smtp down', job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.email_sent)
+
+    def test_unreachable_mail_server_retries_the_batch(self):
+        from unittest import mock
+        from django.core.mail.backends.locmem import EmailBackend
+        from .models import EmailJob
+
+        self.confirm()
+        with mock.patch.object(EmailBackend, 'open', side_effect=ConnectionRefusedError('smtp down'), create=True):
+            self.run_worker()
+
+        job = EmailJob.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_until), (EmailJob.Status.PENDING, 1, None))
+        self.assertIn('smtp down', job.last_error)
+
+    def test_claims_do_not_overlap(self):
+        from .models import EmailJob
+        for _ in range(3):
+            self.confirm(self.make_order())
+        first  = EmailJob.claim_batch(2)
+        second = EmailJob.claim_batch(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({j.id for j in first} & {j.id for j in second})
+        self.assertEqual(EmailJob.claim_batch(2), [])
+
+    def test_no_job_without_business_email(self):
+        from .models import EmailJob
+        self.business.email = None
+        self.business.save()
+        self.confirm()
+        self.assertFalse(EmailJob.objects.exists())
+
+
+class WarmUpTests(BaseTestCase):
+    databases = {'default', 'replica_1', 'shard_1', 'shard_2'}
+
+    def test_warm_up_touches_every_database_and_cache(self):
+        from icecream_project.warmup import warm_up
+        timings = warm_up()
+        self.assertIn('db:default', timings)
+        self.assertIn('db:replica_1', timings)
+        self.assertIn('cache:default', timings)
+        self.assertFalse([k for k, v in timings.items() if v.startswith('failed')])
+
+
+class AdminMetricsTests(BaseTestCase):
+
+    def test_admin_sees_database_stats(self):
+        response = self.client.get('/api/admin/metrics/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        default = response.data['databases']['default']
+        self.assertEqual(default['vendor'], 'sqlite')
+        self.assertFalse(default['pooled'])
+        self.assertIsNone(default['pool'])
+        self.assertEqual(response.data['email_queue'], 0)
+
+    def test_customer_forbidden(self):
+        response = self.client.get('/api/admin/metrics/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_postgres_config_gets_pool_and_timeouts(self):
+        from unittest import mock
+        from icecream_project import settings as project_settings
+        config = {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 600}
+        with mock.patch.object(project_settings, 'DB_POOL', True):
+            config = project_settings._database(config)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], project_settings.DB_POOL_MAX_SIZE)
+        self.assertIn('statement_timeout', config['OPTIONS']['options'])
+
+
+class OrderTotalReconciliationTests(BaseTestCase):
+
+    def test_recalculate_total_sums_items_in_sql(self):
+        from decimal import Decimal
+        order = self.make_order(items=(('Vanilla Tub', 2, '4.50'), ('Mango Kulfi', 3, '0.10')))
+        Order.objects.filter(pk=order.pk).update(total_amount=0)
+        self.assertEqual(order.recalculate_total(), Decimal('9.30'))
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('9.30'))
+
+    def test_order_without_items_totals_zero(self):
+        from decimal import Decimal
+        order = self.make_order(items=())
+        Order.objects.filter(pk=order.pk).update(total_amount=12)
+        self.assertEqual(order.recalculate_total(), Decimal('0'))
+
+    def test_command_reports_and_fixes_mismatches(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        good  = self.make_order()
+        bad   = self.make_order()
+        other = Business.objects.create(name='Other Parlour')
+        elsewhere = self.make_order(business=other)
+        Order.objects.filter(pk__in=[bad.pk, elsewhere.pk]).update(total_amount=1)
+
+        out = StringIO()
+        call_command('reconcile_order_totals', dry_run=True, stdout=out)
+        self.assertIn('2 orders', out.getvalue())
+        self.assertEqual(Order.objects.total_mismatches().count(), 2)
+
+        call_command('reconcile_order_totals', business=self.business.id, stdout=StringIO())
+        self.assertEqual(list(Order.objects.total_mismatches().values_list('id', flat=True)), [elsewhere.pk])
+        bad.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(bad.total_amount, good.total_amount)
+
+
+class MyOrderSummaryTests(BaseTestCase):
+
+    def summary(self, **params):
+        response = self.client.get('/api/orders/my-summary/', params, **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_spend_and_recent_orders(self):
+        self.make_order(items=(('Vanilla Tub', 2, '4.50'),))                     # 9.00
+        self.make_order(items=(('Mango Kulfi', 1, '3.00'),), status='Completed')  # 3.00
+        cancelled = self.make_order(items=(('Vanilla Tub', 10, '1.00'),), status='Cancelled')
+
+        data = self.summary(recent=2)
+        self.assertEqual(data['total_orders'], 3)
+        self.assertEqual(data['status_counts'], {'Pending': 1, 'Confirmed': 0, 'Completed': 1, 'Cancelled': 1})
+        self.assertEqual(data['lifetime_spend'], 12.0)
+        self.assertEqual(data['monthly_spend'][-1]['total'], 12.0)
+        self.assertEqual(data['top_items'][0], {'item_name': 'Vanilla Tub', 'quantity': 12})
+        self.assertEqual([o['id'] for o in data['recent_orders']], [cancelled.id, cancelled.id - 1])
+
+    def test_includes_archived_orders(self):
+        from io import StringIO
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        self.make_order(status='Completed', order_date=timezone.now() - timedelta(days=400))
+        call_command('archive_orders', stdout=StringIO())
+        self.make_order()
+
+        data = self.summary()
+        self.assertEqual(data['total_orders'], 2)
+        self.assertEqual(data['lifetime_spend'], 18.0)
+        self.assertEqual(len(data['recent_orders']), 1)
+
+    def test_cached_until_the_business_writes_an_order(self):
+        self.make_order()
+        self.assertEqual(self.summary()['total_orders'], 1)
+
+        with self.assertNumQueries(2):   # auth user + recent orders, items come from their snapshots
+            self.summary()
+
+        self.make_order()
+        self.assertEqual(self.summary()['total_orders'], 2)
+
+    def test_versions_are_bumped_when_the_write_commits(self):
+        from . import caching
+
+        before = caching.business_version(self.business.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            caching.bump_business_versions(self.business.id)
+            self.assertEqual(caching.business_version(self.business.id), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(caching.business_version(self.business.id), before)
+
+    def test_other_business_writes_keep_the_cache(self):
+        self.summary()
+        other = Business.objects.create(name='Other Parlour')
+        self.make_order(business=other)
+        with self.assertNumQueries(2):   # auth user + (empty) recent orders
+            self.summary()
+
+    def test_reconcile_invalidates_summary(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        order = self.make_order()
+        self.summary()
+        Order.objects.filter(pk=order.pk).update(total_amount=1)
+        call_command('reconcile_order_totals', stdout=StringIO())
+        self.assertEqual(self.summary()['lifetime_spend'], 9.0)
+
+    def test_requires_linked_business(self):
+        response = self.client.get('/api/orders/my-summary/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BusinessCounterTests(BaseTestCase):
+
+    def counters(self, business=None):
+        business = business or self.business
+        business.refresh_from_db()
+        return (business.order_count, business.open_order_count, float(business.lifetime_value))
+
+    def test_place_confirm_and_cancel_keep_counters_current(self):
+        response = self.client.post('/api/orders/place/', {
+            'items': [{'item_name': 'Kesar Pista', 'quantity': 2, 'price': '80.00'}],
+        }, format='json', **self.bearer(self.customer))
+        order_id = response.json()['id']
+        self.assertEqual(self.counters(), (1, 1, 160.0))
+        self.assertIsNotNone(self.business.last_order_at)
+
+        self.client.patch(f'/api/orders/{order_id}/status/', {'status': 'Completed'},
+                          format='json', **self.bearer(self.admin))
+        self.assertEqual(self.counters(), (1, 0, 160.0))
+
+        self.make_order()
+        self.client.patch(f'/api/orders/{Order.objects.latest("id").id}/cancel/', {},
+                          format='json', **self.bearer(self.customer))
+        self.assertEqual(self.counters(), (2, 0, 160.0))
+
+    def test_status_changes_lock_the_order_row(self):
+        from unittest import mock
+        from django.db.models import QuerySet
+
+        order = self.make_order()
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as locked:
+            self.client.patch(f'/api/orders/{order.id}/status/', {'status': 'Confirmed'},
+                              format='json', **self.bearer(self.admin))
+            self.client.patch(f'/api/orders/{order.id}/cancel/', {},
+                              format='json', **self.bearer(self.admin))
+        self.assertEqual(
+            [call.args[0].model for call in locked.call_args_list].count(Order), 2)
+
+        response = self.client.patch(f'/api/orders/{order.id}/cancel/', {},
+                                     format='json', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.counters(), (1, 0, 0.0))
+
+    def test_admin_form_save_does_not_clobber_counters(self):
+        stale = Business.objects.get(pk=self.business.pk)
+        self.make_order()
+        stale.phone = '555-9999'
+        stale.save()
+        self.assertEqual(self.counters(), (1, 1, 9.0))
+
+    def test_archiving_keeps_counters_and_rebuild_counts_archive(self):
+        from io import StringIO
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        self.make_order(status='Completed', order_date=timezone.now() - timedelta(days=400))
+        self.make_order()
+        call_command('archive_orders', stdout=StringIO())
+        self.assertEqual(self.counters(), (2, 1, 18.0))
+
+        Business.objects.filter(pk=self.business.pk).update(order_count=0, lifetime_value=0)
+        out = StringIO()
+        with self.assertRaises(SystemExit):
+            call_command('rebuild_business_counters', check=True, stdout=out)
+        self.assertIn(str(self.business.pk), out.getvalue())
+
+        call_command('rebuild_business_counters', stdout=StringIO())
+        self.assertEqual(self.counters(), (2, 1, 18.0))
+
+    def test_deleting_an_order_recounts(self):
+        order = self.make_order()
+        self.make_order(items=(('Mango Kulfi', 1, '3.00'),))
+        order.delete()
+        self.assertEqual(self.counters(), (1, 1, 3.0))
+
+
+class BusinessListTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.small = Business.objects.create(name='Alpha Cones')
+        self.big   = Business.objects.create(name='Zeta Scoops')
+        for _ in range(3):
+            self.make_order(business=self.big)
+        self.make_order(business=self.small, status='Completed')
+
+    def list(self, **params):
+        response = self.client.get('/api/businesses/', params, **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.data
+
+    def test_plain_list_keeps_shape(self):
+        names = [b['name'] for b in self.list()]
+        self.assertEqual(names, ['Alpha Cones', 'Sunny Scoops Ltd', 'Zeta Scoops'])
+
+    def test_sort_and_filter_on_counters(self):
+        rows = self.list(ordering='-order_count')
+        self.assertEqual([b['id'] for b in rows][:2], [self.big.id, self.small.id])
+        self.assertEqual(rows[0]['order_count'], 3)
+
+        self.assertEqual([b['id'] for b in self.list(has_open_orders='true')], [self.big.id])
+        self.assertEqual([b['id'] for b in self.list(min_orders=1, ordering='-lifetime_value')],
+                         [self.big.id, self.small.id])
+
+    def test_cursor_pages_through_every_business(self):
+        seen, cursor = [], None
+        while True:
+            params = {'ordering': '-last_order_at', 'limit': 1}
+            if cursor:
+                params['cursor'] = cursor
+            page = self.list(**params)
+            seen.extend(b['id'] for b in page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [self.small.id, self.big.id, self.business.id])   # never ordered last
+
+    def test_bad_params_rejected(self):
+        for params in ({'ordering': 'phone'}, {'min_orders': 'x'}, {'limit': 5, 'cursor': 'nonsense'}):
+            response = self.client.get('/api/businesses/', params, **self.bearer(self.admin))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class RevokedTokenTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        from . import revocation
+        revocation.store.reset()
+
+    def login(self):
+        response = self.client.post('/api/auth/login/', {
+            'username': 'sunny_user',
+            'password': 'customerpass',
+        }, format='json')
+        return response.data['access'], response.data['refresh']
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': token}, format='json')
+
+    def test_refresh_rotates_and_old_token_is_rejected(self):
+        _, refresh = self.login()
+        response   = self.refresh(refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['refresh'], refresh)
+
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, status.HTTP_200_OK)
+
+    def test_logout_revokes_both_tokens(self):
+        access, refresh = self.login()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+        self.assertEqual(self.client.get('/api/auth/me/', **headers).status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/api/auth/logout/', {'refresh': refresh}, format='json', **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get('/api/auth/me/', **headers).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_workers_revocations_are_picked_up(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import RevokedToken
+        from .revocation import RevocationStore
+
+        token = AccessToken.for_user(self.customer)
+        store = RevocationStore()
+        self.assertFalse(store.is_revoked(token['jti']))
+
+        # written by another process: only visible once the store syncs
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(hours=1))
+        with override_settings(REVOKED_TOKEN_SYNC_SECONDS=0):
+            self.assertTrue(store.is_revoked(token['jti']))
+
+    def test_revocations_committed_late_are_picked_up(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import RevokedToken
+        from .revocation import RevocationStore
+
+        expires = timezone.now() + timedelta(hours=1)
+        late    = RevokedToken.objects.create(jti='late', expires_at=expires)
+        RevokedToken.objects.create(jti='early', expires_at=expires)
+        late_id = late.id
+        late.delete()   # not committed yet when the store first syncs
+
+        store = RevocationStore()
+        with override_settings(REVOKED_TOKEN_SYNC_SECONDS=0):
+            self.assertTrue(store.is_revoked('early'))
+            RevokedToken.objects.create(id=late_id, jti='late', expires_at=expires)
+            self.assertTrue(store.is_revoked('late'))
+
+    def test_prune_deletes_expired_revocations(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import RevokedToken
+
+        now = timezone.now()
+        RevokedToken.objects.create(jti='old', expires_at=now - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='live', expires_at=now + timedelta(hours=1))
+        call_command('prune_revoked_tokens', stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class InvoiceTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        import shutil
+        import tempfile
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(INVOICE_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache_dir = cache_dir
+
+        self.order = self.make_order(status=Order.Status.CONFIRMED, items=(('Mango <Kulfi>', 3, '2.00'),))
+
+    def test_invoice_renders_and_escapes(self):
+        response = self.client.get(f'/api/orders/{self.order.id}/invoice/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'#{self.order.id}', body)
+        self.assertIn('Mango &lt;Kulfi&gt;', body)
+        self.assertIn('Rs. 6.00', body)
+
+    def test_other_business_is_forbidden(self):
+        other = Business.objects.create(name='Other')
+        order = self.make_order(business=other)
+        response = self.client.get(f'/api/orders/{order.id}/invoice/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_order_gone_before_rendering_is_not_found(self):
+        from unittest import mock
+        from . import invoices
+
+        with mock.patch.object(invoices, 'invoice_data', return_value=[]):
+            response = self.client.get(f'/api/orders/{self.order.id}/invoice/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unchanged_invoice_is_not_rendered_again(self):
+        import os
+        from unittest import mock
+        from . import invoice_render, invoices
+
+        first = invoices.render_order(self.order.id)
+        with mock.patch.object(invoice_render, 'render_to_file', wraps=invoice_render.render_to_file) as render:
+            self.assertEqual(invoices.render_order(self.order.id), first)
+            self.assertEqual(render.call_count, 0)
+
+            self.order.status = Order.Status.COMPLETED
+            self.order.save(update_fields=['status'])
+            second = invoices.render_order(self.order.id)
+            self.assertEqual(render.call_count, 1)
+        self.assertNotEqual(second, first)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(second)])
+
+    def test_batch_streams_zip_of_confirmed_orders(self):
+        import io
+        import zipfile
+
+        second = self.make_order(status=Order.Status.CONFIRMED)
+        self.make_order()   # pending, not invoiced
+
+        # a pool of two spawned workers renders both invoices
+        with override_settings(INVOICE_POOL_THRESHOLD=1, INVOICE_RENDER_WORKERS=2):
+            response = self.client.get('/api/admin/invoices/', **self.bearer(self.admin))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [f'invoice-{self.order.id}.html', f'invoice-{second.id}.html'])
+        self.assertIn(b'Mango &lt;Kulfi&gt;', archive.read(f'invoice-{self.order.id}.html'))
+
+        response = self.client.get('/api/admin/invoices/', {'type': 'doc'}, **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StandingOrderTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        from datetime import date
+        from .models import StandingOrder
+
+        self.monday = date(2026, 6, 1)
+        self.daily  = StandingOrder.objects.create(
+            business   = self.business,
+            items      = [{'item_name': 'Vanilla Tub', 'quantity': 4, 'price': '4.50'}],
+            start_date = self.monday,
+        )
+        self.weekdays = StandingOrder.objects.create(
+            business   = self.business,
+            items      = [{'item_name': 'Mango Kulfi', 'quantity': 10, 'price': '1.25'}],
+            weekdays   = StandingOrder.WEEKDAYS,
+            start_date = self.monday,
+        )
+        self.every_third = StandingOrder.objects.create(
+            business      = self.business,
+            items         = [{'item_name': 'Choco Bar', 'quantity': 1, 'price': '2.00'}],
+            interval_days = 3,
+            start_date    = self.monday,
+        )
+
+    def generate(self, day):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('generate_standing_orders', date=f'{day:%Y-%m-%d}', stdout=StringIO())
+
+    def test_generation_reserves_stock_and_skips_what_is_short(self):
+        from datetime import timedelta
+        from . import standing
+        from .models import ProductStock, StandingOrder, StockReservation
+
+        tuesday = self.monday + timedelta(days=1)
+        combo   = StandingOrder.objects.create(
+            business   = self.business,
+            items      = [{'item_name': 'Mango Kulfi', 'quantity': 1, 'price': '1.25'},
+                          {'item_name': 'Vanilla Tub', 'quantity': 2, 'price': '4.50'}],
+            start_date = self.monday,
+        )
+        mango   = ProductStock.objects.create(item_name='Mango Kulfi', day=tuesday, available=5)
+        vanilla = ProductStock.objects.create(item_name='Vanilla Tub', day=tuesday, available=5)
+
+        placed, shortages = standing.generate(tuesday)
+
+        # weekdays wants 10 mangoes; combo took one, then found too little vanilla and gave it back
+        self.assertEqual([o.standing_order_id for o in placed], [self.daily.id])
+        self.assertEqual(sorted(shortages), [self.weekdays.id, combo.id])
+        self.assertEqual(shortages[combo.id].item_name, 'Vanilla Tub')
+        mango.refresh_from_db()
+        vanilla.refresh_from_db()
+        self.assertEqual((mango.available, mango.reserved, vanilla.available, vanilla.reserved), (5, 0, 1, 4))
+        self.assertEqual(StockReservation.objects.get(order_id=placed[0].id).quantity, 4)
+
+        ProductStock.objects.filter(id=mango.id).update(available=20)   # restocked
+        ProductStock.objects.filter(id=vanilla.id).update(available=3)
+        placed, shortages = standing.generate(tuesday)   # the skipped ones are still due
+        self.assertEqual(sorted(o.standing_order_id for o in placed), [self.weekdays.id, combo.id])
+        self.assertEqual(shortages, {})
+        mango.refresh_from_db()
+        vanilla.refresh_from_db()
+        self.assertEqual((mango.available, mango.reserved, vanilla.available), (9, 11, 1))
+
+    def test_generated_orders_are_written_to_the_webhook_outbox(self):
+        from datetime import timedelta
+        from .models import WebhookDelivery, WebhookEndpoint
+        WebhookEndpoint.objects.create(name='ERP', url='http://127.0.0.1:9/', secret='x')
+        WebhookEndpoint.objects.create(name='Delivery', url='http://127.0.0.1:9/', secret='x', event_types='order.cancelled')
+
+        self.generate(self.monday + timedelta(days=1))
+
+        orders     = list(Order.objects.order_by('id'))
+        deliveries = list(WebhookDelivery.objects.order_by('order_id'))
+        self.assertEqual([(d.endpoint.name, d.event_type, d.order_id) for d in deliveries],
+                         [('ERP', 'order.created', order.id) for order in orders])
+        self.assertEqual(len({d.event_id for d in deliveries}), len(orders))
+        self.assertEqual(deliveries[0].payload['data']['order']['items'][0]['item_name'], 'Vanilla Tub')
+
+    def test_schedule_rules(self):
+        from datetime import timedelta
+        saturday = self.monday + timedelta(days=5)
+        self.assertTrue(self.weekdays.is_due(self.monday))
+        self.assertFalse(self.weekdays.is_due(saturday))
+        self.assertTrue(self.every_third.is_due(self.monday + timedelta(days=3)))
+        self.assertFalse(self.every_third.is_due(self.monday + timedelta(days=4)))
+        self.assertFalse(self.daily.is_due(self.monday - timedelta(days=1)))
+
+    def test_generates_due_orders_once_per_day(self):
+        from datetime import timedelta
+        from decimal import Decimal
+
+        tuesday = self.monday + timedelta(days=1)
+        self.generate(tuesday)
+        self.generate(tuesday)   # re-run is a no-op
+
+        orders = Order.objects.filter(scheduled_for=tuesday).order_by('id')
+        self.assertEqual([o.standing_order_id for o in orders], [self.daily.id, self.weekdays.id])
+        self.assertEqual([o.total_amount for o in orders], [Decimal('18.00'), Decimal('12.50')])
+        self.assertEqual(orders[0].items.get().quantity, 4)
+
+        # logged in one batch under the first admin; derived data kept in sync
+        self.assertEqual(AdminLog.objects.filter(admin_user=self.admin).count(), 2)
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.order_count, self.business.lifetime_value), (2, Decimal('30.50')))
+        from . import search
+        self.assertEqual(search.search_order_ids('kulfi'), [orders[1].id])
+
+    def test_customer_manages_own_standing_orders(self):
+        response = self.client.post('/api/orders/standing/', {
+            'business': 999,
+            'items':    [{'item_name': 'Vanilla Tub', 'quantity': 2, 'price': '4.50'}],
+            'weekdays': [0, 2, 4],
+        }, format='json', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['business'], self.business.id)
+        self.assertEqual(response.data['weekdays'], [0, 2, 4])
+
+        standing_id = response.data['id']
+        response = self.client.patch(f'/api/orders/standing/{standing_id}/', {'active': False},
+                                     format='json', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['active'])
+
+        response = self.client.post('/api/orders/standing/', {'items': [], 'weekdays': [7]},
+                                    format='json', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('weekdays', response.data)
+
+
+class QueryBudgetTests(BaseTestCase):
+    """
+    Walks every route in icecream_api/urls.py at 10 and at 1,000 orders. Each
+    route's query count must be the same at both scales (no N+1) and within
+    the budget declared in BUDGETS. A new route fails until it gets a budget.
+
+    Caches are cleared before every request, so budgets are cold-cache worst cases.
+    """
+    SCALES = (10, 1000)
+
+    # route name -> (method, caller, request factory, query budget)
+    # the factory gets the test case and returns (path kwargs, data); it runs
+    # outside the measurement, so it can create the objects a write needs
+    BUDGETS = {
+        'login':               ('post',   None,       lambda t: ({}, {'username': 'sunny_user', 'password': 'customerpass'}), 1),
+        'register':            ('post',   None,       lambda t: ({}, t.new_registration()), 3),
+        'token_refresh':       ('post',   None,       lambda t: ({}, {'refresh': t.new_refresh_token()}), 4),
+        'logout':              ('post',   'customer', lambda t: ({}, {'refresh': t.new_refresh_token()}), 8),
+        'me':                  ('get',    'customer', lambda t: ({}, None), 1),
+        'update_profile':      ('patch',  'customer', lambda t: ({}, {'contact_person': f'Asha {t.next_serial()}'}), 13),
+        'business_list':       ('get',    'admin',    lambda t: ({}, {'limit': 50}), 2),
+        'order_list':          ('get',    'admin',    lambda t: ({}, None), 2),
+        'my_orders':           ('get',    'customer', lambda t: ({}, None), 2),
+        'my_order_summary':    ('get',    'customer', lambda t: ({}, None), 5),
+        'order_search':        ('get',    'admin',    lambda t: ({}, {'q': 'vanilla'}), 3),
+        'order_events':        None,   # endless SSE stream, nothing to count
+        'place_order':         ('post',   'customer', lambda t: ({}, {'items': [{'item_name': 'Vanilla Tub', 'quantity': 2, 'price': '4.50'}]}), 18),
+        'standing_orders':     ('get',    'customer', lambda t: ({}, None), 2),
+        'standing_order':      ('patch',  'customer', lambda t: ({'standing_id': t.standing.id}, {'interval_days': 2}), 3),
+        'update_order_status': ('patch',  'admin',    lambda t: ({'order_id': t.make_order().id}, {'status': 'Confirmed'}), 10),
+        'cancel_order':        ('patch',  'customer', lambda t: ({'order_id': t.make_order().id}, None), 9),
+        'order_invoice':       ('get',    'customer', lambda t: ({'order_id': t.make_order().id}, None), 4),
+        'admin_stats':         ('get',    'admin',    lambda t: ({}, None), 7),
+        'admin_logs':          ('get',    'admin',    lambda t: ({}, None), 2),
+        'admin_log_summary':   ('get',    'admin',    lambda t: ({}, None), 2),
+        'admin_metrics':       ('get',    'admin',    lambda t: ({}, None), 3),
+        'item_demand':         ('get',    'admin',    lambda t: ({}, {'start': '2000-01-01'}), 2),
+        'invoice_batch':       ('get',    'admin',    lambda t: ({}, {'business': t.business.id, 'start': '2000-01-01'}), 4),
+        'bulk_onboarding':     ('post',   'admin',    lambda t: ({}, {'rows': [t.new_registration() for _ in range(3)]}), 7),
+        'admin_profiles':      ('get',    'admin',    lambda t: ({}, None), 2),
+        'admin_profile':       ('get',    'admin',    lambda t: ({'profile_id': t.make_profile().id}, None), 2),
+        'admin_profile_download': ('get', 'admin',    lambda t: ({'profile_id': t.make_profile().id}, None), 2),
+    }
+
+    def setUp(self):
+        super().setUp()
+        import shutil
+        import tempfile
+        from .models import StandingOrder
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(INVOICE_CACHE_DIR=cache_dir, REVOKED_TOKEN_SYNC_SECONDS=3600)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.standing = StandingOrder.objects.create(
+            business = self.business,
+            items    = [{'item_name': 'Vanilla Tub', 'quantity': 4, 'price': '4.50'}],
+        )
+        self.businesses = [self.business] + [
+            Business.objects.create(name=f'Business {i}') for i in range(4)
+        ]
+        self.serial = 0
+
+    # -- request factories ---------------------------------------------
+
+    def next_serial(self):
+        self.serial += 1
+        return self.serial
+
+    def new_registration(self):
+        serial = self.next_serial()
+        return {'username': f'new_user_{serial}', 'password': 'longpassword', 'business_name': f'New {serial}'}
+
+    def new_refresh_token(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        return str(RefreshToken.for_user(self.customer))
+
+    def make_profile(self):
+        from .models import ProfileArtifact
+        return ProfileArtifact.objects.create(
+            trigger='requested', method='GET', path='/api/orders/', status_code=200,
+            duration_ms=12.5, user=self.admin, profile=b'stats',
+        )
+
+    # -- data ----------------------------------------------------------
+
+    def grow_to(self, total):
+        """Bulk-inserts orders (two items each) and admin logs up to `total` of each."""
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from . import counters, search, snapshots
+
+        statuses = [choice[0] for choice in Order.Status.choices]
+        now      = timezone.now()
+        start    = Order.objects.count()
+        orders   = Order.objects.bulk_create(
+            Order(
+                business     = self.businesses[i % len(self.businesses)],
+                status       = statuses[i % len(statuses)],
+                order_date   = now - timedelta(hours=i),
+                total_amount = Decimal('11.50'),
+            )
+            for i in range(start, total)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, item_name=name, quantity=1, price=price)
+            for order in orders
+            for name, price in (('Vanilla Tub', '4.50'), ('Mango Kulfi', '7.00'))
+        )
+        AdminLog.objects.bulk_create(
+            AdminLog(admin_user=self.admin, action=f'Event {i}')
+            for i in range(AdminLog.objects.count(), total)
+        )
+        search.index_orders([order.id for order in orders])
+        snapshots.refresh_orders([order.id for order in orders])
+        counters.rebuild()
+
+    # -- measurement ---------------------------------------------------
+
+    def measure(self, name):
+        from contextlib import ExitStack
+        from django.core.cache import cache
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from . import revocation
+
+        method, caller, factory, budget = self.BUDGETS[name]
+        kwargs, data = factory(self)
+        headers      = self.bearer(getattr(self, caller)) if caller else {}
+
+        cache.clear()
+        revocation.store.reset()
+        revocation.store.is_revoked('warm-up')   # the periodic sync is not the endpoint's cost
+
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in self.databases]
+            response = getattr(self.client, method)(reverse(name, kwargs=kwargs), data, format='json', **headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{name}: {response.status_code} {getattr(response, "data", "")}')
+        return [query['sql'] for context in captured for query in context.captured_queries], budget
+
+    def test_every_route_has_a_budget(self):
+        from .urls import urlpatterns
+        self.assertEqual(sorted(p.name for p in urlpatterns), sorted(self.BUDGETS))
+
+    def test_query_counts_are_flat_and_within_budget(self):
+        counts = {}
+        for scale in self.SCALES:
+            self.grow_to(scale)
+            for name, spec in self.BUDGETS.items():
+                if spec is None:
+                    continue
+                queries, budget = self.measure(name)
+                counts.setdefault(name, []).append(len(queries))
+                with self.subTest(route=name, orders=scale):
+                    self.assertLessEqual(
+                        len(queries), budget,
+                        f'{name} ran {len(queries)} queries at {scale} orders (budget {budget}):\n'
+                        + '\n'.join(f'  {sql}' for sql in queries[:50])
+                        + (f'\n  ... and {len(queries) - 50} more' if len(queries) > 50 else ''),
+                    )
+
+        for name, per_scale in counts.items():
+            with self.subTest(route=name):
+                self.assertEqual(len(set(per_scale)), 1, f'{name} query count grows with the data: {per_scale}')
+
+
+@override_settings(DATABASE_SHARDS=['shard_1', 'shard_2'], SHARD_MAP={})
+class ShardingTests(TransactionTestCase):
+    """
+    Orders of business 1 live on shard_2 and of business 2 on shard_1
+    (id % 2). A TransactionTestCase, because fan-out queries run in threads
+    with their own connections and must see committed rows.
+    """
+
+    databases = {'default', 'replica_1', 'shard_1', 'shard_2'}
+    bearer    = BaseTestCase.bearer
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client = APIClient()
+        self.admin  = User.objects.create(
+            username='admin', password_hash='x', role=User.Role.ADMIN,
+        )
+        self.customers = {}
+        for business_id in (1, 2):
+            business = Business.objects.create(id=business_id, name=f'Parlour {business_id}')
+            self.customers[business_id] = User.objects.create(
+                username=f'parlour_{business_id}', password_hash='x',
+                role=User.Role.CUSTOMER, business=business,
+            )
+
+    def place(self, business_id, price='100.00'):
+        payload  = {'items': [{'item_name': 'Mango Kulfi', 'quantity': 1, 'price': price}]}
+        response = self.client.post(
+            '/api/orders/place/', payload, format='json', **self.bearer(self.customers[business_id]),
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data['id']
+
+    def test_orders_are_stored_on_their_business_shard(self):
+        from .models import OrderSearchDocument
+        first  = self.place(1)
+        second = self.place(2)
+
+        self.assertEqual(list(Order.objects.using('shard_2').values_list('id', flat=True)), [first])
+        self.assertEqual(list(Order.objects.using('shard_1').values_list('id', flat=True)), [second])
+        self.assertFalse(Order.objects.using('default').exists())
+        self.assertEqual(OrderItem.objects.using('shard_2').get().order_id, first)
+        self.assertEqual(OrderSearchDocument.objects.using('shard_1').get().order_id, second)
+
+        # customers read back their own shard
+        response = self.client.get('/api/orders/my-orders/', **self.bearer(self.customers[1]))
+        self.assertEqual([o['id'] for o in response.json()], [first])
+
+    def test_admin_views_merge_every_shard(self):
+        placed = [self.place(1, '10.00'), self.place(2, '20.00'), self.place(1, '30.00')]
+
+        response = self.client.get('/api/orders/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([o['id'] for o in response.json()], placed[::-1])
+        self.assertIn('X-Sync-Token', response)
+
+        response = self.client.get('/api/orders/', {'business_id': 2}, **self.bearer(self.admin))
+        self.assertEqual([o['id'] for o in response.json()], [placed[1]])
+
+        response = self.client.get('/api/admin/stats/', **self.bearer(self.admin))
+        self.assertEqual(response.data['total_orders'], 3)
+        self.assertEqual(response.data['pending_count'], 3)
+        self.assertEqual(response.data['revenue_today'], 60.0)
+
+        response = self.client.get('/api/orders/search/', {'q': 'kulfi'}, **self.bearer(self.admin))
+        self.assertEqual(sorted(o['id'] for o in response.json()), sorted(placed))
+
+    def test_orders_are_found_by_id_alone(self):
+        order_id = self.place(2)
+
+        response = self.client.patch(f'/api/orders/{order_id}/cancel/', **self.bearer(self.customers[1]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.patch(f'/api/orders/{order_id}/cancel/', **self.bearer(self.customers[2]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Order.objects.using('shard_1').get().status, Order.Status.CANCELLED)
+
+        response = self.client.patch(f'/api/orders/{order_id + 100}/cancel/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_shard_map_places_a_business_explicitly(self):
+        with self.settings(SHARD_MAP={'1': 'shard_1'}):
+            order_id = self.place(1)
+        self.assertTrue(Order.objects.using('shard_1').filter(id=order_id).exists())
+
+    def test_unrouted_queries_fail_loudly(self):
+        from .sharding import ShardingError
+        with self.assertRaises(ShardingError):
+            Order.objects.count()
+
+    def test_admin_reports_merge_every_shard(self):
+        import io
+        import shutil
+        import tempfile
+        import zipfile
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.place(1, '10.00')
+        self.place(2, '20.00')
+        self.place(1, '30.00')
+
+        response = self.client.get('/api/admin/analytics/items/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [item] = response.data['items']
+        self.assertEqual((item['total_quantity'], item['total_revenue']), (3, 60.0))
+
+        response = self.client.get(
+            '/api/admin/analytics/items/', {'group_by': 'business'}, **self.bearer(self.admin),
+        )
+        [item] = response.data['items']
+        self.assertEqual(
+            [(row['business_id'], row['revenue']) for row in item['breakdown']], [(1, 40.0), (2, 20.0)],
+        )
+
+        with self.settings(INVOICE_CACHE_DIR=cache_dir):
+            response = self.client.get('/api/admin/invoices/', {'status': 'Pending'}, **self.bearer(self.admin))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 3)
+
+        response = self.client.get('/api/admin/metrics/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_worker_and_commands_cover_every_shard(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core import mail
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import ArchivedOrder, StandingOrder
+
+        for business in Business.objects.all():
+            business.email = f'parlour{business.id}@example.com'
+            business.save()
+        for order_id in (self.place(1), self.place(2)):
+            response = self.client.patch(
+                f'/api/orders/{order_id}/status/', {'status': 'Confirmed'}, format='json', **self.bearer(self.admin),
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        call_command('send_order_emails', once=True, stdout=StringIO())
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['parlour1@example.com', 'parlour2@example.com'])
+
+        today = timezone.localdate()
+        for business_id in (1, 2):
+            StandingOrder.objects.create(
+                business_id = business_id,
+                items       = [{'item_name': 'Choco Bar', 'quantity': 2, 'price': '2.00'}],
+                weekdays    = StandingOrder.WEEKDAYS,
+                start_date  = today,
+            )
+        for _ in range(2):   # the second run finds nothing due
+            call_command('generate_standing_orders', date=f'{today:%Y-%m-%d}', stdout=StringIO())
+        for alias in ('shard_1', 'shard_2'):
+            self.assertEqual(Order.objects.using(alias).filter(scheduled_for=today).count(), 1)
+
+        for command in (
+            'reconcile_order_totals', 'rebuild_business_counters', 'backfill_order_snapshots',
+            'check_order_snapshots', 'rebuild_order_search_index', 'prune_order_tombstones',
+        ):
+            call_command(command, stdout=StringIO())
+
+        for alias in ('shard_1', 'shard_2'):
+            Order.objects.using(alias).update(
+                status=Order.Status.COMPLETED, order_date=timezone.now() - timedelta(days=1000),
+            )
+        call_command('archive_orders', stdout=StringIO())
+        self.assertEqual(ArchivedOrder.objects.using('shard_1').count(), 2)
+        self.assertEqual(ArchivedOrder.objects.using('shard_2').count(), 2)
+        self.assertFalse(Order.objects.using('shard_1').exists() or Order.objects.using('shard_2').exists())
+
+    def test_generated_orders_already_on_a_shard_are_not_placed_again(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import StandingOrder
+
+        today    = timezone.localdate()
+        standing = StandingOrder.objects.create(
+            business_id = 1,
+            items       = [{'item_name': 'Choco Bar', 'quantity': 2, 'price': '2.00'}],
+            weekdays    = StandingOrder.WEEKDAYS,
+            start_date  = today,
+        )
+        call_command('generate_standing_orders', date=f'{today:%Y-%m-%d}', stdout=StringIO())
+        # as if the run died after its shard commit, before its stamp on default
+        StandingOrder.objects.filter(id=standing.id).update(last_generated_on=None)
+
+        call_command('generate_standing_orders', date=f'{today:%Y-%m-%d}', stdout=StringIO())
+        self.assertEqual(Order.objects.using('shard_2').filter(standing_order_id=standing.id).count(), 1)
+        standing.refresh_from_db()
+        self.assertEqual(standing.last_generated_on, today)
+
+
+class StockTests(BaseTestCase):
+
+    def setUp(self):
+        from django.utils import timezone
+        from .models import ProductStock
+        super().setUp()
+        self.stock = ProductStock.objects.create(item_name='Mango Kulfi', day=timezone.localdate(), available=5)
+
+    def place(self, quantity, item_name='Mango Kulfi'):
+        payload = {'items': [{'item_name': item_name, 'quantity': quantity, 'price': '100.00'}]}
+        return self.client.post('/api/orders/place/', payload, format='json', **self.bearer(self.customer))
+
+    def test_placing_reserves_and_cancelling_releases(self):
+        response = self.place(3)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.stock.refresh_from_db()
+        self.assertEqual((self.stock.available, self.stock.reserved), (2, 3))
+
+        response = self.client.patch(f'/api/orders/{response.data["id"]}/cancel/', **self.bearer(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.stock.refresh_from_db()
+        self.assertEqual((self.stock.available, self.stock.reserved), (5, 0))
+
+    def test_overselling_is_refused_and_rolled_back(self):
+        self.assertEqual(self.place(4).status_code, status.HTTP_201_CREATED)
+
+        response = self.place(2)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['available'], 1)
+        self.assertEqual(Order.objects.count(), 1)
+        self.stock.refresh_from_db()
+        self.assertEqual((self.stock.available, self.stock.reserved), (1, 4))
+
+        # flavours without a stock row are not limited
+        self.assertEqual(self.place(500, 'Vanilla Tub').status_code, status.HTTP_201_CREATED)
+
+    def test_admin_cancellation_releases_once(self):
+        from . import stock
+        order_id = self.place(5).data['id']
+        response = self.client.patch(
+            f'/api/orders/{order_id}/status/', {'status': 'Cancelled'}, format='json', **self.bearer(self.admin),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(stock.release(order_id), 0)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.available, 5)
+
+
+    def test_reopening_a_cancelled_order_reserves_again(self):
+        from .models import ProductStock
+        first  = self.place(3).data['id']
+        self.client.patch(f'/api/orders/{first}/cancel/', **self.bearer(self.customer))
+        self.assertEqual(self.place(4).status_code, status.HTTP_201_CREATED)   # 1 left
+
+        reopen = lambda: self.client.patch(
+            f'/api/orders/{first}/status/', {'status': 'Confirmed'}, format='json', **self.bearer(self.admin),
+        )
+        response = reopen()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['available'], 1)
+        self.assertEqual(Order.objects.get(id=first).status, Order.Status.CANCELLED)
+
+        ProductStock.objects.filter(id=self.stock.id).update(available=3)
+        self.assertEqual(reopen().status_code, status.HTTP_200_OK)
+        self.stock.refresh_from_db()
+        self.assertEqual((self.stock.available, self.stock.reserved), (0, 7))
+
+
+class StockConcurrencyTests(TransactionTestCase):
+    """
+    Many threads race for the same flavour on their own connections. SQLite
+    serializes writers and answers a busy database with an error instead of
+    waiting, so attempts that hit one are retried; on Postgres they just queue.
+    """
+
+    databases = {'default'}
+
+    THREADS  = 8
+    ATTEMPTS = 20
+    STOCK    = 100
+
+    def test_concurrent_orders_never_oversell(self):
+        import random
+        import threading
+        import time
+        from django.db    import OperationalError, connections, transaction
+        from django.utils import timezone
+        from . import stock
+        from .models import ProductStock, StockReservation
+
+        day     = timezone.localdate()
+        ProductStock.objects.create(item_name='Mango Kulfi', day=day, available=self.STOCK)
+        ProductStock.objects.create(item_name='Vanilla Tub', day=day, available=self.STOCK)
+        lock    = threading.Lock()
+        sold    = {'Mango Kulfi': 0, 'Vanilla Tub': 0}
+        refused = []
+
+        def customer(seed):
+            rng = random.Random(seed)
+            try:
+                for attempt in range(self.ATTEMPTS):
+                    items = [('Mango Kulfi', rng.randint(1, 3)), ('Vanilla Tub', rng.randint(1, 3))]
+                    rng.shuffle(items)
+                    while True:
+                        try:
+                            with transaction.atomic():
+                                reservations = stock.reserve(items, day)
+                                for reservation in reservations:
+                                    reservation.order_id = seed * 1000 + attempt
+                                StockReservation.objects.bulk_create(reservations)
+                        except stock.OutOfStock:
+                            with lock:
+                                refused.append(seed)
+                        except OperationalError:
+                            time.sleep(rng.random() / 1000)
+                            continue
+                        else:
+                            with lock:
+                                for item_name, quantity in items:
+                                    sold[item_name] += quantity
+                        break
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=customer, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(refused, 'demand should exceed stock')
+        for stock_row in ProductStock.objects.all():
+            held = sum(StockReservation.objects.filter(stock=stock_row).values_list('quantity', flat=True))
+            self.assertGreaterEqual(stock_row.available, 0)
+            self.assertEqual(stock_row.reserved, sold[stock_row.item_name])
+            self.assertEqual(stock_row.reserved, held)
+            self.assertEqual(stock_row.available + stock_row.reserved, self.STOCK)
+        # one flavour sold out rather than the race stalling with stock left
+        self.assertLess(min(ProductStock.objects.values_list('available', flat=True)), 3)
+
+
+class OrderSnapshotTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        payload  = {'items': [
+            {'item_name': 'Mango Kulfi', 'quantity': 3, 'price': '120'},
+            {'item_name': 'Choc Scoop', 'quantity': 1, 'price': '1.20'},
+        ]}
+        response = self.client.post('/api/orders/place/', payload, format='json', **self.bearer(self.customer))
+        self.order = Order.objects.get(id=response.data['id'])
+
+    def normalized(self):
+        from .serializers import OrderSerializer
+        from .views       import _order_qs
+        return [dict(OrderSerializer(order).data) for order in _order_qs().filter(business=self.business)]
+
+    def listed(self):
+        return self.client.get('/api/orders/my-orders/', **self.bearer(self.customer)).json()
+
+    def test_lists_read_the_snapshot_written_with_the_order(self):
+        self.assertEqual(self.order.snapshot['business_name'], 'Sunny Scoops Ltd')
+        self.assertEqual([i['subtotal'] for i in self.order.snapshot['items']], ['360.00', '1.20'])
+
+        with self.assertNumQueries(2):   # auth user + orders, no businesses join, no items query
+            listed = self.listed()
+        self.assertEqual(listed, self.normalized())
+
+        Order.objects.update(snapshot=None)
+        self.assertEqual(self.listed(), self.normalized())   # falls back to the joined query
+
+    def test_item_edits_and_renames_refresh_snapshots(self):
+        item = self.order.items.get(item_name='Choc Scoop')
+        item.quantity = 4
+        item.save()
+        self.business.name = 'Sunny Scoops Pvt'
+        self.business.save()
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.snapshot['business_name'], 'Sunny Scoops Pvt')
+        self.assertEqual(self.order.snapshot['items'][1]['quantity'], 4)
+        self.assertEqual(self.listed(), self.normalized())
+
+    def test_backfill_and_check_commands(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from . import snapshots
+
+        other = self.make_order()
+        Order.objects.filter(id=self.order.id).update(snapshot=None)
+        Order.objects.filter(id=other.id).update(snapshot={'business_name': 'Gone', 'items': []})
+        self.assertEqual(snapshots.check([self.order.id, other.id]), ([self.order.id], [other.id]))
+
+        out = StringIO()
+        call_command('check_order_snapshots', stdout=out)
+        self.assertIn('1 without a snapshot, 1 stale', out.getvalue())
+
+        call_command('backfill_order_snapshots', stdout=StringIO())
+        self.assertEqual(snapshots.check([self.order.id, other.id]), ([], [other.id]))
+
+        call_command('check_order_snapshots', '--fix', stdout=StringIO())
+        self.assertEqual(snapshots.check([self.order.id, other.id]), ([], []))
+
+
+class WebhookTests(BaseTestCase):
+    """Delivers to a throwaway HTTP server on localhost standing in for a partner."""
+
+    @classmethod
+    def setUpClass(cls):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Receiver(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive, so connection reuse is visible
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                self.server.received.append((self.client_address, dict(self.headers), body))
+                code = self.server.status_codes.pop(0) if self.server.status_codes else 200
+                self.send_response(code)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Receiver)
+        cls.server.received     = []
+        cls.server.status_codes = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from .models import WebhookEndpoint
+        super().setUp()
+        self.server.received.clear()
+        self.server.status_codes.clear()
+        self.endpoint = WebhookEndpoint.objects.create(
+            name='ERP', url=f'http://127.0.0.1:{self.server.server_port}/hooks/orders', secret='s3cret',
+        )
+
+    def place(self, quantity=1):
+        payload = {'items': [{'item_name': 'Mango Kulfi', 'quantity': quantity, 'price': '100.00'}]}
+        return self.client.post('/api/orders/place/', payload, format='json', **self.bearer(self.customer))
+
+    def dispatch(self):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('dispatch_webhooks', '--once', stdout=StringIO())
+
+    def test_order_changes_are_written_to_the_outbox(self):
+        from .models import WebhookDelivery, WebhookEndpoint
+        WebhookEndpoint.objects.create(name='Delivery', url='http://127.0.0.1:9/', secret='x', event_types='order.cancelled')
+
+        order_id = self.place().data['id']
+        self.assertEqual(self.place(quantity=0).status_code, status.HTTP_400_BAD_REQUEST)   # rolled back, no event
+        self.client.patch(f'/api/orders/{order_id}/cancel/', **self.bearer(self.customer))
+
+        self.assertEqual(
+            sorted(WebhookDelivery.objects.values_list('endpoint__name', 'event_type', 'order_id')),
+            [('Delivery', 'order.cancelled', order_id), ('ERP', 'order.cancelled', order_id), ('ERP', 'order.created', order_id)],
+        )
+        cancelled = WebhookDelivery.objects.filter(event_type='order.cancelled')
+        self.assertEqual(len({d.event_id for d in cancelled}), 1)   # one event, one row per endpoint
+        self.assertEqual(cancelled[0].payload['data']['previous_status'], 'Pending')
+        self.assertEqual(self.server.received, [])   # nothing was sent inline
+
+    @override_settings(WEBHOOK_BATCH_SIZE=2)
+    def test_dispatcher_posts_signed_batches_over_one_connection(self):
+        import json
+        from . import webhooks
+        from .models import WebhookDelivery
+        placed = [self.place().data['id'] for _ in range(3)]
+
+        self.dispatch()
+
+        self.assertEqual(len(self.server.received), 2)
+        events = []
+        for client, headers, body in self.server.received:
+            self.assertTrue(webhooks.verify('s3cret', body, headers[webhooks.SIGNATURE_HEADER]))
+            self.assertFalse(webhooks.verify('wrong', body, headers[webhooks.SIGNATURE_HEADER]))
+            events.extend(json.loads(body)['events'])
+        self.assertEqual([e['data']['order_id'] for e in events], placed)
+        self.assertEqual({e['type'] for e in events}, {'order.created'})
+        self.assertEqual(len({client for client, _, _ in self.server.received}), 1)   # kept alive
+        self.assertEqual(set(WebhookDelivery.objects.values_list('status', flat=True)), {WebhookDelivery.Status.SENT})
+
+    def test_failed_batches_are_retried_with_backoff(self):
+        from django.utils import timezone
+        from .models import WebhookDelivery
+        self.place()
+        self.server.status_codes.append(500)
+
+        self.dispatch()
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts), (WebhookDelivery.Status.PENDING, 1))
+        self.assertIn('HTTP 500', delivery.last_error)
+        self.assertGreater(delivery.run_after, timezone.now())
+
+        self.dispatch()   # not due yet
+        self.assertEqual(len(self.server.received), 1)
+
+        WebhookDelivery.objects.update(run_after=timezone.now())
+        self.dispatch()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), (WebhookDelivery.Status.SENT, 2))
+        self.assertEqual(len(self.server.received), 2)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_REQUEST_MS=0)
+class ProfilingTests(BaseTestCase):
+
+    def test_admin_can_profile_a_request(self):
+        import marshal
+        from .models import ProfileArtifact
+
+        self.make_order()
+        res = self.client.get('/api/orders/?profile=1', **self.bearer(self.admin))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        artifact = ProfileArtifact.objects.get(id=int(res['X-Profile-Id']))
+        self.assertEqual((artifact.trigger, artifact.path, artifact.user), ('requested', '/api/orders/?profile=1', self.admin))
+        self.assertGreater(artifact.query_count, 0)
+        self.assertTrue(any('"orders"' in q['sql'] for q in artifact.queries))
+
+        detail = self.client.get(f'/api/admin/profiles/{artifact.id}/', **self.bearer(self.admin))
+        self.assertTrue(detail.data['has_profile'])
+        self.assertIn('cumulative', detail.data['summary'])
+
+        download = self.client.get(f'/api/admin/profiles/{artifact.id}/download/', **self.bearer(self.admin))
+        self.assertEqual(download['Content-Type'], 'application/octet-stream')
+        self.assertIsInstance(marshal.loads(download.content), dict)   # what pstats.Stats('x.prof') reads
+
+        listing = self.client.get('/api/admin/profiles/', **self.bearer(self.admin))
+        self.assertEqual([p['id'] for p in listing.data], [artifact.id])
+
+    def test_download_without_cprofile_data_is_a_conflict(self):
+        from .models import ProfileArtifact
+        artifact = ProfileArtifact.objects.create(
+            trigger='slow', method='GET', path='/api/orders/', status_code=200, duration_ms=900,
+        )
+
+        response = self.client.get(f'/api/admin/profiles/{artifact.id}/download/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.client.get(f'/api/admin/profiles/{artifact.id + 1}/download/', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_header_works_like_the_query_flag(self):
+        res = self.client.get('/api/orders/', HTTP_X_PROFILE='1', **self.bearer(self.admin))
+        self.assertIn('X-Profile-Id', res)
+
+    def test_customers_cannot_profile(self):
+        from .models import ProfileArtifact
+
+        res = self.client.get('/api/orders/my-orders/?profile=1', **self.bearer(self.customer))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertFalse(ProfileArtifact.objects.exists())
+        res = self.client.get('/api/admin/profiles/', **self.bearer(self.customer))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_by_default(self):
+        from .models import ProfileArtifact
+
+        res = self.client.get('/api/orders/?profile=1', **self.bearer(self.admin))
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertFalse(ProfileArtifact.objects.exists())
+
+    def test_sampler_keeps_only_slow_requests(self):
+        from .models import ProfileArtifact
+
+        with override_settings(PROFILING_SLOW_REQUEST_MS=60_000, PROFILING_SAMPLE_RATE=1):
+            self.client.get('/api/orders/', **self.bearer(self.admin))
+        self.assertFalse(ProfileArtifact.objects.exists())
+
+        with override_settings(PROFILING_SLOW_REQUEST_MS=0.001, PROFILING_SAMPLE_RATE=1):
+            res = self.client.get('/api/orders/?token=secret', **self.bearer(self.admin))
+        self.assertNotIn('X-Profile-Id', res)   # only requested profiles are announced
+        artifact = ProfileArtifact.objects.get()
+        self.assertEqual((artifact.trigger, artifact.path, artifact.user), ('slow', '/api/orders/', None))
+
+    @override_settings(PROFILING_MAX_ARTIFACTS=2)
+    def test_only_the_newest_artifacts_are_kept(self):
+        from .models import ProfileArtifact
+
+        ids = [
+            int(self.client.get('/api/orders/?profile=1', **self.bearer(self.admin))['X-Profile-Id'])
+            for _ in range(3)
+        ]
+        self.assertEqual(sorted(ProfileArtifact.objects.values_list('id', flat=True)), ids[1:])
+
+
+class OnboardingTests(BaseTestCase):
+
+    def rows(self, *usernames):
+        return [
+            {'username': name, 'password': f'{name}-password', 'business_name': f'{name} Traders', 'phone': '555-0100'}
+            for name in usernames
+        ]
+
+    def test_admin_onboards_rows_and_gets_a_report(self):
+        from django.contrib.auth.hashers import check_password
+
+        rows = self.rows('north_1', 'north_2', 'sunny_user', 'north_1') + [
+            {'username': 'x', 'password': 'longpassword', 'business_name': 'Bad Name'},
+            {'username': 'north_3', 'password': 'short', 'business_name': 'North 3'},
+        ]
+        res = self.client.post('/api/admin/onboarding/', {'rows': rows}, format='json', **self.bearer(self.admin))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data['created'], res.data['failed']), (2, 4))
+        self.assertEqual(
+            [(r['row'], r['status'], r.get('error')) for r in res.data['results']],
+            [
+                (1, 'created', None),
+                (2, 'created', None),
+                (3, 'error', 'Username already taken.'),
+                (4, 'error', 'Username appears more than once in this upload.'),
+                (5, 'error', 'Username must be 3-50 characters and contain only letters, numbers, or underscores.'),
+                (6, 'error', 'Password must be at least 8 characters.'),
+            ],
+        )
+
+        user = User.objects.select_related('business').get(username='north_2')
+        self.assertEqual(res.data['results'][1]['user_id'], user.id)
+        self.assertEqual((user.role, user.business.name, user.business.phone), ('CUSTOMER', 'north_2 Traders', '555-0100'))
+        self.assertTrue(check_password('north_2-password', user.password_hash))
+        self.assertTrue(AdminLog.objects.filter(action='Onboarded 2 businesses').exists())
+
+        login = self.client.post('/api/auth/login/', {'username': 'north_1', 'password': 'north_1-password'}, format='json')
+        self.assertEqual(login.status_code, status.HTTP_200_OK)
+
+    def test_csv_upload(self):
+        body = (
+            '\ufeffusername,password,business_name,email\r\n'
+            'csv_one,csv-password,CSV One,one@example.com\r\n'
+            'csv_two,csv-password,,\r\n'
+        )
+        res = self.client.post('/api/admin/onboarding/', body, content_type='text/csv', **self.bearer(self.admin))
+        self.assertEqual([r['status'] for r in res.data['results']], ['created', 'error'])
+        self.assertEqual(Business.objects.get(name='CSV One').email, 'one@example.com')
+
+        res = self.client.post('/api/admin/onboarding/', 'name\r\nx\r\n', content_type='text/csv', **self.bearer(self.admin))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_customers_cannot_onboard(self):
+        res = self.client.post('/api/admin/onboarding/', {'rows': self.rows('north_1')}, format='json', **self.bearer(self.customer))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(username='north_1').exists())
+
+    def test_passwords_are_hashed_in_a_process_pool(self):
+        from django.contrib.auth.hashers import check_password
+        from . import onboarding
+
+        with override_settings(ONBOARDING_POOL_THRESHOLD=1):
+            hashes = onboarding.hash_passwords(['first-password', 'second-password'], workers=2)
+        self.assertTrue(check_password('first-password', hashes[0]))
+        self.assertTrue(check_password('second-password', hashes[1]))
+
+    def test_command_dry_run_creates_nothing(self):
+        import io
+        import os
+        import tempfile
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write('username,password,business_name\ncmd_one,cmd-password,Cmd One\nsunny_user,cmd-password,Dup\n')
+        self.addCleanup(os.unlink, fh.name)
+
+        out = io.StringIO()
+        call_command('onboard_businesses', fh.name, '--dry-run', stdout=out)
+        self.assertIn('Row 2 (sunny_user): Username already taken.', out.getvalue())
+        self.assertFalse(User.objects.filter(username='cmd_one').exists())
+
+        call_command('onboard_businesses', fh.name, stdout=io.StringIO())
+        self.assertTrue(User.objects.filter(username='cmd_one', business__name='Cmd One').exists())
+
+    @override_settings(ONBOARDING_MAX_ROWS=2)
+    def test_large_files_go_through_the_command(self):
+        import io
+        import json
+        import os
+        import tempfile
+        from django.core.management import call_command
+
+        rows = self.rows('big_1', 'big_2', 'big_3')
+        res  = self.client.post('/api/admin/onboarding/', {'rows': rows}, format='json', **self.bearer(self.admin))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('onboard_businesses', res.data['error'])
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump(rows, fh)
+        self.addCleanup(os.unlink, fh.name)
+        call_command('onboard_businesses', fh.name, stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='big_').count(), 3)
+
+
+@override_settings(ADMIN_LOG_RETENTION_DAYS=30)
+class AdminLogRetentionTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_admin = User.objects.create(username='admin_two', password_hash='x', role=User.Role.ADMIN)
+
+    def log(self, admin_user, action, when):
+        from datetime import datetime, timezone as dt_timezone
+        return AdminLog.objects.create(
+            admin_user=admin_user, action=action, action_time=datetime(*when, tzinfo=dt_timezone.utc),
+        )
+
+    def test_action_types(self):
+        from .admin_logs import action_type
+
+        self.assertEqual(action_type('Changed order #4 status from Pending to Confirmed'), 'order_status_changed')
+        self.assertEqual(action_type('Placed order #9 for business #2 from standing order #3'), 'order_placed')
+        self.assertEqual(action_type('Onboarded 12 businesses'), 'businesses_onboarded')
+        self.assertEqual(action_type('Something new'), 'other')
+
+    def test_purge_compacts_old_entries_into_monthly_summaries(self):
+        from datetime import date
+        from django.utils import timezone
+        from .admin_logs import purge
+        from .models import AdminLogSummary
+
+        self.log(self.admin, 'Placed order #1 for business #1', (2025, 3, 2, 9))
+        self.log(self.admin, 'Placed order #2 for business #1', (2025, 3, 20, 9))
+        self.log(self.admin, 'Changed order #1 status from Pending to Confirmed', (2025, 3, 21, 9))
+        self.log(self.other_admin, 'Admin cancelled order #2', (2025, 3, 22, 9))
+        self.log(self.admin, 'Placed order #3 for business #1', (2025, 4, 1, 9))
+        recent = AdminLog.record(self.admin, 'Placed order #4 for business #1')
+
+        self.assertEqual(purge(batch_size=2), 5)
+        self.assertEqual(list(AdminLog.objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(
+            list(AdminLogSummary.objects.order_by('month', 'admin_user_id', 'action_type')
+                 .values_list('month', 'admin_user__username', 'action_type', 'count')),
+            [
+                (date(2025, 3, 1), 'admin', 'order_placed', 2),
+                (date(2025, 3, 1), 'admin', 'order_status_changed', 1),
+                (date(2025, 3, 1), 'admin_two', 'order_cancelled', 1),
+                (date(2025, 4, 1), 'admin', 'order_placed', 1),
+            ],
+        )
+
+        # a later purge adds to the month's existing summary
+        self.log(self.admin, 'Placed order #5 for business #1', (2025, 3, 31, 23))
+        self.assertEqual(purge(), 1)
+        summary = AdminLogSummary.objects.get(month=date(2025, 3, 1), admin_user=self.admin, action_type='order_placed')
+        self.assertEqual(summary.count, 3)
+        self.assertEqual((summary.first_at.day, summary.last_at.day), (2, 31))
+        self.assertLess(summary.last_at, timezone.now())
+
+    @override_settings(ADMIN_LOG_RETENTION_DAYS=0)
+    def test_zero_retention_keeps_everything(self):
+        from .admin_logs import purge
+
+        self.log(self.admin, 'Placed order #1 for business #1', (2020, 1, 1))
+        self.assertEqual(purge(), 0)
+        self.assertEqual(AdminLog.objects.count(), 1)
+
+    def test_command_and_monthly_endpoint(self):
+        import io
+        from django.core.management import call_command
+
+        self.log(self.admin, 'Placed order #1 for business #1', (2025, 3, 2))
+        self.log(self.other_admin, 'Placed order #2 for business #1', (2025, 5, 2))
+        call_command('purge_admin_logs', '--before', '2025-06-01', stdout=io.StringIO())
+        self.assertFalse(AdminLog.objects.exists())
+
+        res = self.client.get('/api/admin/logs/monthly/', {'from': '2025-04'}, **self.bearer(self.admin))
+        self.assertEqual(
+            [(s['month'], s['admin_username'], s['action_type'], s['count']) for s in res.data],
+            [('2025-05', 'admin_two', 'order_placed', 1)],
+        )
+        res = self.client.get('/api/admin/logs/monthly/', {'from': 'March'}, **self.bearer(self.admin))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_log_list_is_bounded_and_pages_with_a_cursor(self):
+        from unittest import mock
+        from .views import AdminLogView
+
+        for day in range(1, 6):
+            self.log(self.admin if day % 2 else self.other_admin, f'Event {day}', (2026, 1, day))
+
+        with mock.patch.object(AdminLogView, 'DEFAULT_LIMIT', 3):
+            res = self.client.get('/api/admin/logs/', **self.bearer(self.admin))
+        self.assertEqual([log['action'] for log in res.data], ['Event 5', 'Event 4', 'Event 3'])
+
+        res = self.client.get('/api/admin/logs/', {'limit': 2, 'admin': self.admin.id}, **self.bearer(self.admin))
+        self.assertEqual([log['action'] for log in res.data['results']], ['Event 5', 'Event 3'])
+        res = self.client.get(
+            '/api/admin/logs/', {'limit': 2, 'admin': self.admin.id, 'cursor': res.data['next_cursor']},
+            **self.bearer(self.admin),
+        )
+        self.assertEqual(([log['action'] for log in res.data['results']], res.data['next_cursor']), (['Event 1'], None))
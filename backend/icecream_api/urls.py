@@ -16,11 +16,25 @@ urlpatterns = [
     # ── Orders ──
     path('orders/',                        views.OrderListView.as_view(),         name='order_list'),
     path('orders/my-orders/',              views.MyOrdersView.as_view(),          name='my_orders'),
+    path('orders/my-summary/',             views.MyOrderSummaryView.as_view(),    name='my_order_summary'),
+    path('orders/search/',                 views.OrderSearchView.as_view(),       name='order_search'),
+    path('orders/events/',                 views.OrderEventStreamView.as_view(),  name='order_events'),
     path('orders/place/',                  views.PlaceOrderView.as_view(),        name='place_order'),
+    path('orders/standing/',               views.StandingOrderListView.as_view(),   name='standing_orders'),
+    path('orders/standing/<int:standing_id>/', views.StandingOrderDetailView.as_view(), name='standing_order'),
     path('orders/<int:order_id>/status/',  views.UpdateOrderStatusView.as_view(), name='update_order_status'),
     path('orders/<int:order_id>/cancel/',  views.CancelOrderView.as_view(),       name='cancel_order'),
+    path('orders/<int:order_id>/invoice/', views.OrderInvoiceView.as_view(),      name='order_invoice'),
 
     # ── Admin ──
     path('admin/stats/', views.AdminStatsView.as_view(), name='admin_stats'),
     path('admin/logs/',  views.AdminLogView.as_view(),   name='admin_logs'),
+    path('admin/logs/monthly/', views.AdminLogSummaryView.as_view(), name='admin_log_summary'),
+    path('admin/metrics/', views.AdminMetricsView.as_view(), name='admin_metrics'),
+    path('admin/analytics/items/', views.ItemDemandView.as_view(), name='item_demand'),
+    path('admin/invoices/',        views.InvoiceBatchView.as_view(), name='invoice_batch'),
+    path('admin/onboarding/',      views.BulkOnboardingView.as_view(), name='bulk_onboarding'),
+    path('admin/profiles/',                            views.ProfileListView.as_view(),     name='admin_profiles'),
+    path('admin/profiles/<int:profile_id>/',           views.ProfileDetailView.as_view(),   name='admin_profile'),
+    path('admin/profiles/<int:profile_id>/download/',  views.ProfileDownloadView.as_view(), name='admin_profile_download'),
 ]
\ No newline at end of file
@@ -1,8 +1,21 @@
+import heapq
 import json
-import re
+from datetime  import datetime
+from itertools import zip_longest
+from decimal   import Decimal
 
+from asgiref.sync import sync_to_async
+
+from django.conf                 import settings
 from django.contrib.auth.hashers import check_password, make_password
-from django.db.models            import Sum
+from django.core.cache           import cache
+from django.core.handlers.asgi   import ASGIRequest
+from django.db                   import transaction
+from django.db.models            import Q, Sum
+from django.http                 import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils                import timezone
+from django.utils.dateparse      import parse_datetime
+from django.views                import View
 
 from rest_framework.views       import APIView
 from rest_framework.response    import Response
@@ -12,12 +25,24 @@ from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens     import RefreshToken, AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 
-from .models      import User, Order, Business, AdminLog
+from .            import (
+    analytics, caching, emails, events, idempotency, invoices, metrics, onboarding, pagination, revocation,
+    search, sharding, stock, sync, webhooks,
+)
+from .models      import (
+    User, Order, ArchivedOrder, Business, StandingOrder, AdminLog, AdminLogSummary, ProfileArtifact,
+)
 from .serializers import (
     UserSerializer,
     OrderSerializer,
+    OrderSnapshotSerializer,
+    ArchivedOrderSerializer,
     BusinessSerializer,
+    StandingOrderSerializer,
     AdminLogSerializer,
+    AdminLogSummarySerializer,
+    ProfileArtifactSerializer,
+    ProfileArtifactDetailSerializer,
 )
 
 
@@ -39,9 +64,15 @@ def get_user_from_token(request):
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
         return None
-    raw_token = auth_header.split(' ', 1)[1]
+    return get_user_from_raw_token(auth_header.split(' ', 1)[1])
+
+
+def get_user_from_raw_token(raw_token):
+    """Returns the User an access token belongs to, or None if it is invalid."""
     try:
         token   = AccessToken(raw_token)
+        if revocation.is_token_revoked(token):
+            return None
         user_id = token.get('user_id')
         return User.objects.select_related('business').get(id=user_id)
     except (TokenError, User.DoesNotExist, Exception):
@@ -72,6 +103,8 @@ def require_auth(request):
             {'error': 'Authentication required.'},
             status=status.HTTP_401_UNAUTHORIZED,
         )
+    if not user.is_admin:
+        sharding.pin_business(user.business_id)   # a customer only touches their own shard
     return user, None
 
 
@@ -130,8 +163,7 @@ class RegisterView(APIView):
     """POST /api/auth/register"""
     permission_classes = [AllowAny]
 
-    # username must be 3-50 alphanumeric/underscore characters
-    _USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]{3,50}$')
+    _USERNAME_RE = onboarding.USERNAME_RE
 
     def post(self, request):
         username       = request.data.get('username', '').strip()
@@ -185,7 +217,11 @@ class RegisterView(APIView):
 
 
 class RefreshTokenView(APIView):
-    """POST /api/auth/refresh"""
+    """
+    POST /api/auth/refresh
+    Rotates the refresh token: the one sent is revoked and a new one is
+    returned with the access token. Presenting a revoked token again fails.
+    """
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -197,34 +233,49 @@ class RefreshTokenView(APIView):
             )
         try:
             refresh = RefreshToken(token_str)
-            return Response(
-                {'access': str(refresh.access_token)},
-                status=status.HTTP_200_OK,
-            )
         except TokenError:
+            refresh = None
+        # revoke_token() is False when a concurrent request already rotated it
+        if refresh is None or revocation.is_token_revoked(refresh) or not revocation.revoke_token(refresh):
             return Response(
                 {'error': 'Invalid or expired refresh token. Please log in again.'},
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        return Response(
+            {'access': str(refresh.access_token), 'refresh': str(refresh)},
+            status=status.HTTP_200_OK,
+        )
+
 
 class LogoutView(APIView):
     """
     POST /api/auth/logout
-    Attempts to blacklist the refresh token if simplejwt's blacklist app
-    is installed. Silently succeeds even if blacklisting is unavailable,
-    because the frontend clears its own token storage on logout regardless.
+    Revokes the refresh token in the body and the access token in the
+    Authorization header. Succeeds even when either is missing or already
+    invalid, because the frontend clears its own token storage regardless.
     """
     permission_classes = [AllowAny]
 
     def post(self, request):
-        token_str = request.data.get('refresh', '')
-        if token_str:
-            try:
-                RefreshToken(token_str).blacklist()
-            except Exception:
-                # blacklist app not installed or token already invalid
-                pass
+        token_str   = request.data.get('refresh', '')
+        auth_header = request.headers.get('Authorization', '')
+        tokens      = []
+        try:
+            if token_str:
+                tokens.append(RefreshToken(token_str))
+        except TokenError:
+            pass
+        try:
+            if auth_header.startswith('Bearer '):
+                tokens.append(AccessToken(auth_header.split(' ', 1)[1]))
+        except TokenError:
+            pass
+        for token in tokens:
+            revocation.revoke_token(token)
         return Response({'detail': 'Logged out.'}, status=status.HTTP_200_OK)
 
 
@@ -276,15 +327,75 @@ class UpdateProfileView(APIView):
 # ------------------------------------------------------------------
 
 class BusinessListView(APIView):
-    """GET /api/businesses/  — admin only"""
+    """
+    GET /api/businesses/  — admin only
+    Query params:
+      ?ordering=-lifetime_value   name | order_count | open_order_count | lifetime_value
+                                  | last_order_at, '-' for descending (default: name)
+      ?q=scoops  ?min_orders=10  ?min_value=5000  ?has_open_orders=true
+      ?last_order_before=2026-01-01   (also matches businesses that never ordered)
+      ?limit=50  ?cursor=<next_cursor>
+    Without limit / cursor the whole filtered list is returned as before; with
+    either, {"results": [...], "next_cursor": <cursor or null>}.
+    """
     permission_classes = [AllowAny]
 
+    ORDERINGS = ('name', 'order_count', 'open_order_count', 'lifetime_value', 'last_order_at')
+    MAX_LIMIT = 200
+
     def get(self, request):
         user, err = require_admin(request)
         if err:
             return err
+
+        params   = request.query_params
+        ordering = params.get('ordering', 'name')
+        if ordering.lstrip('-') not in self.ORDERINGS:
+            return Response(
+                {'error': f'Invalid ordering. Choose from: {list(self.ORDERINGS)} (prefix - for descending)'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         businesses = Business.objects.all()
-        return Response(BusinessSerializer(businesses, many=True).data)
+        try:
+            if params.get('q'):
+                businesses = businesses.filter(name__icontains=params['q'])
+            if params.get('min_orders'):
+                businesses = businesses.filter(order_count__gte=int(params['min_orders']))
+            if params.get('min_value'):
+                businesses = businesses.filter(lifetime_value__gte=Decimal(params['min_value']))
+            if params.get('has_open_orders'):
+                if params['has_open_orders'].lower() in ('1', 'true', 'yes'):
+                    businesses = businesses.filter(open_order_count__gt=0)
+                else:
+                    businesses = businesses.filter(open_order_count=0)
+            if params.get('last_order_before'):
+                day = datetime.strptime(params['last_order_before'], '%Y-%m-%d')
+                businesses = businesses.filter(
+                    Q(last_order_at__lt=timezone.make_aware(day)) | Q(last_order_at__isnull=True)
+                )
+            limit = int(params.get('limit', 50))
+        except (ValueError, ArithmeticError):
+            return Response(
+                {'error': 'min_orders and limit must be integers, min_value a number and '
+                          'last_order_before a date in YYYY-MM-DD format.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if 'limit' not in params and 'cursor' not in params:
+            businesses = pagination.paginate(businesses, ordering)[0]
+            return Response(BusinessSerializer(businesses, many=True).data)
+
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        try:
+            page, next_cursor = pagination.paginate(businesses, ordering, limit, params.get('cursor'))
+        except pagination.InvalidCursor as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'results':     BusinessSerializer(page, many=True).data,
+            'next_cursor': next_cursor,
+        })
 
 
 # ------------------------------------------------------------------
@@ -297,12 +408,140 @@ def _order_qs():
         Order.objects
         .select_related('business')
         .prefetch_related('items')
+        .defer('snapshot')
+    )
+
+
+def _locked_order(order_id):
+    """
+    The order, row-locked until the surrounding transaction ends. Status
+    changes read it this way so concurrent transitions of one order queue up
+    and each one's counter delta starts from the status the previous one wrote.
+    """
+    return _order_qs().select_for_update(of=('self',)).get(id=order_id)
+
+
+def _order_list_qs():
+    """Orders for the list endpoints: no joins, serialize with _serialize_order_list()."""
+    return Order.objects.all()
+
+
+def _archived_order_qs():
+    """Same as _order_qs() but over the cold `orders_archive` store."""
+    return (
+        ArchivedOrder.objects
+        .select_related('business')
+        .prefetch_related('items')
     )
 
 
-def _serialize_orders(queryset, request=None):
-    """Serializes a queryset, passing request context for absolute screenshot URLs."""
-    return OrderSerializer(queryset, many=True, context={'request': request}).data
+def _wants_archived(request):
+    """True when the client passed ?include_archived=true (or 1 / yes)."""
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+
+def _serialize_with_archive(orders, archived, request=None):
+    """
+    Serializes hot and archived orders as one list, newest first.
+    Both querysets must already be ordered by -order_date.
+    """
+    merged  = heapq.merge(orders, archived, key=lambda o: o.order_date, reverse=True)
+    context = {'request': request}
+    return [
+        (ArchivedOrderSerializer if isinstance(o, ArchivedOrder) else OrderSerializer)(o, context=context).data
+        for o in merged
+    ]
+
+
+def _each_shard(fetch, all_businesses=False):
+    """
+    [fetch()], or one fetch() per shard (run in parallel) when the query
+    covers every business and orders are sharded. fetch() must clone any
+    queryset it evaluates, since the shards share it.
+    """
+    if all_businesses and sharding.enabled():
+        return sharding.fan_out(lambda alias: fetch())
+    return [fetch()]
+
+
+def _newest_first(pages):
+    """Merges lists of serialized orders that are each sorted newest first."""
+    if len(pages) == 1:
+        return pages[0]
+    return list(heapq.merge(*pages, key=lambda o: parse_datetime(o['order_date']), reverse=True))
+
+
+def _order_list_response(orders, request, business_id=None, all_businesses=False):
+    """
+    Without ?since=: the full list, with a fresh sync token in X-Sync-Token.
+    With ?since=<token>: {"orders": [changed since], "deleted": [ids removed
+    since], "sync_token": <next token>}. Deletions are limited to business_id
+    unless all_businesses is set (admins without a business filter).
+    """
+    token = sync.issue_token()   # issued before reading so nothing falls in a gap
+    raw   = request.query_params.get('since')
+
+    if raw is None:
+        response = Response(_newest_first(_each_shard(
+            lambda: _serialize_order_list(orders.all(), request), all_businesses,
+        )))
+        response[sync.HEADER] = token
+        return response
+
+    if request.query_params.get('status') or _wants_archived(request):
+        return Response(
+            {'error': 'since cannot be combined with status or include_archived.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        since = sync.parse_token(raw)
+    except sync.TokenExpired:
+        return Response(
+            {'error': 'Sync token expired. Reload the full list.'},
+            status=status.HTTP_410_GONE,
+        )
+    except ValueError:
+        return Response(
+            {'error': 'Invalid sync token.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    changed = orders.filter(updated_at__gte=since)
+    if all_businesses:
+        deleted = sorted({
+            order_id
+            for ids in _each_shard(lambda: sync.deleted_order_ids(since), all_businesses)
+            for order_id in ids
+        })
+    else:
+        deleted = sync.deleted_order_ids(since, business_id) if business_id else []
+
+    return Response({
+        'orders':     _newest_first(_each_shard(
+            lambda: _serialize_order_list(changed.all(), request), all_businesses,
+        )),
+        'deleted':    deleted,
+        'sync_token': token,
+    })
+
+
+def _serialize_order_list(orders, request=None):
+    """
+    Serializes orders read with _order_list_qs() from their snapshots, so the
+    whole list costs one single-table query. Orders without a snapshot yet
+    are loaded with _order_qs() (see snapshots.py).
+    """
+    orders  = list(orders)
+    missing = [order.id for order in orders if order.snapshot is None]
+    joined  = _order_qs().in_bulk(missing) if missing else {}
+    context = {'request': request}
+    return [
+        OrderSnapshotSerializer(order, context=context).data
+        if order.snapshot is not None else
+        OrderSerializer(joined[order.id], context=context).data
+        for order in orders
+        if order.snapshot is not None or order.id in joined
+    ]
 
 
 def _serialize_order(instance, request=None):
@@ -315,6 +554,8 @@ class OrderListView(APIView):
     GET /api/orders/
     Admin receives all orders. Customers receive only their own.
     Optional query params: ?status=Pending  ?business_id=3 (admin only)
+                           ?include_archived=true  (also return archived orders)
+                           ?since=<sync token>     (only changes, see _order_list_response)
     """
     permission_classes = [AllowAny]
 
@@ -323,24 +564,39 @@ class OrderListView(APIView):
         if err:
             return err
 
-        orders = _order_qs()
-
+        filters = {}
         if not user.is_admin:
-            orders = orders.filter(business=user.business)
+            filters['business'] = user.business
 
         order_status = request.query_params.get('status')
         business_id  = request.query_params.get('business_id')
 
         if order_status:
-            orders = orders.filter(status=order_status)
+            filters['status'] = order_status
         if business_id and user.is_admin:
-            orders = orders.filter(business_id=business_id)
+            filters['business_id'] = business_id
+            sharding.pin_business(business_id)
 
-        return Response(_serialize_orders(orders, request))
+        all_businesses = user.is_admin and not business_id
+        orders         = _order_list_qs().filter(**filters)
+
+        if _wants_archived(request) and 'since' not in request.query_params:
+            orders   = _order_qs().filter(**filters)
+            archived = _archived_order_qs().filter(**filters)
+            return Response(_newest_first(_each_shard(
+                lambda: _serialize_with_archive(orders.all(), archived.all(), request), all_businesses,
+            )))
+
+        if user.is_admin:
+            return _order_list_response(orders, request, business_id=business_id, all_businesses=all_businesses)
+        return _order_list_response(orders, request, business_id=user.business_id)
 
 
 class MyOrdersView(APIView):
-    """GET /api/orders/my-orders  — returns the authenticated customer's orders"""
+    """
+    GET /api/orders/my-orders  — returns the authenticated customer's orders
+    Optional query params: ?include_archived=true  ?since=<sync token>
+    """
     permission_classes = [AllowAny]
 
     def get(self, request):
@@ -349,11 +605,116 @@ class MyOrdersView(APIView):
             return err
 
         orders = (
-            _order_qs()
+            _order_list_qs()
             .filter(business=user.business)
             .order_by('-order_date')
         )
-        return Response(_serialize_orders(orders, request))
+
+        if _wants_archived(request) and 'since' not in request.query_params:
+            orders   = _order_qs().filter(business=user.business).order_by('-order_date')
+            archived = (
+                _archived_order_qs()
+                .filter(business=user.business)
+                .order_by('-order_date')
+            )
+            return Response(_serialize_with_archive(orders, archived, request))
+
+        return _order_list_response(orders, request, business_id=user.business_id)
+
+
+class MyOrderSummaryView(APIView):
+    """
+    GET /api/orders/my-summary/?recent=5  — the authenticated customer's dashboard summary
+    Lifetime status counts and spend, monthly spend, top items and the `recent`
+    newest orders (default 5, max 20). Aggregates are cached per business.
+    """
+    permission_classes = [AllowAny]
+
+    MAX_RECENT = 20
+
+    def get(self, request):
+        user, err = require_auth(request)
+        if err:
+            return err
+        if not user.business_id:
+            return Response(
+                {'error': 'Your account is not linked to a business.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            recent = int(request.query_params.get('recent', 5))
+        except ValueError:
+            return Response(
+                {'error': 'recent must be an integer.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        recent = max(0, min(recent, self.MAX_RECENT))
+
+        today     = timezone.localdate()
+        cache_key = caching.business_key('summary', user.business_id, today.isoformat())
+        summary   = cache.get(cache_key)
+        if summary is None:
+            summary = analytics.order_summary(user.business_id, today)
+            cache.set(cache_key, summary, settings.ORDER_SUMMARY_CACHE_SECONDS)
+
+        # served fresh: an indexed LIMIT query, and it carries per-order flags
+        # (email_sent, payment_done) that bulk UPDATEs change without signals
+        orders = _order_list_qs().filter(business_id=user.business_id).order_by('-order_date')[:recent]
+        return Response({
+            'business_id':   user.business_id,
+            **summary,
+            'recent_orders': _serialize_order_list(orders, request) if recent else [],
+        })
+
+
+class OrderSearchView(APIView):
+    """
+    GET /api/orders/search/?q=mango kulfi&limit=20  — authenticated
+    Ranked match over order id, business name, contact person and item names.
+    Admins search every order, customers only their own. At most 50 results.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_auth(request)
+        if err:
+            return err
+
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not user.is_admin and not user.business_id:
+            return Response([])
+
+        def fetch():
+            order_ids = search.search_order_ids(
+                query,
+                business_id=None if user.is_admin else user.business_id,
+                limit=limit,
+            )
+            orders = _order_list_qs().in_bulk(order_ids)
+            return _serialize_order_list(
+                [orders[order_id] for order_id in order_ids if order_id in orders],
+                request,
+            )
+
+        # ranks are per shard, so shards take turns in the merged result
+        pages   = _each_shard(fetch, all_businesses=user.is_admin)
+        results = [o for turn in zip_longest(*pages) for o in turn if o is not None]
+        return Response(results[:max(1, min(limit, search.MAX_RESULTS))])
 
 
 class PlaceOrderView(APIView):
@@ -374,6 +735,13 @@ class PlaceOrderView(APIView):
        - items:              JSON string  e.g. '[{"item_name": "..."}]'
        - payment_done:       "true" | "false"
        - payment_screenshot: image file
+
+    Optional header: Idempotency-Key: <client-generated unique string>
+       A retry carrying the same key (and the same payload) returns the
+       original response instead of placing a second order.
+
+    Flavours with a ProductStock row for today are reserved as part of the
+    order; asking for more than is left returns 409 and places nothing.
     """
     permission_classes = [AllowAny]
 
@@ -420,29 +788,72 @@ class PlaceOrderView(APIView):
             'items':        items,
             'payment_done': payment_done,
         }
+        if user.is_admin and sharding.enabled():
+            try:
+                sharding.pin_business(int(business_id))
+            except (TypeError, ValueError):
+                return Response(
+                    {'business': ['Invalid business id.']},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        serializer = OrderSerializer(data=data, context={'request': request})
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        key = request.headers.get(idempotency.HEADER)
+        if key is not None and not 0 < len(key) <= idempotency.MAX_LENGTH:
+            return Response(
+                {'error': f'{idempotency.HEADER} must be 1-{idempotency.MAX_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        order = serializer.save()
+        with transaction.atomic(), sharding.atomic():
+            if key:
+                record, replay = idempotency.claim(
+                    user, key, idempotency.fingerprint(data, payment_screenshot),
+                )
+                if replay is not None:
+                    return replay
 
-        # attach screenshot after save so we have a pk for the upload path
-        if payment_screenshot:
-            order.payment_screenshot = payment_screenshot
-            order.save(update_fields=['payment_screenshot'])
+            serializer = OrderSerializer(data=data, context={'request': request})
+            if not serializer.is_valid():
+                transaction.set_rollback(True)   # release the idempotency key
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # log when an admin places an order on behalf of a business
-        if user.is_admin:
-            AdminLog.record(
-                user,
-                f'Placed order #{order.id} for business #{order.business_id}',
+            try:
+                reservations = stock.reserve(
+                    (item['item_name'], item['quantity']) for item in serializer.validated_data['items']
+                )
+            except stock.OutOfStock as exc:
+                transaction.set_rollback(True)   # give back what was taken, release the idempotency key
+                return Response(
+                    {'error': str(exc), 'item_name': exc.item_name, 'available': exc.available},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            order = serializer.save()
+            stock.record(order, reservations)
+
+            # attach screenshot after save so we have a pk for the upload path
+            if payment_screenshot:
+                order.payment_screenshot = payment_screenshot
+                order.save(update_fields=['payment_screenshot'])
+
+            # log when an admin places an order on behalf of a business
+            if user.is_admin:
+                AdminLog.record(
+                    user,
+                    f'Placed order #{order.id} for business #{order.business_id}',
+                )
+
+            response = Response(
+                _serialize_order(order, request),
+                status=status.HTTP_201_CREATED,
             )
+            if key:
+                idempotency.store(record, response)
 
-        return Response(
-            _serialize_order(order, request),
-            status=status.HTTP_201_CREATED,
-        )
+            webhooks.enqueue(events.ORDER_CREATED, order, response.data)
+            events.publish_order_event(events.ORDER_CREATED, order, response.data)
+
+        return response
 
 
 class UpdateOrderStatusView(APIView):
@@ -454,9 +865,7 @@ class UpdateOrderStatusView(APIView):
         if err:
             return err
 
-        try:
-            order = _order_qs().get(id=order_id)
-        except Order.DoesNotExist:
+        if not sharding.pin_order(order_id):
             return Response(
                 {'error': 'Order not found.'},
                 status=status.HTTP_404_NOT_FOUND,
@@ -471,20 +880,53 @@ class UpdateOrderStatusView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        old_status   = order.status
-        order.status = new_status
+        with transaction.atomic(), sharding.atomic():
+            try:
+                order = _locked_order(order_id)
+            except Order.DoesNotExist:
+                return Response(
+                    {'error': 'Order not found.'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        if new_status == Order.Status.CONFIRMED:
-            order.email_sent = True
+            old_status   = order.status
+            order.status = new_status
+
+            if old_status == Order.Status.CANCELLED and new_status != old_status:
+                # re-opening takes back the stock that cancelling released
+                try:
+                    reservations = stock.reserve(
+                        order.items.values_list('item_name', 'quantity'),
+                        timezone.localdate(order.order_date),
+                    )
+                except stock.OutOfStock as exc:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'error': str(exc), 'item_name': exc.item_name, 'available': exc.available},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                stock.record(order, reservations)
+
+            order.save(update_fields=['status'])
+
+            if new_status == Order.Status.CANCELLED and old_status != new_status:
+                stock.release(order.id)
+
+            # email_sent flips only once the send_order_emails worker delivers it
+            if new_status == Order.Status.CONFIRMED and old_status != new_status and not order.email_sent:
+                emails.enqueue_order_confirmation(order)
 
-        order.save(update_fields=['status', 'email_sent'])
+            AdminLog.record(
+                user,
+                f'Changed order #{order.id} status from {old_status} to {new_status}',
+            )
 
-        AdminLog.record(
-            user,
-            f'Changed order #{order.id} status from {old_status} to {new_status}',
-        )
+            data       = _serialize_order(order, request)
+            event_type = events.ORDER_CANCELLED if new_status == Order.Status.CANCELLED else events.ORDER_STATUS_CHANGED
+            webhooks.enqueue(event_type, order, data, previous_status=old_status)
 
-        return Response(_serialize_order(order, request), status=status.HTTP_200_OK)
+        events.publish_order_event(event_type, order, data, previous_status=old_status)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class CancelOrderView(APIView):
@@ -496,39 +938,214 @@ class CancelOrderView(APIView):
         if err:
             return err
 
-        try:
-            order = _order_qs().get(id=order_id)
-        except Order.DoesNotExist:
+        if not sharding.pin_order(order_id):
             return Response(
                 {'error': 'Order not found.'},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        if not user.is_admin and order.business != user.business:
-            return Response(
-                {'error': 'You can only cancel your own orders.'},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        with transaction.atomic(), sharding.atomic():
+            try:
+                order = _locked_order(order_id)
+            except Order.DoesNotExist:
+                return Response(
+                    {'error': 'Order not found.'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        if order.status == Order.Status.CANCELLED:
-            return Response(
-                {'error': 'Order is already cancelled.'},
-                status=status.HTTP_400_BAD_REQUEST,
+            if not user.is_admin and order.business != user.business:
+                return Response(
+                    {'error': 'You can only cancel your own orders.'},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+            if order.status == Order.Status.CANCELLED:
+                return Response(
+                    {'error': 'Order is already cancelled.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if not user.is_admin and order.status != Order.Status.PENDING:
+                return Response(
+                    {'error': 'Only pending orders can be cancelled.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            old_status   = order.status
+            order.status = Order.Status.CANCELLED
+            order.save(update_fields=['status'])
+            stock.release(order.id)
+
+            if user.is_admin:
+                AdminLog.record(user, f'Admin cancelled order #{order.id}')
+
+            data = _serialize_order(order, request)
+            webhooks.enqueue(events.ORDER_CANCELLED, order, data, previous_status=old_status)
+
+        events.publish_order_event(events.ORDER_CANCELLED, order, data, previous_status=old_status)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class OrderEventStreamView(View):
+    """
+    GET /api/orders/events/  — authenticated, text/event-stream
+
+    Pushes order.created, order.status_changed and order.cancelled events:
+    every order for admins, only their own business for customers.
+    EventSource cannot set headers, so the access token may be passed as
+    ?token=<access>. Reconnects resume after the Last-Event-ID header
+    (or ?last_event_id=).
+
+    Served only by the ASGI application (icecream_project.asgi), where an idle
+    stream is a parked coroutine. Under WSGI it would hold a worker forever,
+    so it answers 503 there.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {'error': 'The event stream is only available from the ASGI server.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
-        if not user.is_admin and order.status != Order.Status.PENDING:
-            return Response(
-                {'error': 'Only pending orders can be cancelled.'},
-                status=status.HTTP_400_BAD_REQUEST,
+        auth_header = request.headers.get('Authorization', '')
+        raw_token   = (
+            auth_header.split(' ', 1)[1] if auth_header.startswith('Bearer ')
+            else request.GET.get('token', '')
+        )
+        user = await sync_to_async(get_user_from_raw_token)(raw_token) if raw_token else None
+        if not user:
+            return JsonResponse({'error': 'Authentication required.'}, status=status.HTTP_401_UNAUTHORIZED)
+        if not user.is_admin and not user.business_id:
+            return JsonResponse({'error': 'No business linked to this account.'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0) or None
+        except ValueError:
+            last_event_id = None
+
+        events.ensure_listener()
+        response = StreamingHttpResponse(
+            self._stream(None if user.is_admin else user.business_id, last_event_id),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control']     = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'   # stop nginx from buffering the stream
+        return response
+
+    @staticmethod
+    async def _stream(business_id, last_event_id):
+        yield f'retry: {settings.ORDER_EVENTS_RETRY_MS}\n\n'
+        async for event in events.broker.stream(
+            business_id=business_id,
+            last_event_id=last_event_id,
+            heartbeat=settings.ORDER_EVENTS_HEARTBEAT_SECONDS,
+        ):
+            yield ': keep-alive\n\n' if event is None else event.to_sse()
+
+
+# ------------------------------------------------------------------
+# Standing orders
+# ------------------------------------------------------------------
+
+def _standing_order_qs(user):
+    standing_orders = StandingOrder.objects.select_related('business').order_by('id')
+    if not user.is_admin:
+        standing_orders = standing_orders.filter(business_id=user.business_id)
+    return standing_orders
+
+
+class StandingOrderListView(APIView):
+    """
+    GET  /api/orders/standing/  — the caller's standing orders (admins: all, or ?business=<id>)
+    POST /api/orders/standing/  — create one
+       {
+         "business":      <id>,   (ignored for customers, forced to their own business)
+         "items":         [{"item_name": "Vanilla", "quantity": 2, "price": 150}, ...],
+         "weekdays":      [0, 1, 2, 3, 4],   (Monday = 0, default: every day)
+         "interval_days": 1,
+         "start_date":    "2026-06-01",
+         "end_date":      null
+       }
+    Orders are placed by the generate_standing_orders command, not by this view.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_auth(request)
+        if err:
+            return err
+        standing_orders = _standing_order_qs(user)
+        if user.is_admin and request.query_params.get('business'):
+            standing_orders = standing_orders.filter(business_id=request.query_params['business'])
+        return Response(StandingOrderSerializer(standing_orders, many=True).data)
+
+    def post(self, request):
+        user, err = require_auth(request)
+        if err:
+            return err
+
+        data = request.data.copy()
+        if not user.is_admin:
+            data['business'] = user.business_id
+        serializer = StandingOrderSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        standing = serializer.save()
+
+        if user.is_admin:
+            AdminLog.record(user, f'Created standing order #{standing.id} for business #{standing.business_id}')
+        return Response(StandingOrderSerializer(standing).data, status=status.HTTP_201_CREATED)
+
+
+class StandingOrderDetailView(APIView):
+    """
+    PATCH  /api/orders/standing/<standing_id>/  — change items, schedule or pause (active=false)
+    DELETE /api/orders/standing/<standing_id>/  — stop it; orders already placed are kept
+    """
+    permission_classes = [AllowAny]
+
+    def _get(self, request, standing_id):
+        user, err = require_auth(request)
+        if err:
+            return None, None, err
+        try:
+            return user, _standing_order_qs(user).get(id=standing_id), None
+        except StandingOrder.DoesNotExist:
+            return None, None, Response(
+                {'error': 'Standing order not found.'},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-        order.status = Order.Status.CANCELLED
-        order.save(update_fields=['status'])
+    def patch(self, request, standing_id):
+        user, standing, err = self._get(request, standing_id)
+        if err:
+            return err
+
+        data = request.data.copy()
+        data.pop('business', None)   # moving a standing order to another business is not supported
+        serializer = StandingOrderSerializer(standing, data=data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
 
         if user.is_admin:
-            AdminLog.record(user, f'Admin cancelled order #{order.id}')
+            AdminLog.record(user, f'Updated standing order #{standing.id}')
+        return Response(serializer.data)
+
+    def delete(self, request, standing_id):
+        user, standing, err = self._get(request, standing_id)
+        if err:
+            return err
 
-        return Response(_serialize_order(order, request), status=status.HTTP_200_OK)
+        if sharding.enabled():
+            # its orders are on the business's shard, out of the cascade's reach
+            with sharding.for_business(standing.business_id):
+                Order.objects.filter(standing_order=standing).update(standing_order=None)
+        standing.delete()
+        if user.is_admin:
+            AdminLog.record(user, f'Deleted standing order #{standing_id}')
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # ------------------------------------------------------------------
@@ -540,8 +1157,6 @@ class AdminStatsView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        from django.utils import timezone
-
         user, err = require_admin(request)
         if err:
             return err
@@ -550,27 +1165,292 @@ class AdminStatsView(APIView):
         today       = now.date()
         month_start = today.replace(day=1)
 
-        revenue_today = (
-            Order.objects
-            .filter(order_date__date=today)
-            .exclude(status=Order.Status.CANCELLED)
-            .aggregate(total=Sum('total_amount'))['total'] or 0
+        def fetch():
+            revenue_today = (
+                Order.objects
+                .filter(order_date__date=today)
+                .exclude(status=Order.Status.CANCELLED)
+                .aggregate(total=Sum('total_amount'))['total'] or 0
+            )
+
+            revenue_month = (
+                Order.objects
+                .filter(order_date__date__gte=month_start)
+                .exclude(status=Order.Status.CANCELLED)
+                .aggregate(total=Sum('total_amount'))['total'] or 0
+            )
+
+            return {
+                'total_orders':    Order.objects.count(),
+                'pending_count':   Order.objects.filter(status=Order.Status.PENDING).count(),
+                'confirmed_count': Order.objects.filter(status=Order.Status.CONFIRMED).count(),
+                'revenue_today':   revenue_today,
+                'revenue_month':   revenue_month,
+            }
+
+        shards = _each_shard(fetch, all_businesses=True)
+        totals = {key: sum(stats[key] for stats in shards) for key in shards[0]}
+
+        return Response({
+            'total_orders':     totals['total_orders'],
+            'pending_count':    totals['pending_count'],
+            'confirmed_count':  totals['confirmed_count'],
+            'total_businesses': Business.objects.count(),
+            'revenue_today':    float(totals['revenue_today']),
+            'revenue_month':    float(totals['revenue_month']),
+        })
+
+
+class AdminMetricsView(APIView):
+    """
+    GET /api/admin/metrics/  — admin only
+    Runtime metrics of the worker process serving the request: database
+    connection pool usage, open event streams and email queue depth.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+        return Response(metrics.process_metrics())
+
+
+class ItemDemandView(APIView):
+    """
+    GET /api/admin/analytics/items/  — admin only
+
+    Quantity and revenue per item over a date window, for batch planning.
+    Query params:
+      ?start=2026-05-01&end=2026-05-07   (inclusive, default: today)
+      ?group_by=business | day            (optional breakdown per item)
+      ?status=Pending,Confirmed           (default: Pending,Confirmed)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        today = timezone.localdate()
+        try:
+            start = self._parse_date(request.query_params.get('start'), today)
+            end   = self._parse_date(request.query_params.get('end'), start)
+        except ValueError:
+            return Response(
+                {'error': 'start and end must be dates in YYYY-MM-DD format.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if end < start:
+            return Response(
+                {'error': 'end must not be before start.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        group_by = request.query_params.get('group_by') or None
+        if group_by is not None and group_by not in analytics.GROUP_BY_CHOICES:
+            return Response(
+                {'error': f'Invalid group_by. Choose from: {list(analytics.GROUP_BY_CHOICES)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        statuses = analytics.DEFAULT_STATUSES
+        if request.query_params.get('status'):
+            statuses       = tuple(sorted(set(request.query_params['status'].split(','))))
+            valid_statuses = [choice[0] for choice in Order.Status.choices]
+            if not set(statuses) <= set(valid_statuses):
+                return Response(
+                    {'error': f'Invalid status. Choose from: {valid_statuses}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        cache_key = caching.analytics_key('items', start, end, group_by, ','.join(statuses))
+        payload   = cache.get(cache_key)
+        if payload is None:
+            payload = {
+                'start':    start.isoformat(),
+                'end':      end.isoformat(),
+                'group_by': group_by,
+                'statuses': list(statuses),
+                'items':    analytics.item_demand(start, end, statuses, group_by),
+            }
+            cache.set(cache_key, payload, settings.ANALYTICS_CACHE_SECONDS)
+
+        return Response(payload)
+
+    @staticmethod
+    def _parse_date(value, default):
+        if not value:
+            return default
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+# ------------------------------------------------------------------
+# Invoices
+# ------------------------------------------------------------------
+
+def _invoice_type(request):
+    """(type, None) or (None, Response) for the ?type=html|pdf query param."""
+    fmt = request.query_params.get('type', 'html')
+    if fmt not in invoices.FORMATS:
+        return None, Response(
+            {'error': f'Invalid type. Choose from: {list(invoices.FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if fmt == 'pdf' and not invoices.pdf_available():
+        return None, Response(
+            {'error': 'PDF invoices are not available on this server.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    return fmt, None
+
+
+class OrderInvoiceView(APIView):
+    """
+    GET /api/orders/<order_id>/invoice/  — authenticated
+    Query params:
+      ?type=html | pdf   (default: html)
+    Served from the invoice cache unless the order changed since the last render.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, order_id):
+        user, err = require_auth(request)
+        if err:
+            return err
+
+        fmt, err = _invoice_type(request)
+        if err:
+            return err
+
+        if not sharding.pin_order(order_id):
+            return Response(
+                {'error': 'Order not found.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        business_id = Order.objects.filter(id=order_id).values_list('business_id', flat=True).first()
+        if business_id is None:
+            return Response(
+                {'error': 'Order not found.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not user.is_admin and business_id != user.business_id:
+            return Response(
+                {'error': 'You can only view invoices of your own orders.'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        path = invoices.render_order(order_id, fmt)
+        if path is None:   # deleted or archived since the lookup above
+            return Response(
+                {'error': 'Order not found.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return FileResponse(
+            open(path, 'rb'),
+            content_type  = invoices.CONTENT_TYPES[fmt],
+            as_attachment = fmt == 'pdf',
+            filename      = f'invoice-{order_id}.{fmt}',
         )
 
-        revenue_month = (
-            Order.objects
-            .filter(order_date__date__gte=month_start)
-            .exclude(status=Order.Status.CANCELLED)
-            .aggregate(total=Sum('total_amount'))['total'] or 0
+
+class InvoiceBatchView(APIView):
+    """
+    GET /api/admin/invoices/  — admin only
+
+    Every matching invoice as one ZIP archive, streamed while it renders.
+    Query params:
+      ?start=2026-05-01&end=2026-05-31   (inclusive, default: this month)
+      ?business=<id>                      (default: every business)
+      ?status=Confirmed,Completed         (default: Confirmed)
+      ?type=html | pdf                    (default: html)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        fmt, err = _invoice_type(request)
+        if err:
+            return err
+
+        today = timezone.localdate()
+        try:
+            start    = ItemDemandView._parse_date(request.query_params.get('start'), today.replace(day=1))
+            end      = ItemDemandView._parse_date(request.query_params.get('end'), today)
+            business = request.query_params.get('business')
+            business = int(business) if business else None
+        except ValueError:
+            return Response(
+                {'error': 'start and end must be dates in YYYY-MM-DD format and business an id.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        statuses = (Order.Status.CONFIRMED,)
+        if request.query_params.get('status'):
+            statuses       = tuple(request.query_params['status'].split(','))
+            valid_statuses = [choice[0] for choice in Order.Status.choices]
+            if not set(statuses) <= set(valid_statuses):
+                return Response(
+                    {'error': f'Invalid status. Choose from: {valid_statuses}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        batches = invoices.shard_batches(business, start, end, statuses)
+        if not any(order_ids for _, order_ids in batches):
+            return Response(
+                {'error': 'No orders match.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        members  = invoices.render_batches(batches, fmt)
+        response = StreamingHttpResponse(
+            invoices.stream_zip(members, fmt),
+            content_type='application/zip',
         )
+        response['Content-Disposition'] = f'attachment; filename="invoices-{start}-{end}.zip"'
+        return response
+
+
+# ------------------------------------------------------------------
+# Onboarding
+# ------------------------------------------------------------------
+
+class BulkOnboardingView(APIView):
+    """
+    POST /api/admin/onboarding/  — admin only
+    Creates businesses and their customer logins in bulk from a CSV body
+    (Content-Type: text/csv) or JSON ({"rows": [...]}), see onboarding.py.
+    Invalid rows are skipped; the response reports every row's result.
+    Uploads are capped at ONBOARDING_MAX_ROWS; larger files go through
+    `python manage.py onboard_businesses`.
+    """
+    permission_classes = [AllowAny]
 
+    def post(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        try:
+            if request.content_type.startswith('text/csv'):
+                rows = onboarding.parse_csv(request.body)
+            else:
+                rows = onboarding.parse_json(request.data)
+        except onboarding.OnboardingError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = onboarding.onboard(rows)
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created:
+            AdminLog.record(user, f'Onboarded {created} businesses')
         return Response({
-            'total_orders':     Order.objects.count(),
-            'pending_count':    Order.objects.filter(status=Order.Status.PENDING).count(),
-            'confirmed_count':  Order.objects.filter(status=Order.Status.CONFIRMED).count(),
-            'total_businesses': Business.objects.count(),
-            'revenue_today':    float(revenue_today),
-            'revenue_month':    float(revenue_month),
+            'created': created,
+            'failed':  len(results) - created,
+            'results': results,
         })
 
 
@@ -579,13 +1459,141 @@ class AdminStatsView(APIView):
 # ------------------------------------------------------------------
 
 class AdminLogView(APIView):
-    """GET /api/admin/logs/  — admin only"""
+    """
+    GET /api/admin/logs/  — admin only
+    Query params:
+      ?admin=<user id>   only this admin's entries
+      ?limit=50  ?cursor=<next_cursor>
+    Without limit / cursor the newest DEFAULT_LIMIT entries are returned as a
+    list; with either, {"results": [...], "next_cursor": <cursor or null>}.
+    Entries past ADMIN_LOG_RETENTION_DAYS live on in /api/admin/logs/monthly/.
+    """
     permission_classes = [AllowAny]
 
+    DEFAULT_LIMIT = 200
+    MAX_LIMIT     = 200
+
     def get(self, request):
         user, err = require_admin(request)
         if err:
             return err
 
-        logs = AdminLog.objects.select_related('admin_user').all()
-        return Response(AdminLogSerializer(logs, many=True).data)
\ No newline at end of file
+        params = request.query_params
+        logs   = AdminLog.objects.select_related('admin_user')
+        try:
+            if params.get('admin'):
+                logs = logs.filter(admin_user_id=int(params['admin']))
+            limit = int(params.get('limit', 50))
+        except ValueError:
+            return Response({'error': 'admin and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if 'limit' not in params and 'cursor' not in params:
+            page = pagination.paginate(logs, '-action_time', self.DEFAULT_LIMIT)[0]
+            return Response(AdminLogSerializer(page, many=True).data)
+
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        try:
+            page, next_cursor = pagination.paginate(logs, '-action_time', limit, params.get('cursor'))
+        except pagination.InvalidCursor as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'results':     AdminLogSerializer(page, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+
+class AdminLogSummaryView(APIView):
+    """
+    GET /api/admin/logs/monthly/  — admin only
+    Monthly action counts per admin and action type of purged log entries.
+    Query params: ?admin=<user id>  ?action_type=order_placed  ?from=2025-01  ?to=2025-12
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        params    = request.query_params
+        summaries = AdminLogSummary.objects.select_related('admin_user')
+        try:
+            if params.get('admin'):
+                summaries = summaries.filter(admin_user_id=int(params['admin']))
+            if params.get('from'):
+                summaries = summaries.filter(month__gte=datetime.strptime(params['from'], '%Y-%m').date())
+            if params.get('to'):
+                summaries = summaries.filter(month__lte=datetime.strptime(params['to'], '%Y-%m').date())
+        except ValueError:
+            return Response(
+                {'error': 'admin must be an integer and from / to months in YYYY-MM format.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if params.get('action_type'):
+            summaries = summaries.filter(action_type=params['action_type'])
+
+        return Response(AdminLogSummarySerializer(summaries, many=True).data)
+
+
+# ------------------------------------------------------------------
+# Profiles
+# ------------------------------------------------------------------
+
+class ProfileListView(APIView):
+    """
+    GET /api/admin/profiles/  — admin only
+    Request profiles captured by ProfilingMiddleware, newest first.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        profiles = ProfileArtifact.objects.select_related('user').defer('queries', 'summary', 'profile')
+        return Response(ProfileArtifactSerializer(profiles, many=True).data)
+
+
+class ProfileDetailView(APIView):
+    """
+    GET /api/admin/profiles/<profile_id>/  — admin only
+    One profile's hottest functions and the SQL the request ran.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, profile_id):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        profile = ProfileArtifact.objects.select_related('user').filter(id=profile_id).first()
+        if profile is None:
+            return Response({'error': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ProfileArtifactDetailSerializer(profile).data)
+
+
+class ProfileDownloadView(APIView):
+    """
+    GET /api/admin/profiles/<profile_id>/download/  — admin only
+    The raw cProfile stats, for `python -m pstats` or snakeviz.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, profile_id):
+        user, err = require_admin(request)
+        if err:
+            return err
+
+        stats = ProfileArtifact.objects.filter(id=profile_id).values_list('profile', flat=True).first()
+        if stats is None:
+            return Response({'error': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if not stats:
+            return Response(
+                {'error': 'This profile was captured without cProfile data.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        response = HttpResponse(bytes(stats), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.prof"'
+        return response
@@ -0,0 +1,231 @@
+"""
+Order event webhooks for partner systems (ERP, delivery partners).
+
+Views call enqueue() inside the transaction that changes the order (the
+standing order generator calls enqueue_many() once per chunk). It
+inserts one WebhookDelivery row (the outbox) per interested endpoint, so an
+event exists if and only if its change commits, and no partner's latency is
+added to ours. With orders sharded (see sharding.py) that guarantee is
+weaker: the outbox stays on `default` and the order commits on its shard
+first, so a failure between the two commits loses the event, never the
+order. The dispatch_webhooks worker claims due deliveries, groups
+them per endpoint and POSTs up to WEBHOOK_BATCH_SIZE events per request:
+
+    POST <endpoint url>
+    Content-Type: application/json
+    X-Icecream-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>" keyed with the endpoint secret>
+
+    {"events": [{"id": "<uuid>", "type": "order.created", "created_at": "...", "data": {...}}, ...]}
+
+A 2xx response acknowledges the whole batch; anything else retries every
+event in it with exponential backoff. Events can arrive more than once and,
+after retries, out of order, so receivers dedupe on the event id.
+
+Connections are kept alive and reused per host for the life of the worker.
+"""
+import hashlib
+import hmac
+import http.client
+import json
+import ssl
+import time
+import uuid
+from collections  import defaultdict
+from urllib.parse import urlsplit
+
+from django.conf                  import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils                 import timezone
+
+from .models import WebhookDelivery, WebhookEndpoint
+
+
+SIGNATURE_HEADER = 'X-Icecream-Signature'
+
+
+class WebhookError(Exception):
+    """An endpoint did not acknowledge a batch."""
+
+
+def endpoints_for(event_type):
+    """The active endpoints that want events of this type."""
+    return [e for e in WebhookEndpoint.objects.filter(active=True) if e.wants(event_type)]
+
+
+def _payload(event_id, event_type, order, order_data, extra):
+    return {
+        'id':         str(event_id),
+        'type':       event_type,
+        'created_at': timezone.now().isoformat(),
+        'data':       {
+            'order_id':    order.id,
+            'business_id': order.business_id,
+            'status':      order.status,
+            'order':       order_data,
+            **extra,
+        },
+    }
+
+
+def enqueue(event_type, order, order_data, **extra):
+    """
+    Writes the event to the outbox for every active endpoint that wants it.
+    Call inside the transaction that changes the order. Returns the rows.
+    """
+    return enqueue_many(event_type, [(order, order_data)], **extra)
+
+
+def enqueue_many(event_type, orders, endpoints=None, **extra):
+    """
+    enqueue() for many (order, order_data) pairs, one event per order, in
+    one bulk insert. Pass `endpoints` (from endpoints_for()) when the caller
+    already looked them up.
+    """
+    endpoints = endpoints_for(event_type) if endpoints is None else endpoints
+    if not endpoints:
+        return []
+
+    deliveries = []
+    for order, order_data in orders:
+        event_id = uuid.uuid4()
+        payload  = _payload(event_id, event_type, order, order_data, extra)
+        deliveries.extend(
+            WebhookDelivery(
+                endpoint   = endpoint,
+                event_id   = event_id,
+                event_type = event_type,
+                order_id   = order.id,
+                payload    = payload,
+            )
+            for endpoint in endpoints
+        )
+    return WebhookDelivery.objects.bulk_create(deliveries, batch_size=1000)
+
+
+def sign(secret, body, timestamp=None):
+    """Value of the signature header for a request body (bytes)."""
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    digest    = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def verify(secret, body, header, tolerance=300):
+    """Receiver-side check of a signature header, for partners and tests."""
+    try:
+        fields    = dict(part.split('=', 1) for part in header.split(','))
+        timestamp = int(fields['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, body, timestamp), header)
+
+
+# ------------------------------------------------------------------
+# Delivery
+# ------------------------------------------------------------------
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, one per (scheme, host, port)."""
+
+    def __init__(self, timeout=None):
+        self.timeout      = settings.WEBHOOK_TIMEOUT_SECONDS if timeout is None else timeout
+        self._connections = {}
+
+    def _connect(self, parts):
+        if parts.scheme == 'https':
+            return http.client.HTTPSConnection(
+                parts.hostname, parts.port, timeout=self.timeout, context=ssl.create_default_context(),
+            )
+        return http.client.HTTPConnection(parts.hostname, parts.port, timeout=self.timeout)
+
+    def _drop(self, key):
+        connection = self._connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def post(self, url, body, headers):
+        """POSTs body and returns the response status."""
+        parts = urlsplit(url)
+        key   = (parts.scheme, parts.hostname, parts.port)
+        path  = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        while True:
+            reused     = key in self._connections
+            connection = self._connections.get(key) or self._connect(parts)
+            self._connections[key] = connection
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()   # drained, so the connection can carry the next request
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._drop(key)
+                if reused:
+                    continue   # the server closed an idle keep-alive connection: one retry on a new one
+                raise
+            except Exception:
+                self._drop(key)
+                raise
+            if response.will_close:
+                self._drop(key)
+            return response.status
+
+    def close(self):
+        for key in list(self._connections):
+            self._drop(key)
+
+
+def _post_batch(pool, endpoint, batch):
+    body   = json.dumps({'events': [d.payload for d in batch]}, cls=DjangoJSONEncoder).encode()
+    status = pool.post(endpoint.url, body, {
+        'Content-Type':   'application/json',
+        'User-Agent':     'sheetal-icecream-webhooks/1',
+        SIGNATURE_HEADER: sign(endpoint.secret, body),
+    })
+    if not 200 <= status < 300:
+        raise WebhookError(f'{endpoint.url} answered HTTP {status}')
+
+
+def deliver(deliveries, pool):
+    """
+    POSTs claimed deliveries in batches per endpoint over pooled connections.
+    Failed batches are rescheduled with backoff. Returns (sent, failed) counts.
+    """
+    by_endpoint = defaultdict(list)
+    for delivery in deliveries:
+        by_endpoint[delivery.endpoint_id].append(delivery)
+    endpoints = WebhookEndpoint.objects.in_bulk(list(by_endpoint))
+
+    sent   = 0
+    failed = 0
+    for endpoint_id, pending in by_endpoint.items():
+        endpoint = endpoints[endpoint_id]
+        if not endpoint.active:
+            WebhookDelivery.objects.filter(id__in=[d.id for d in pending]).update(
+                status=WebhookDelivery.Status.FAILED, locked_until=None, last_error='Endpoint disabled.',
+            )
+            failed += len(pending)
+            continue
+
+        for start in range(0, len(pending), settings.WEBHOOK_BATCH_SIZE):
+            batch = pending[start:start + settings.WEBHOOK_BATCH_SIZE]
+            try:
+                _post_batch(pool, endpoint, batch)
+            except Exception as exc:
+                failed += len(batch)
+                for delivery in batch:
+                    delivery.retry_later(
+                        exc,
+                        max_attempts = settings.WEBHOOK_MAX_ATTEMPTS,
+                        base_delay   = settings.WEBHOOK_RETRY_BASE_SECONDS,
+                        max_delay    = settings.WEBHOOK_RETRY_MAX_SECONDS,
+                    )
+                continue
+
+            WebhookDelivery.objects.filter(id__in=[d.id for d in batch]).update(
+                status       = WebhookDelivery.Status.SENT,
+                sent_at      = timezone.now(),
+                locked_until = None,
+                last_error   = '',
+            )
+            sent += len(batch)
+    return sent, failed
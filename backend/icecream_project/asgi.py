@@ -3,6 +3,9 @@ ASGI config for icecream_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn icecream_project.asgi:application``)
+to enable the order event stream at /api/orders/events/.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
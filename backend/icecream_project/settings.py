@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+import json
 import os
 import dj_database_url
 from corsheaders.defaults import default_headers
@@ -32,6 +33,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'icecream_api.middleware.CompressionMiddleware',
+    'icecream_api.middleware.ReplicaPinningMiddleware',
+    'icecream_api.sharding.ShardPinningMiddleware',
+    'icecream_api.profiling.ProfilingMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,10 +69,44 @@ WSGI_APPLICATION = 'icecream_project.wsgi.application'
 # ── Database ──
 
 _DATABASE_URL = os.getenv('DATABASE_URL')
-_IS_REMOTE_DB = bool(_DATABASE_URL)
+_IS_REMOTE_DB = bool(_DATABASE_URL) and not _DATABASE_URL.startswith('sqlite')
+
+# Connection handling for every Postgres alias:
+#   DB_POOL=1                psycopg 3 connection pool per worker process
+#                            (DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE / DB_POOL_TIMEOUT)
+#   otherwise                persistent connections kept for DB_CONN_MAX_AGE seconds
+# Connections are health-checked before reuse, so a failover costs no failed
+# queries. DB_STATEMENT_TIMEOUT_MS (0 = off) caps any single statement.
+
+DB_POOL                 = os.getenv('DB_POOL', '').lower() in ('1', 'true', 'yes')
+DB_POOL_MIN_SIZE        = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE        = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT         = float(os.getenv('DB_POOL_TIMEOUT', '10'))   # seconds to wait for a free connection
+DB_CONN_MAX_AGE         = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
+
+def _database(config):
+    """Applies the pooling / health check / timeout policy to a dj_database_url config."""
+    config['CONN_HEALTH_CHECKS'] = True
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+
+    options = config.setdefault('OPTIONS', {})
+    if DB_STATEMENT_TIMEOUT_MS:
+        options['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
+    if DB_POOL:
+        config['CONN_MAX_AGE'] = 0   # the pool owns connection lifetime
+        options['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout':  DB_POOL_TIMEOUT,
+        }
+    return config
+
 
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': _database(dj_database_url.config(
         default=_DATABASE_URL or (
             f"postgres://{os.getenv('DB_USER', 'postgres')}:"
             f"{os.getenv('DB_PASSWORD', '')}@"
@@ -75,11 +114,45 @@ DATABASES = {
             f"{os.getenv('DB_PORT', '5432')}/"
             f"{os.getenv('DB_NAME', 'icecream_db')}"
         ),
-        conn_max_age=600,
+        conn_max_age=DB_CONN_MAX_AGE,
         ssl_require=_IS_REMOTE_DB,   # True in production, False locally
-    )
+    ))
 }
 
+# ── Read replicas ──
+# Comma-separated replica URLs, e.g.
+#   DATABASE_REPLICA_URLS=postgres://ro1.example/icecream,postgres://ro2.example/icecream
+# Each becomes DATABASES['replica_<n>']. Reads go to a healthy replica, writes
+# and the caller's reads for REPLICA_PIN_SECONDS after a write go to `default`.
+
+DATABASE_REPLICAS = []
+for _n, _url in enumerate(filter(None, map(str.strip, os.getenv('DATABASE_REPLICA_URLS', '').split(','))), start=1):
+    DATABASES[f'replica_{_n}'] = _database(dj_database_url.parse(
+        _url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        ssl_require=not _url.startswith('sqlite'),
+    ))
+    DATABASES[f'replica_{_n}']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(f'replica_{_n}')
+
+# opt-in sharding of order data by business, see icecream_api/sharding.py
+DATABASE_SHARDS = []
+for _n, _url in enumerate(filter(None, map(str.strip, os.getenv('DATABASE_SHARD_URLS', '').split(','))), start=1):
+    DATABASES[f'shard_{_n}'] = _database(dj_database_url.parse(
+        _url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        ssl_require=not _url.startswith('sqlite'),
+    ))
+    DATABASE_SHARDS.append(f'shard_{_n}')
+
+# explicit placements, e.g. SHARD_MAP='{"42": "shard_3"}' for a large customer
+SHARD_MAP = json.loads(os.getenv('SHARD_MAP', '{}'))
+
+DATABASE_ROUTERS = ['icecream_api.sharding.ShardRouter', 'icecream_api.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS           = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+REPLICA_HEALTH_CHECK_INTERVAL = 10   # seconds a replica's health status is trusted
+
 CORS_ALLOWED_ORIGINS = [
     "https://sheetalicecream.vercel.app",
     "https://sheetalicecreamudhyog.vercel.app",
@@ -87,9 +160,13 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS    = ['X-Sync-Token', 'X-Profile-Id']
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "content-type",
     "authorization",
+    "idempotency-key",
+    "last-event-id",
+    "x-profile",
 ]
 
 # ── REST Framework ──
@@ -100,13 +177,121 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'icecream_api.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
 }
 
+# ── Email ──
+# Order confirmation emails are queued in `email_jobs` and sent by
+# `python manage.py send_order_emails`. Defaults to the console backend in DEBUG.
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.console.EmailBackend' if DEBUG
+    else 'django.core.mail.backends.smtp.EmailBackend',
+)
+EMAIL_HOST          = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT          = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER     = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS       = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT       = 10
+DEFAULT_FROM_EMAIL  = os.getenv('DEFAULT_FROM_EMAIL', 'orders@sheetalicecream.com')
+
+ORDER_EMAIL_MAX_ATTEMPTS       = 6
+ORDER_EMAIL_RETRY_BASE_SECONDS = 60     # 1m, 2m, 4m, ... capped below
+ORDER_EMAIL_RETRY_MAX_SECONDS  = 3600
+
+# ── Webhooks ──
+# Order events for the endpoints configured in the Django admin are written to
+# `webhook_outbox` with the order change and delivered by
+# `python manage.py dispatch_webhooks`.
+WEBHOOK_BATCH_SIZE         = int(os.getenv('WEBHOOK_BATCH_SIZE', '100'))   # events per POST
+WEBHOOK_TIMEOUT_SECONDS    = float(os.getenv('WEBHOOK_TIMEOUT_SECONDS', '10'))
+WEBHOOK_MAX_ATTEMPTS       = 10
+WEBHOOK_RETRY_BASE_SECONDS = 30     # 30s, 1m, 2m, ... capped below
+WEBHOOK_RETRY_MAX_SECONDS  = 3600
+
+# ── Profiling ──
+# When enabled, an admin can profile one request with `?profile=1` or an
+# `X-Profile: 1` header, and a sample of requests slower than
+# PROFILING_SLOW_REQUEST_MS is profiled automatically (0 turns the sampler off).
+# Artifacts are listed at /api/admin/profiles/; only the newest
+# PROFILING_MAX_ARTIFACTS are kept.
+PROFILING_ENABLED         = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_SLOW_REQUEST_MS = int(os.getenv('PROFILING_SLOW_REQUEST_MS', '0'))
+PROFILING_SAMPLE_RATE     = float(os.getenv('PROFILING_SAMPLE_RATE', '0.05'))   # share of requests the sampler watches
+PROFILING_MAX_ARTIFACTS   = int(os.getenv('PROFILING_MAX_ARTIFACTS', '50'))
+PROFILING_MAX_QUERIES     = 500   # SQL statements stored per artifact
+
+# ── Order archive ──
+# Completed / Cancelled orders older than this are moved to the archive
+# tables by `python manage.py archive_orders`.
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv('ORDER_ARCHIVE_AFTER_DAYS', '180'))
+
+# ── Idempotency keys ──
+# Replays of POST /api/orders/place with the same Idempotency-Key header return
+# the original response for this long; prune with `prune_idempotency_keys`.
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+
+# ── Admin activity log ──
+# Entries older than this are folded into monthly per-admin summaries and
+# deleted by `python manage.py purge_admin_logs` (0 keeps them forever).
+ADMIN_LOG_RETENTION_DAYS = int(os.getenv('ADMIN_LOG_RETENTION_DAYS', '365'))
+
+# ── Order change feed (?since=<sync token>) ──
+# Tokens older than the tombstone retention get 410 Gone (client does a full
+# refresh). The overlap re-sends rows written around the token's timestamp.
+ORDER_TOMBSTONE_RETENTION_DAYS = int(os.getenv('ORDER_TOMBSTONE_RETENTION_DAYS', '30'))
+ORDER_SYNC_OVERLAP_SECONDS     = 5
+
+# ── Order event stream (SSE) ──
+# 'auto' uses Postgres LISTEN/NOTIFY when the database is Postgres (events
+# reach every worker), otherwise an in-process broker ('memory').
+ORDER_EVENTS_BACKEND           = os.getenv('ORDER_EVENTS_BACKEND', 'auto')
+ORDER_EVENTS_HISTORY           = 1000   # events kept per process for Last-Event-ID resume
+ORDER_EVENTS_HEARTBEAT_SECONDS = 15
+ORDER_EVENTS_RETRY_MS          = 3000   # client reconnect delay sent in the stream
+
+# ── Cache ──
+# Shared by every worker process: cache-version bumps (analytics, customer
+# dashboards) and read-your-writes pins only work if all workers see them.
+# REDIS_URL selects Redis (needs the `redis` package); otherwise the database
+# cache table is used, which migration 0019 creates.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        },
+    }
+
+# ── Analytics ──
+# Seconds an analytics response may be served from cache. Order writes bump
+# a version key in the shared cache once they commit, so every worker stops
+# serving numbers a committed change made stale.
+ANALYTICS_CACHE_SECONDS = 300
+
+# Seconds a customer's /orders/my-summary/ aggregates may be cached; the
+# business's order writes invalidate them earlier.
+ORDER_SUMMARY_CACHE_SECONDS = 3600
+
+# ── Response compression ──
+# JSON responses smaller than this are sent as-is; brotli is used when the
+# `brotli` package is installed and the client accepts it, gzip otherwise.
+RESPONSE_COMPRESSION_MIN_SIZE       = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+RESPONSE_COMPRESSION_GZIP_LEVEL     = 6
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 4
+
 # ── JWT config ──
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME':    timedelta(hours=8),
@@ -118,6 +303,27 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM':            'user_id',
 }
 
+# server-side invoices (see icecream_api/invoices.py)
+INVOICE_CACHE_DIR      = os.getenv('INVOICE_CACHE_DIR', os.path.join(BASE_DIR, 'invoice_cache'))
+INVOICE_RENDER_WORKERS = int(os.getenv('INVOICE_RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+# batches with fewer cache misses than this render in-process, skipping pool start-up
+INVOICE_POOL_THRESHOLD = 20
+
+# bulk onboarding (see icecream_api/onboarding.py): password hashes are made in
+# a process pool once an upload has ONBOARDING_POOL_THRESHOLD new logins; the
+# upload endpoint takes dozens of rows, the onboard_businesses command any number
+ONBOARDING_HASH_WORKERS   = int(os.getenv('ONBOARDING_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+ONBOARDING_POOL_THRESHOLD = 16
+ONBOARDING_MAX_ROWS       = 100
+
+# revoked JWTs (logout, refresh rotation) are mirrored in a per-process bloom filter
+REVOKED_TOKEN_SYNC_SECONDS    = float(os.getenv('REVOKED_TOKEN_SYNC_SECONDS', '2'))
+# ids below the last synced one that are read again, for revocations that committed late
+REVOKED_TOKEN_SYNC_OVERLAP    = 200
+REVOKED_TOKEN_REBUILD_SECONDS = 3600
+REVOKED_TOKEN_BLOOM_BITS      = 1 << 20
+REVOKED_TOKEN_BLOOM_HASHES    = 7
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
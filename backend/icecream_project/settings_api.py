@@ -0,0 +1,37 @@
+"""
+Lean profile for serving only the JSON API:
+
+    DJANGO_SETTINGS_MODULE=icecream_project.settings_api gunicorn
+
+Drops the Django admin, sessions, messages, static files / whitenoise and the
+template engine, along with their middleware. Run the admin (and
+collectstatic) from a process using icecream_project.settings instead.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+_DROPPED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'whitenoise.runserver_nostatic',
+}
+
+_DROPPED_MIDDLEWARE = {
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',   # every API view is csrf-exempt
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _DROPPED_APPS]
+MIDDLEWARE     = [mw for mw in MIDDLEWARE if mw not in _DROPPED_MIDDLEWARE]
+
+ROOT_URLCONF = 'icecream_project.urls_api'
+TEMPLATES    = []
+
+# auth is handled by require_auth(); don't build AnonymousUser objects per request
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'UNAUTHENTICATED_USER': None}
@@ -0,0 +1,39 @@
+"""
+Settings for running the test suite without a Postgres server:
+
+    python manage.py test --settings=icecream_project.test_settings
+
+`default` and `replica_1` are two separate SQLite databases. Replica routing
+is off by default; tests that exercise it enable it with
+override_settings(DATABASE_REPLICAS=['replica_1']). Likewise `shard_1` and
+`shard_2` only hold orders under override_settings(DATABASE_SHARDS=[...]).
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME':   BASE_DIR / 'test_default.sqlite3',
+    },
+    'replica_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME':   BASE_DIR / 'test_replica_1.sqlite3',
+    },
+    'shard_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME':   BASE_DIR / 'test_shard_1.sqlite3',
+    },
+    'shard_2': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME':   BASE_DIR / 'test_shard_2.sqlite3',
+    },
+}
+
+DATABASE_REPLICAS = []
+DATABASE_SHARDS   = []
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# one process, so an in-memory cache is shared enough and keeps query counts exact
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
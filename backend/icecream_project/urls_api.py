@@ -0,0 +1,8 @@
+from django.urls       import path, include
+from django.conf       import settings
+from django.conf.urls.static import static
+
+# URLconf for settings_api: the JSON API without the Django admin.
+urlpatterns = [
+    path('api/', include('icecream_api.urls')),
+]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
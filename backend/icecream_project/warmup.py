@@ -0,0 +1,53 @@
+"""
+Worker warm-up, called from gunicorn's post_fork hook (see gunicorn.conf.py)
+so the first real request does not pay for connection set-up and lazy
+initialisation.
+"""
+import time
+
+from django.conf       import settings
+from django.core.cache import caches
+from django.db         import connections
+from django.urls       import get_resolver
+
+
+def _timed(timings, name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as exc:   # a cold replica must not stop the worker from starting
+        timings[name] = f'failed: {exc}'
+    else:
+        timings[name] = f'{(time.perf_counter() - start) * 1000:.1f}ms'
+
+
+def _open_connection(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def _prime_jwt():
+    from rest_framework_simplejwt.tokens import AccessToken
+    from rest_framework_simplejwt.exceptions import TokenError
+    try:
+        AccessToken('warm-up')
+    except TokenError:
+        pass   # building the token backend is the point, not the token
+
+
+def _prime_renderer():
+    from icecream_api.renderers import FastJSONRenderer
+    FastJSONRenderer().render({'warm': True})
+
+
+def warm_up():
+    """Opens DB connections, touches caches and primes lazy singletons. Returns timings."""
+    timings = {}
+    for alias in settings.DATABASES:
+        _timed(timings, f'db:{alias}', lambda alias=alias: _open_connection(alias))
+    for alias in settings.CACHES:
+        _timed(timings, f'cache:{alias}', lambda alias=alias: caches[alias].get('warm-up'))
+    _timed(timings, 'urls', lambda: get_resolver().url_patterns)
+    _timed(timings, 'jwt', _prime_jwt)
+    _timed(timings, 'renderer', _prime_renderer)
+    return timings
@@ -56,7 +56,7 @@ function AppContent() {
 
   const handleLogout = async () => {
   try {
-    await import('./api').then(m => m.default.post('/auth/logout/', {}));
+    await import('./api').then(m => m.default.post('/auth/logout/', { refresh: tokenStorage.getRefresh() }));
   } catch { }
 
   tokenStorage.clearTokens();
@@ -52,7 +52,7 @@ const silentRefresh = async () => {
     if (!res.ok) throw new Error('Refresh failed');
 
     const data = await res.json();
-    tokenStorage.setTokens(data.access, refreshToken);
+    tokenStorage.setTokens(data.access, data.refresh || refreshToken);
     return data.access;
   })().finally(() => { refreshPromise = null; });
 
@@ -105,17 +105,11 @@ const StatusBadge = ({ status }) => {
 // Monthly Spending Bar Chart
 const MONTHS = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec'];
 
-const buildMonthlyData = (orders) => {
-  const now = new Date();
-  return Array.from({ length: 6 }, (_, i) => {
-    const d = new Date(now.getFullYear(), now.getMonth() - (5 - i), 1);
-    const m = d.getMonth(), y = d.getFullYear();
-    const total = orders
-      .filter(o => { const od = new Date(o.order_date); return od.getMonth() === m && od.getFullYear() === y && o.status !== 'Cancelled'; })
-      .reduce((s, o) => s + parseFloat(o.total_amount), 0);
-    return { month: MONTHS[m], total: Math.round(total) };
-  });
-};
+// monthly: summary.monthly_spend, oldest first, e.g. [{ month: '2026-05', total: 1250 }, ...]
+const buildMonthlyData = (monthly) => monthly.map(({ month, total }) => ({
+  month: MONTHS[parseInt(month.slice(5, 7), 10) - 1],
+  total: Math.round(total),
+}));
 
 const BarTooltip = ({ active, payload, label }) => {
   if (!active || !payload?.length) return null;
@@ -127,8 +121,8 @@ const BarTooltip = ({ active, payload, label }) => {
   );
 };
 
-const SpendingChart = ({ orders }) => {
-  const data = useMemo(() => buildMonthlyData(orders), [orders]);
+const SpendingChart = ({ monthly }) => {
+  const data = useMemo(() => buildMonthlyData(monthly), [monthly]);
   if (!data.some(d => d.total > 0)) return <div className="chart-empty">No spending data yet</div>;
   return (
     <ResponsiveContainer width="100%" height={180}>
@@ -145,11 +139,7 @@ const SpendingChart = ({ orders }) => {
 // Flavour Donut
 const DONUT_COLORS = ['var(--accent-primary)', '#f97316', '#8b5cf6', '#06b6d4', '#ec4899', '#84cc16'];
 
-const buildFlavourData = (orders) => {
-  const tally = {};
-  orders.forEach(o => o.items.forEach(item => { tally[item.item_name] = (tally[item.item_name] || 0) + item.quantity; }));
-  return Object.entries(tally).sort(([, a], [, b]) => b - a).slice(0, 6).map(([name, value]) => ({ name, value }));
-};
+const buildFlavourData = (topItems) => topItems.map(({ item_name, quantity }) => ({ name: item_name, value: quantity }));
 
 const DonutTooltip = ({ active, payload }) => {
   if (!active || !payload?.length) return null;
@@ -161,8 +151,8 @@ const DonutTooltip = ({ active, payload }) => {
   );
 };
 
-const FlavourDonut = ({ orders }) => {
-  const data = useMemo(() => buildFlavourData(orders), [orders]);
+const FlavourDonut = ({ topItems }) => {
+  const data = useMemo(() => buildFlavourData(topItems), [topItems]);
   if (!data.length) return <div className="chart-empty">No order data yet</div>;
   return (
     <ResponsiveContainer width="100%" height={180}>
@@ -178,13 +168,12 @@ const FlavourDonut = ({ orders }) => {
 };
 
 // Quick Reorder Widget
-const QuickReorderWidget = ({ orders, onReorder }) => {
-  const lastOrder = orders.find(o => o.status !== 'Cancelled');
-  const topItems  = useMemo(() => {
-    const tally = {};
-    orders.forEach(o => o.items.forEach(item => { tally[item.item_name] = (tally[item.item_name] || 0) + item.quantity; }));
-    return Object.entries(tally).sort(([, a], [, b]) => b - a).slice(0, 3).map(([name, qty]) => ({ name, qty }));
-  }, [orders]);
+const QuickReorderWidget = ({ recentOrders, favourites, onReorder }) => {
+  const lastOrder = recentOrders.find(o => o.status !== 'Cancelled');
+  const topItems  = useMemo(
+    () => favourites.slice(0, 3).map(({ item_name, quantity }) => ({ name: item_name, qty: quantity })),
+    [favourites],
+  );
 
   if (!lastOrder && topItems.length === 0) return null;
 
@@ -289,13 +278,9 @@ const OrderCard = ({ order, onReorder, onCancel }) => {
 
 // Spending Trend Helper
 
-const getSpendingTrend = (orders) => {
-  const now       = new Date();
-  const thisMonth = now.getMonth(), thisYear = now.getFullYear();
-  const lastMonth = thisMonth === 0 ? 11 : thisMonth - 1;
-  const lastYear  = thisMonth === 0 ? thisYear - 1 : thisYear;
-  const sum = (m, y) => orders.filter(o => { const d = new Date(o.order_date); return d.getMonth() === m && d.getFullYear() === y; }).reduce((s, o) => s + parseFloat(o.total_amount), 0);
-  const thisSpend = sum(thisMonth, thisYear), lastSpend = sum(lastMonth, lastYear);
+const getSpendingTrend = (monthly) => {
+  if (monthly.length < 2) return null;
+  const thisSpend = monthly[monthly.length - 1].total, lastSpend = monthly[monthly.length - 2].total;
   if (!thisSpend && !lastSpend) return null;
   const diff = thisSpend - lastSpend;
   const pct  = lastSpend ? Math.abs(Math.round((diff / lastSpend) * 100)) : null;
@@ -303,9 +288,13 @@ const getSpendingTrend = (orders) => {
 };
 
 // Dashboard
+const SUMMARY_PATH = '/orders/my-summary?recent=3';
+
 const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) => {
   const [profile,      setProfile]      = useState(null);
-  const [orders,       setOrders]       = useState([]);
+  const [summary,      setSummary]      = useState(null);
+  const [orders,       setOrders]       = useState(null);   // full history, loaded with the Orders tab
+  const [ordersError,  setOrdersError]  = useState('');
   const [loading,      setLoading]      = useState(true);
   const [error,        setError]        = useState('');
   const [reorderMsg,   setReorderMsg]   = useState('');
@@ -328,8 +317,8 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
     const load = async () => {
       setLoading(true); setError('');
       try {
-        const [me, ord] = await Promise.all([api.get('/auth/me'), api.get('/orders/my-orders')]);
-        setProfile(me); setOrders(ord);
+        const [me, sum] = await Promise.all([api.get('/auth/me'), api.get(SUMMARY_PATH)]);
+        setProfile(me); setSummary(sum);
       } catch (err) {
         setError(err.message || 'Failed to load dashboard. Please refresh.');
       } finally { setLoading(false); }
@@ -337,10 +326,23 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
     load();
   }, [currentUser.id]);
 
+  useEffect(() => {
+    if (activeTab !== 'orders' || orders !== null) return;
+    setOrdersError('');
+    api.get('/orders/my-orders')
+      .then(setOrders)
+      .catch(err => setOrdersError(err.message || 'Failed to load orders.'));
+  }, [activeTab, orders]);
+
+  const refreshSummary = async () => {
+    try { setSummary(await api.get(SUMMARY_PATH)); } catch { /* keep the current numbers */ }
+  };
+
   const handleCancel = async (orderId) => {
     try {
       const updated = await api.patch(`/orders/${orderId}/cancel`, {});
-      setOrders(prev => prev.map(o => o.id === orderId ? updated : o));
+      setOrders(prev => prev && prev.map(o => o.id === orderId ? updated : o));
+      refreshSummary();
       return true;
     } catch { return false; }
   };
@@ -352,7 +354,8 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
         business: currentUser.business,
         items: order.items.map(i => ({ item_name: i.item_name, quantity: i.quantity, price: parseFloat(i.price) })),
       });
-      setOrders(prev => [newOrder, ...prev]);
+      setOrders(prev => prev && [newOrder, ...prev]);
+      refreshSummary();
       setReorderMsg(`Reorder placed — Order #${newOrder.id}`);
       setTimeout(() => setReorderMsg(''), 4000);
     } catch (err) {
@@ -362,21 +365,22 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
   };
 
   const business       = profile?.business_details;
-  const totalOrders    = orders.length;
-  const totalSpent     = orders.reduce((s, o) => s + parseFloat(o.total_amount), 0);
-  const pendingCount   = orders.filter(o => o.status === 'Pending').length;
-  const completedCount = orders.filter(o => o.status === 'Completed').length;
-  const trend          = useMemo(() => getSpendingTrend(orders), [orders]);
+  const totalOrders    = summary?.total_orders ?? 0;
+  const totalSpent     = summary?.lifetime_spend ?? 0;
+  const pendingCount   = summary?.status_counts.Pending ?? 0;
+  const completedCount = summary?.status_counts.Completed ?? 0;
+  const trend          = useMemo(() => summary ? getSpendingTrend(summary.monthly_spend) : null, [summary]);
 
+  const loadedOrders = orders || [];
   const filterCounts = useMemo(() => ({
-    All:       orders.length,
-    Pending:   orders.filter(o => o.status === 'Pending').length,
-    Confirmed: orders.filter(o => o.status === 'Confirmed').length,
-    Completed: orders.filter(o => o.status === 'Completed').length,
-    Cancelled: orders.filter(o => o.status === 'Cancelled').length,
+    All:       loadedOrders.length,
+    Pending:   loadedOrders.filter(o => o.status === 'Pending').length,
+    Confirmed: loadedOrders.filter(o => o.status === 'Confirmed').length,
+    Completed: loadedOrders.filter(o => o.status === 'Completed').length,
+    Cancelled: loadedOrders.filter(o => o.status === 'Cancelled').length,
   }), [orders]);
 
-  const filteredOrders = filterStatus === 'All' ? orders : orders.filter(o => o.status === filterStatus);
+  const filteredOrders = filterStatus === 'All' ? loadedOrders : loadedOrders.filter(o => o.status === filterStatus);
 
   if (loading) return <div className="dashboard-page"><DashboardSkeleton /></div>;
 
@@ -461,7 +465,7 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
         {/* ── Overview ── */}
         {activeTab === 'overview' && (
           <div className="tab-content">
-            {orders.length === 0 ? (
+            {totalOrders === 0 ? (
               <div className="dash-card overview-empty-card">
                 <div className="overview-empty-icon-wrap"><IconBox /></div>
                 <h3>No orders yet</h3>
@@ -477,18 +481,18 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
                       <h3>Monthly Spending</h3>
                       <p className="chart-subtitle">Last 6 months · excl. cancelled</p>
                     </div>
-                    <SpendingChart orders={orders} />
+                    <SpendingChart monthly={summary.monthly_spend} />
                   </div>
                   <div className="dash-card chart-card">
                     <div className="chart-card-header">
                       <h3>Top Flavours</h3>
                       <p className="chart-subtitle">By quantity ordered</p>
                     </div>
-                    <FlavourDonut orders={orders} />
+                    <FlavourDonut topItems={summary.top_items} />
                   </div>
                 </div>
 
-                <QuickReorderWidget orders={orders} onReorder={handleReorder} />
+                <QuickReorderWidget recentOrders={summary.recent_orders} favourites={summary.top_items} onReorder={handleReorder} />
 
                 <div className="dash-card">
                   <div className="dash-card-header">
@@ -496,7 +500,7 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
                     <button className="link-btn" onClick={() => setActiveTab('orders')}>View all</button>
                   </div>
                   <div className="recent-orders-list">
-                    {orders.slice(0, 3).map(order => (
+                    {summary.recent_orders.map(order => (
                       <div key={order.id} className="recent-order-row">
                         <div className="recent-order-info">
                           <span className="recent-order-id">#{order.id}</span>
@@ -525,7 +529,11 @@ const Dashboard = ({ currentUser, setActivePage, onLogout, onProfileUpdate }) =>
                 </button>
               ))}
             </div>
-            {filteredOrders.length === 0 ? (
+            {ordersError ? (
+              <div className="empty-state large"><p>{ordersError}</p></div>
+            ) : orders === null ? (
+              <div className="empty-state large"><p>Loading orders…</p></div>
+            ) : filteredOrders.length === 0 ? (
               <div className="empty-state large">
                 <p>{filterStatus === 'All' ? 'No orders yet.' : `No ${filterStatus.toLowerCase()} orders.`}</p>
               </div>